@@ -2,7 +2,7 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
-from .models import Flight, Booking, FoodOrder
+from .models import Flight, Booking, FoodOrder, EmailOutbox, TravelPackage, PackageBooking, ArchivedBooking, ArchivedFoodOrder
 
 # This registers your models so they appear in the Admin screenshot you sent
 @admin.register(Flight)
@@ -15,4 +15,29 @@ class BookingAdmin(admin.ModelAdmin):
     list_display = ('passenger_name', 'flight', 'status', 'seat_number')
     list_filter = ('status',)
 
-admin.site.register(FoodOrder)
\ No newline at end of file
+admin.site.register(FoodOrder)
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    list_display = ('passenger_name', 'flight', 'status', 'flight_departure_datetime', 'archived_at')
+    list_filter = ('status',)
+    search_fields = ('passenger_email', 'razorpay_order_id')
+
+admin.site.register(ArchivedFoodOrder)
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipient', 'status', 'attempts', 'next_attempt_at')
+    list_filter = ('status',)
+
+@admin.register(TravelPackage)
+class TravelPackageAdmin(admin.ModelAdmin):
+    list_display = ('title', 'category', 'price_per_person')
+    list_filter = ('category',)
+    search_fields = ('title',)
+
+@admin.register(PackageBooking)
+class PackageBookingAdmin(admin.ModelAdmin):
+    list_display = ('passenger_name', 'package', 'status', 'booked_at')
+    list_filter = ('status',)
+    list_select_related = ('package',)
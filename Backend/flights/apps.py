@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class FlightsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'flights'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (registers the model signal receivers)
+        from .db import configure_sqlite
+        from .metrics import install_query_timer, install_template_timer
+
+        connection_created.connect(configure_sqlite, dispatch_uid='flights.configure_sqlite')
+        connection_created.connect(install_query_timer, dispatch_uid='flights.install_query_timer')
+        if 'flights.middleware.PerformanceMetricsMiddleware' in settings.MIDDLEWARE:
+            install_template_timer()
@@ -0,0 +1,99 @@
+# flights/archive.py
+"""
+Hot/cold split of bookings.
+
+Bookings whose flight departed more than ARCHIVE_AFTER ago move, with their food
+orders, from flights_booking to flights_archivedbooking (ids kept), so the hot
+table and its indexes only hold bookings that can still change and stay small
+enough to live in the page cache. Archived rows are read back through the
+BookingHistory view (Booking UNION ALL ArchivedBooking) only when a caller asks
+for them with ?include_archived=1.
+
+The move goes `batch_size` bookings per transaction, oldest departure first
+(a range scan on booking_departure_idx), like the expiry sweep in flights.expiry.
+Rows are copied with INSERT ... SELECT and removed with plain DELETEs: nothing is
+loaded into Python, where building model instances would cost more than the move.
+"""
+import datetime
+import time
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .manifests import invalidate_on_commit
+from .models import ArchivedBooking, ArchivedFoodOrder, Booking, BookingHistory, FoodOrder
+
+ARCHIVE_AFTER = datetime.timedelta(days=90)
+BATCH_SIZE = 1000
+
+
+def _columns(model):
+    return ', '.join(connection.ops.quote_name(field.column) for field in model._meta.concrete_fields)
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def include_archived(params):
+    """True when the request asked for archived history too (?include_archived=1)."""
+    return params is not None and params.get('include_archived') in ('1', 'true')
+
+
+def booking_source(params):
+    """The manager reads go through: the hot table, or the history view when asked."""
+    return BookingHistory.objects if include_archived(params) else Booking.objects
+
+
+def departed_bookings(age=ARCHIVE_AFTER, now=None):
+    """Bookings whose flight departed more than `age` ago (a range scan on booking_departure_idx)."""
+    now = now or timezone.now()
+    return Booking.objects.filter(flight_departure_datetime__lt=now - age)
+
+
+def archive_chunk(ids, archived_at):
+    """Copies the bookings `ids` and their food orders to the archive, then deletes the originals."""
+    placeholders = ', '.join(['%s'] * len(ids))
+    booking, food_order = _table(Booking), _table(FoodOrder)
+    prepared_at = ArchivedBooking._meta.get_field('archived_at').get_db_prep_save(archived_at, connection)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {_table(ArchivedBooking)} ({_columns(Booking)}, archived_at) "
+            f"SELECT {_columns(Booking)}, %s FROM {booking} WHERE id IN ({placeholders})", [prepared_at, *ids])
+        cursor.execute(
+            f"INSERT INTO {_table(ArchivedFoodOrder)} ({_columns(FoodOrder)}) "
+            f"SELECT {_columns(FoodOrder)} FROM {food_order} WHERE booking_id IN ({placeholders})", ids)
+        cursor.execute(f"SELECT DISTINCT flight_id FROM {food_order} "
+                       f"WHERE booking_id IN ({placeholders}) AND flight_id IS NOT NULL", ids)
+        flight_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute(f"DELETE FROM {food_order} WHERE booking_id IN ({placeholders})", ids)
+        cursor.execute(f"DELETE FROM {booking} WHERE id IN ({placeholders})", ids)
+
+    # What food_order_written would have done for the deleted orders
+    invalidate_on_commit(flight_ids)
+
+
+def archive_in_batches(age=ARCHIVE_AFTER, batch_size=BATCH_SIZE, now=None, pause=0.0):
+    """
+    Moves departed bookings to the archive, yielding the number moved per batch.
+    Each batch is one transaction: a booking is either in the hot table or the
+    archive, never both or neither. `pause` seconds between batches leave the
+    database to other writers.
+    """
+    now = now or timezone.now()
+    departed = departed_bookings(age, now).order_by('flight_departure_datetime')
+    while True:
+        with transaction.atomic():
+            ids = list(departed.select_for_update(skip_locked=True).values_list('id', flat=True)[:batch_size])
+            if ids:
+                archive_chunk(ids, now)
+        if not ids:
+            break
+        yield len(ids)  # after the commit: the caller never runs inside the transaction
+        if pause:
+            time.sleep(pause)
+
+
+def archive_departed_bookings(**options):
+    """Runs archive_in_batches() to the end; returns the number of bookings archived."""
+    return sum(archive_in_batches(**options))
@@ -0,0 +1,112 @@
+# flights/async_views.py
+"""
+Async-native read paths for the two hottest screens, flight search and
+My Bookings, for deployments served by an ASGI server (gunicorn_asgi.conf.py):
+
+    /api/async/flights/?origin=Mumbai&destination=Delhi&ordering=price&limit=20
+    /api/async/flights/<id>/
+    /api/async/bookings/?email=asha@example.com&cancellable=1&limit=20
+
+They filter exactly like /api/flights/ and /api/bookings/?flat=1 and return the
+same JSON, but are plain Django coroutine views: while a request waits on the
+database (async ORM) or on a slow client, the worker's event loop serves other
+connections instead of the whole worker blocking.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework.exceptions import ValidationError
+
+from .cache import flight_cache
+from .filters import sparse_queryset
+from .models import Flight
+from .renderers import FastJSONRenderer
+from .serializers import BookingFlatSerializer, FlightSerializer
+from .views import FlightViewSet, my_bookings, search_flights
+
+MAX_LIMIT = 500
+renderer = FastJSONRenderer()
+
+
+def json_response(data, status=200):
+    # The DRF views' renderer, so both paths return identical bytes
+    return HttpResponse(renderer.render(data), status=status, content_type='application/json')
+
+
+def bounded_limit(params):
+    value = params.get('limit')
+    if value is None:
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValidationError({'limit': "Must be a whole number."})
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValidationError({'limit': f"Must be between 1 and {MAX_LIMIT}."})
+    return limit
+
+
+def flight_ordering(params):
+    """?ordering= like StableOrderingFilter: allowed fields only, `id` as the tie-breaker."""
+    ordering = [field.strip() for field in params.get('ordering', '').split(',') if field.strip()]
+    ordering = [field for field in ordering if field.lstrip('-') in FlightViewSet.ordering_fields] or ['id']
+    if not any(field.lstrip('-') == 'id' for field in ordering):
+        ordering.append('id')
+    return ordering
+
+
+async def cached(request, build):
+    """flight_cache read-through with ETag / If-None-Match, like CachedResponseMixin."""
+    entry = await sync_to_async(flight_cache.get, thread_sensitive=False)(request)
+    cache_status = 'HIT'
+    if entry is None:
+        try:
+            data = await build()
+        except ValidationError as err:
+            return json_response(err.detail, status=400)
+        if data is None:
+            return json_response({"detail": "No Flight matches the given query."}, status=404)
+        entry = await sync_to_async(flight_cache.set, thread_sensitive=False)(request, data)
+        cache_status = 'MISS'
+
+    if entry['etag'] in request.headers.get('If-None-Match', ''):
+        response = HttpResponse(status=304)
+    else:
+        response = json_response(entry['data'])
+    response['ETag'] = entry['etag']
+    response['X-Cache'] = cache_status
+    return response
+
+
+async def flight_search(request):
+    async def build():
+        params = request.GET
+        queryset = sparse_queryset(search_flights(params).order_by(*flight_ordering(params)), FlightSerializer, params)
+        limit = bounded_limit(params)
+        if limit:
+            queryset = queryset[:limit]
+        return FlightSerializer([flight async for flight in queryset], many=True, context={'request': request}).data
+
+    return await cached(request, build)
+
+
+async def flight_detail(request, pk):
+    async def build():
+        try:
+            flight = await sparse_queryset(Flight.objects.all(), FlightSerializer, request.GET).aget(pk=pk)
+            return FlightSerializer(flight, context={'request': request}).data
+        except Flight.DoesNotExist:
+            return None
+
+    return await cached(request, build)
+
+
+async def booking_list(request):
+    """My Bookings, serialized from values() rows like /api/bookings/?flat=1 (not cached: per user)."""
+    try:
+        limit = bounded_limit(request.GET)
+        rows = BookingFlatSerializer.rows(my_bookings(request.GET).order_by('-created_at', '-id'), request.GET)
+    except ValidationError as err:
+        return json_response(err.detail, status=400)
+    if limit:
+        rows = rows[:limit]
+    return json_response(BookingFlatSerializer([row async for row in rows]).data)
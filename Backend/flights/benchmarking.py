@@ -0,0 +1,185 @@
+# flights/benchmarking.py
+"""
+Shared helpers for the `bench_*` management commands.
+
+Every benchmark runs against a throwaway test database (never db.sqlite3),
+created and destroyed by `benchmark_database()`.
+"""
+import datetime
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+CITIES = [
+    "Mumbai", "Delhi", "Bangalore", "Hyderabad", "Chennai", "Kolkata", "Goa", "Kochi",
+    "Pune", "Jaipur", "Leh", "Ahmedabad", "Lucknow", "Dubai", "Singapore", "London",
+    "Bangkok", "Guwahati", "Varanasi", "Srinagar", "Patna", "Indore", "Nagpur", "Colombo",
+]
+AIRLINES = ["IndiGo", "Air India", "Akasa Air", "SpiceJet", "Air India Express"]
+
+
+@contextmanager
+def benchmark_database(on_disk=False):
+    """
+    Creates a fresh, migrated test database (DATABASES TEST settings) for the
+    duration of the block. `on_disk=True` puts a SQLite database in its own
+    temporary directory, so runs can't collide and WAL side files are cleaned up.
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    tmp_dir = None
+    if on_disk and connection.vendor == 'sqlite':
+        tmp_dir = tempfile.mkdtemp(prefix='travelgo-bench-')
+        test_settings['NAME'] = os.path.join(tmp_dir, 'bench.sqlite3')
+
+    setup_test_environment(debug=False)
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        test_settings['NAME'] = old_test_name
+        if tmp_dir:
+            for name in os.listdir(tmp_dir):
+                os.remove(os.path.join(tmp_dir, name))
+            os.rmdir(tmp_dir)
+
+
+def measure(fn, iterations, warmup=2):
+    """Calls `fn` repeatedly and returns the wall time of each call in seconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """p50/p99/mean in milliseconds."""
+    return {
+        'p50': percentile(samples, 50) * 1000,
+        'p99': percentile(samples, 99) * 1000,
+        'mean': statistics.fmean(samples) * 1000,
+    }
+
+
+def format_summary(label, samples):
+    stats = summarize(samples)
+    return f"{label:<40} p50 {stats['p50']:9.2f} ms   p99 {stats['p99']:9.2f} ms   n={len(samples)}"
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_insert(model, objects, batch_size=5000):
+    """Streams model instances into the table with bulk_create; returns the row count."""
+    total = 0
+    for batch in batched(objects, batch_size):
+        model.objects.bulk_create(batch, batch_size=batch_size)
+        total += len(batch)
+    return total
+
+
+def synthetic_flights(count, seed=42):
+    """Yields unsaved Flight rows spread over CITIES x AIRLINES with random prices."""
+    from .models import Flight
+
+    rng = random.Random(seed)
+    for i in range(count):
+        origin, destination = rng.sample(CITIES, 2)
+        yield Flight(
+            airline=rng.choice(AIRLINES),
+            origin=origin,
+            destination=destination,
+            price=rng.randrange(1500, 90000),
+            special_offer=f"Synthetic fare #{i}",
+        )
+
+
+@contextmanager
+def explicit_timestamps(model, *field_names):
+    """Lets bulk_create keep preset auto_now_add values (e.g. created_at spread over years)."""
+    fields = [model._meta.get_field(name) for name in field_names]
+    previous = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, previous):
+            field.auto_now_add = value
+
+
+def synthetic_bookings(count, flight_ids, emails, seed=42, start=None, span_days=730):
+    """
+    Yields unsaved Booking rows for random emails/flights with created_at spread
+    over `span_days`. Use inside `explicit_timestamps(Booking, 'created_at')`.
+    """
+    from .models import Booking
+
+    rng = random.Random(seed)
+    start = start or timezone.now() - datetime.timedelta(days=span_days)
+    span_seconds = span_days * 86400
+    for i in range(count):
+        created_at = start + datetime.timedelta(seconds=rng.randrange(span_seconds))
+        yield Booking(
+            flight_id=rng.choice(flight_ids),
+            passenger_name=f"Passenger {i}",
+            passenger_email=rng.choice(emails),
+            passenger_phone="9876543210",
+            seat_number=f"{rng.randint(1, 30)}{rng.choice('ABCDEF')}",
+            total_price=rng.randrange(1500, 90000),
+            status='BOOKED',
+            created_at=created_at,
+            flight_departure_datetime=created_at + datetime.timedelta(days=rng.randint(1, 60)),
+        )
+
+
+def run_threads(count, work):
+    """
+    Starts `count` threads running `work(n)` at the same instant and waits for them.
+    Each thread closes its own DB connection. Returns the elapsed wall time.
+    """
+    barrier = threading.Barrier(count + 1)
+
+    def target(n):
+        barrier.wait()
+        try:
+            work(n)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=target, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
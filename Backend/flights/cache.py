@@ -0,0 +1,138 @@
+# flights/cache.py
+import hashlib
+import json
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ResponseCache:
+    """
+    Read-through cache for serialized API responses, keyed by host + path + query params.
+
+    Entries live in the `CACHES[alias]` backend (a file cache shared by every process
+    on the host by default, Redis or per-process LocMem via settings), expire after
+    the backend TIMEOUT and are invalidated in O(1) by bumping a per-namespace
+    generation number that is part of every key. The generation lives in the same
+    backend, so a bump only reaches the processes that share it.
+    """
+
+    def __init__(self, namespace, alias='catalogue'):
+        self.namespace = namespace
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def generation_key(self):
+        return f"{self.namespace}:generation"
+
+    def generation(self):
+        generation = self.cache.get(self.generation_key)
+        if generation is None:
+            # Never restart at 1: entries from an evicted generation could still be around
+            generation = time.time_ns()
+            self.cache.set(self.generation_key, generation, timeout=None)
+        return generation
+
+    def invalidate(self):
+        """Bumps the generation and returns the new one."""
+        try:
+            return self.cache.incr(self.generation_key)
+        except ValueError:
+            generation = time.time_ns()
+            self.cache.set(self.generation_key, generation, timeout=None)
+            return generation
+
+    def key_for(self, request):
+        # DRF Request or a plain HttpRequest (the async views)
+        params = getattr(request, 'query_params', request.GET)
+        query = urlencode(sorted(params.lists()), doseq=True)
+        digest = hashlib.md5(f"{request.get_host()}{request.path}?{query}".encode()).hexdigest()
+        return f"{self.namespace}:{self.generation()}:{digest}"
+
+    def get(self, request):
+        entry = self.cache.get(self.key_for(request))
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, request, data):
+        body = json.dumps(data, sort_keys=True, default=str).encode()
+        entry = {'data': data, 'etag': f'"{hashlib.md5(body).hexdigest()}"'}
+        self.cache.set(self.key_for(request), entry)
+        return entry
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+flight_cache = ResponseCache('flights')
+
+# Package listings, one generation per category so a write only drops its own
+# category's pages (plus 'all': unfiltered lists and detail reads)
+_package_caches = {}
+_package_caches_lock = threading.Lock()
+
+
+def package_cache(category=None):
+    """The ResponseCache for one TravelPackage category (None: 'all'). Callers pass valid categories only."""
+    name = category or 'all'
+    cache = _package_caches.get(name)
+    if cache is None:
+        with _package_caches_lock:
+            cache = _package_caches.setdefault(name, ResponseCache(f'packages:{name}'))
+    return cache
+
+
+def package_cache_stats():
+    stats = [cache.stats() for cache in list(_package_caches.values())]
+    return {'hits': sum(s['hits'] for s in stats), 'misses': sum(s['misses'] for s in stats)}
+
+
+class CachedResponseMixin:
+    """
+    Serves list/retrieve from `response_cache` with ETag / If-None-Match support.
+    Only 200 responses are cached; writes go through untouched.
+    """
+    response_cache = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        if self.response_cache is None:
+            return handler(request, *args, **kwargs)
+
+        entry = self.response_cache.get(request)
+        cache_status = 'HIT'
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            entry = self.response_cache.set(request, response.data)
+            cache_status = 'MISS'
+
+        if entry['etag'] in request.headers.get('If-None-Match', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        elif cache_status == 'HIT':
+            response = Response(entry['data'])
+
+        response['ETag'] = entry['etag']
+        response['X-Cache'] = cache_status
+        return response
@@ -0,0 +1,152 @@
+# flights/catalogue.py
+"""
+Streaming flight catalogue loader used by `seed_flights`.
+
+Rows are read lazily from CSV/JSONL (constant memory) and written in batches,
+one short transaction per batch, so a multi-million row import never holds
+the write lock for long and the API keeps serving in between.
+"""
+import csv
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import connection, transaction
+
+from .fares import CENT
+from .models import Flight
+
+REQUIRED_COLUMNS = ('airline', 'origin', 'destination', 'price')
+# Keys per lookup query; stays below SQLite's bound-parameter limit
+LOOKUP_CHUNK = 300
+
+
+class MalformedRow:
+    """Stands in for a JSONL line that is not valid JSON; parse_flight() rejects it."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def read_rows(path, fmt=None):
+    """
+    Yields one dict per CSV row / JSONL line. `fmt` defaults to the file extension.
+    A line that does not decode yields a MalformedRow, so load_flights() skips and
+    reports it like a bad CSV row instead of aborting the import.
+    """
+    fmt = fmt or ('csv' if str(path).lower().endswith('.csv') else 'jsonl')
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as err:
+                        yield MalformedRow(f"invalid JSON ({err.msg})")
+
+
+def parse_flight(row):
+    """Turns a raw row into an unsaved Flight; raises ValueError on bad data."""
+    if isinstance(row, MalformedRow):
+        raise ValueError(row.error)
+    missing = [column for column in REQUIRED_COLUMNS if not str(row.get(column) or '').strip()]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    try:
+        price = Decimal(str(row['price']))
+        if not price.is_finite() or price < 0:
+            raise InvalidOperation
+        price = price.quantize(CENT)
+    except InvalidOperation:
+        raise ValueError(f"invalid price {row['price']!r}")
+    return Flight(
+        airline=row['airline'].strip(),
+        origin=row['origin'].strip(),
+        destination=row['destination'].strip(),
+        price=price,
+        special_offer=(row.get('special_offer') or '').strip(),
+    )
+
+
+def route_key(flight):
+    return (flight.airline, flight.origin, flight.destination)
+
+
+def upsert_batch(flights):
+    """
+    Updates flights whose (airline, origin, destination) already exists and creates
+    the rest. Returns (created, updated).
+
+    The key lookup and the updates are plain row-value SQL / executemany: at
+    thousands of rows per batch, building Q objects and bulk_update() CASE
+    expressions costs more than the database work itself.
+    """
+    # Last row wins when a key repeats inside the batch
+    incoming = {route_key(flight): flight for flight in flights}
+    keys = list(incoming)
+    table = connection.ops.quote_name(Flight._meta.db_table)
+
+    existing = {}
+    with connection.cursor() as cursor:
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[start:start + LOOKUP_CHUNK]
+            placeholders = ', '.join(['(%s, %s, %s)'] * len(chunk))
+            cursor.execute(
+                f"SELECT id, airline, origin, destination FROM {table} "
+                f"WHERE (airline, origin, destination) IN (VALUES {placeholders}) ORDER BY id",
+                [value for key in chunk for value in key],
+            )
+            for flight_id, *key in cursor.fetchall():
+                existing.setdefault(tuple(key), flight_id)
+
+        updates = []
+        for key, flight_id in existing.items():
+            new = incoming.pop(key)
+            updates.append((new.price, new.special_offer, flight_id))
+        if updates:
+            cursor.executemany(f"UPDATE {table} SET price = %s, special_offer = %s WHERE id = %s", updates)
+
+    Flight.objects.bulk_create(incoming.values())
+    return len(incoming), len(updates)
+
+
+def load_flights(rows, batch_size=1000, upsert=True, progress=None):
+    """
+    Loads raw rows in batches. `progress(stats)` is called after every batch.
+    Returns a stats dict: created, updated, skipped, errors, seconds.
+    """
+    stats = {'created': 0, 'updated': 0, 'skipped': 0, 'errors': [], 'seconds': 0.0}
+    started = time.perf_counter()
+    rows = iter(rows)
+    line = 0
+
+    while True:
+        raw = list(islice(rows, batch_size))
+        if not raw:
+            break
+        batch = []
+        for row in raw:
+            line += 1
+            try:
+                batch.append(parse_flight(row))
+            except (ValueError, AttributeError) as err:
+                stats['skipped'] += 1
+                if len(stats['errors']) < 20:
+                    stats['errors'].append(f"row {line}: {err}")
+
+        with transaction.atomic():
+            if upsert:
+                created, updated = upsert_batch(batch)
+            else:
+                created, updated = len(Flight.objects.bulk_create(batch)), 0
+        stats['created'] += created
+        stats['updated'] += updated
+        stats['seconds'] = time.perf_counter() - started
+        if progress:
+            progress(stats)
+
+    stats['seconds'] = time.perf_counter() - started
+    return stats
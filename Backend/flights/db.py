@@ -0,0 +1,17 @@
+# flights/db.py
+from django.conf import settings
+
+# PRAGMA values are interpolated, so only accept these simple tokens
+_PRAGMA_NAMES = {'journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size', 'temp_store'}
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created hook: applies settings.SQLITE_PRAGMAS to each new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if name not in _PRAGMA_NAMES or not str(value).replace('-', '').isalnum():
+                raise ValueError(f"Unsupported SQLite pragma {name}={value!r}")
+            cursor.execute(f"PRAGMA {name} = {value}")
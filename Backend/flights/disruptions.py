@@ -0,0 +1,84 @@
+# flights/disruptions.py
+"""
+Airline-side disruptions: cancel or reschedule every active booking on a
+flight with one UPDATE, and queue the passenger emails in bulk.
+"""
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .manifests import invalidate_on_commit
+from .models import FULL_REFUND, Booking
+from .outbox import queue_emails
+from .seats import ACTIVE_STATUSES, SeatUnavailable
+
+CANCEL = 'cancel'
+RESCHEDULE = 'reschedule'
+
+
+def disrupt_flight(flight, action, departure, new_departure=None):
+    """
+    Cancels (or moves to `new_departure`) all PENDING/BOOKED bookings on one
+    `departure` of `flight`. A Flight is a route flown on many departures, so the
+    departure is always required: a disruption never spills over to the others.
+
+    Returns a stats dict. Raises SeatUnavailable when a reschedule would put two
+    passengers in the same seat on the new departure.
+    """
+    if action not in (CANCEL, RESCHEDULE):
+        raise ValueError(f"Unknown disruption action: {action}")
+    if departure is None:
+        raise ValueError("A disruption needs the affected departure.")
+    if action == RESCHEDULE and new_departure is None:
+        raise ValueError("A reschedule needs the new departure.")
+
+    now = timezone.now()
+    affected = Booking.objects.filter(flight=flight, status__in=ACTIVE_STATUSES, flight_departure_datetime=departure)
+
+    with transaction.atomic():
+        # One read for the notification data (refund text computed by the database),
+        # locking the rows on PostgreSQL so the UPDATE touches exactly these bookings.
+        rows = list(
+            affected.select_for_update()
+            .with_refund_status(now)
+            .values_list('id', 'passenger_name', 'passenger_email', 'seat_number', 'refund_status')
+        )
+        ids = [row[0] for row in rows]
+
+        if action == CANCEL:
+            updated = Booking.objects.filter(pk__in=ids).update(status='CANCELLED')
+        else:
+            try:
+                updated = Booking.objects.filter(pk__in=ids).update(flight_departure_datetime=new_departure)
+            except IntegrityError as err:
+                raise SeatUnavailable("Some seats are already taken on the new departure.") from err
+
+        emails = notifications(flight, action, rows, new_departure)
+        queue_emails(emails)
+        # The UPDATE bypasses booking_written: the meals left (or moved departure) all the same
+        if updated:
+            invalidate_on_commit({flight.id})
+
+    return {
+        'action': action,
+        'bookings': updated,
+        'notifications': len(emails),
+        'full_refunds': sum(1 for row in rows if row[4] == FULL_REFUND) if action == CANCEL else 0,
+    }
+
+
+def notifications(flight, action, rows, new_departure=None):
+    """queue_emails() tuples for the disrupted bookings (flight data is shared, not re-fetched)."""
+    base = {'airline': flight.airline, 'origin': flight.origin, 'destination': flight.destination}
+    if action == CANCEL:
+        subject, template = 'Flight Cancelled', 'emails/cancellation_email.html'
+    else:
+        subject, template = f'Schedule Change: {flight.airline}', 'emails/booking_confirmation.html'
+        base['departure_time'] = new_departure.strftime('%d %b %Y, %H:%M')
+
+    emails = []
+    for _, name, email, seat, refund in rows:
+        context = {**base, 'passenger_name': name, 'seat_number': seat}
+        if action == CANCEL:
+            context['refund_status'] = refund
+        emails.append((subject, template, context, email))
+    return emails
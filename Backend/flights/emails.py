@@ -0,0 +1,99 @@
+# flights/emails.py
+"""
+Branded HTML emails.
+
+Templates are compiled once per process together with a plain-text twin
+(the template source with the HTML stripped), so sending an email is two
+renders instead of render + strip_tags over the whole document. The logo is
+read and MIME-encoded once and only reloaded when the file's mtime changes.
+"""
+import os
+import threading
+
+from django.conf import settings
+from email.mime.image import MIMEImage
+from django.core.mail import EmailMultiAlternatives
+from django.template import engines
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+LOGO_PATH = os.path.join(settings.BASE_DIR, 'flights', 'TravelGo_logo.png')
+
+
+class EmailRenderer:
+    """Per-process cache of compiled (html, text) template pairs and the logo MIME part."""
+
+    def __init__(self, logo_path=LOGO_PATH):
+        self.logo_path = logo_path
+        self.templates = {}
+        self._logo = (None, None)  # (mtime, MIMEImage)
+        self._lock = threading.Lock()
+
+    def compile(self, name):
+        html = get_template(name)
+        # Plain-text variant: strip the markup from the *source* once. Autoescape is
+        # off because HTML entities have no meaning in the text/plain part.
+        text_source = strip_tags(html.template.source)
+        text = engines['django'].from_string('{% autoescape off %}' + text_source + '{% endautoescape %}')
+        return html, text
+
+    def render(self, name, context):
+        """Returns (html, text) for the template."""
+        pair = self.templates.get(name)
+        if pair is None:
+            pair = self.templates[name] = self.compile(name)
+        html, text = pair
+        return html.render(context), text.render(context)
+
+    def logo(self):
+        """
+        The inline logo part, or None when the file is missing. The same MIMEImage
+        is attached to every message; it is never modified after creation.
+        """
+        try:
+            mtime = os.stat(self.logo_path).st_mtime_ns
+        except OSError:
+            return None
+        cached_mtime, part = self._logo
+        if cached_mtime == mtime:
+            return part
+
+        with self._lock:
+            if self._logo[0] != mtime:
+                try:
+                    with open(self.logo_path, 'rb') as f:
+                        part = MIMEImage(f.read())
+                except OSError:
+                    print("⚠️ Attachment failed - continuing without image.")
+                    return None
+                part.add_header('Content-ID', '<logo_image>')
+                part.add_header('Content-Disposition', 'inline', filename='TravelGo_logo.png')
+                self._logo = (mtime, part)
+            return self._logo[1]
+
+    def clear(self):
+        with self._lock:
+            self.templates.clear()
+            self._logo = (None, None)
+
+
+renderer = EmailRenderer()
+
+
+def build_professional_email(subject, context, template, recipient_email, connection=None):
+    """Builds the branded HTML email (with the inline CID logo) without sending it."""
+    html_content, text_content = renderer.render(template, context)
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[recipient_email],
+        connection=connection,
+    )
+    email.attach_alternative(html_content, "text/html")
+
+    logo = renderer.logo()
+    if logo is not None:
+        email.attach(logo)
+
+    return email
@@ -0,0 +1,59 @@
+# flights/expiry.py
+"""
+Expiry of bookings that were never paid for.
+
+A PENDING booking holds its seat (unique_active_seat_per_departure), so one
+abandoned at the payment step blocks that seat until it is swept to EXPIRED,
+which frees it. The sweep walks booking_status_created_idx oldest first and
+updates at most `batch_size` rows per statement, so the write lock is only ever
+held for one small UPDATE and bookings keep flowing while it runs.
+"""
+import datetime
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from .manifests import invalidate_on_commit
+from .models import Booking
+
+# How long a booking may wait for its payment
+PENDING_TTL = datetime.timedelta(minutes=30)
+BATCH_SIZE = 1000
+
+
+def stale_bookings(status, ttl=PENDING_TTL, now=None):
+    """`status` bookings created more than `ttl` ago (a range scan on booking_status_created_idx)."""
+    now = now or timezone.now()
+    return Booking.objects.filter(status=status, created_at__lt=now - ttl)
+
+
+def expire_in_batches(statuses=('PENDING',), ttl=PENDING_TTL, batch_size=BATCH_SIZE, now=None, pause=0.0):
+    """
+    Marks stale bookings EXPIRED, yielding the number updated per batch.
+    `pause` seconds between batches leave the database to other writers.
+    """
+    now = now or timezone.now()
+    for status in statuses:
+        stale = stale_bookings(status, ttl, now).order_by('created_at')
+        while True:
+            # The batch is locked from the SELECT on (SQLite: IMMEDIATE transactions take the write
+            # lock at BEGIN; PostgreSQL: FOR UPDATE), so a payment can't confirm one in between.
+            # The UPDATE goes by primary key alone: with `status = ?` added, SQLite walks the
+            # status index over every PENDING row instead.
+            with transaction.atomic():
+                rows = list(stale.select_for_update(skip_locked=True).values_list('id', 'flight_id')[:batch_size])
+                ids = [booking_id for booking_id, _ in rows]
+                expired = Booking.objects.filter(pk__in=ids).update(status='EXPIRED') if ids else 0
+                # An expired booking's meals come off the kitchen manifests
+                invalidate_on_commit(flight_id for _, flight_id in rows)
+            if not ids:
+                break
+            yield expired  # after the commit: the caller never runs inside the transaction
+            if pause:
+                time.sleep(pause)
+
+
+def expire_stale_bookings(**options):
+    """Runs expire_in_batches() to the end; returns the number of bookings expired."""
+    return sum(expire_in_batches(**options))
@@ -0,0 +1,119 @@
+# flights/exports.py
+"""
+Streaming finance exports (razorpay order/payment ids) of bookings and food
+orders as CSV or JSONL, optionally gzipped on the fly.
+
+Rows come from values_list().iterator(chunk_size=...) and are encoded one chunk
+at a time, so memory stays flat however many rows are exported. Used by
+/api/exports/<kind>.<csv|jsonl>[.gz] and the `export_finance` command.
+Rows moved by `archive_bookings` are only included when asked for.
+"""
+import csv
+import datetime
+import io
+import zlib
+from itertools import chain
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import ArchivedBooking, ArchivedFoodOrder, Booking, FoodOrder
+
+CHUNK_SIZE = 2000
+FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+# kind -> (model, timestamp field used by the date range, exported columns)
+EXPORTS = {
+    'bookings': (Booking, 'created_at', (
+        'id', 'created_at', 'status', 'razorpay_order_id', 'razorpay_payment_id', 'total_price',
+        'passenger_name', 'passenger_email', 'flight_id', 'seat_number', 'flight_departure_datetime',
+    )),
+    'food-orders': (FoodOrder, 'ordered_at', (
+        'id', 'ordered_at', 'booking_id', 'flight_id', 'booking__razorpay_order_id', 'booking__razorpay_payment_id',
+        'price', 'food_type', 'passenger_name', 'flight_number', 'seat_number',
+    )),
+}
+# kind -> the archive table holding the same columns (see flights.archive)
+ARCHIVES = {'bookings': ArchivedBooking, 'food-orders': ArchivedFoodOrder}
+
+
+def parse_bound(value):
+    """ISO date or datetime -> aware datetime (a bare date means its midnight)."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"{value!r} is not an ISO 8601 date or datetime.")
+        parsed = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def export_rows(kind, start=None, end=None, chunk_size=CHUNK_SIZE, include_archived=False):
+    """
+    (columns, row iterator) for `kind`, filtered to start <= timestamp < end, in id
+    order; with `include_archived`, followed by the archived rows in id order.
+    """
+    model, timestamp, columns = EXPORTS[kind]
+    sources = (model, ARCHIVES[kind]) if include_archived else (model,)
+    querysets = [source.objects.order_by('pk') for source in sources]
+    if start:
+        querysets = [queryset.filter(**{f'{timestamp}__gte': start}) for queryset in querysets]
+    if end:
+        querysets = [queryset.filter(**{f'{timestamp}__lt': end}) for queryset in querysets]
+    return columns, chain.from_iterable(
+        queryset.values_list(*columns).iterator(chunk_size=chunk_size) for queryset in querysets)
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def encode_csv(columns, rows, chunk_size=CHUNK_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in _chunks(rows, chunk_size):
+        writer.writerows([value.isoformat() if isinstance(value, datetime.datetime) else value for value in row]
+                         for row in chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()  # header only: nothing matched
+
+
+def encode_jsonl(columns, rows, chunk_size=CHUNK_SIZE):
+    encoder = DjangoJSONEncoder()
+    for chunk in _chunks(rows, chunk_size):
+        yield ''.join(encoder.encode(dict(zip(columns, row))) + '\n' for row in chunk).encode()
+
+
+def gzip_stream(chunks, level=6):
+    """Compresses a byte stream chunk by chunk into one gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(kind, fmt='csv', start=None, end=None, compress=False, chunk_size=CHUNK_SIZE,
+                  include_archived=False):
+    """The encoded (and optionally gzipped) export as an iterator of bytes."""
+    columns, rows = export_rows(kind, start, end, chunk_size, include_archived)
+    encode = encode_csv if fmt == 'csv' else encode_jsonl
+    stream = encode(columns, rows, chunk_size)
+    return gzip_stream(stream) if compress else stream
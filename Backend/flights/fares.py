@@ -0,0 +1,61 @@
+# flights/fares.py
+"""
+Maintenance of RouteFareSummary, the per-route price aggregates behind
+/api/fares/summary. Reads of the summary cost O(routes) instead of O(flights).
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min
+
+from .models import Flight, RouteFareSummary
+
+CENT = Decimal('0.01')
+
+
+def route_aggregates(flights):
+    """One GROUP BY over `flights`: origin, destination, min/max/avg price, counts."""
+    return (flights.order_by().values('origin', 'destination').annotate(
+        min_price=Min('price'),
+        max_price=Max('price'),
+        avg_price=Avg('price'),
+        flight_count=Count('id'),
+        airline_count=Count('airline', distinct=True),
+    ))
+
+
+def summary_row(aggregate):
+    return RouteFareSummary(**{**aggregate, 'avg_price': Decimal(str(aggregate['avg_price'])).quantize(CENT)})
+
+
+def refresh_routes(routes):
+    """
+    Recomputes the summary of each (origin, destination) from its flights (a range
+    scan on flight_route_price_idx). The summary row is locked first, so
+    concurrent refreshes of one route apply in order and the last one wins with
+    the complete picture.
+    """
+    for origin, destination in routes:
+        with transaction.atomic():
+            route = {'origin': origin, 'destination': destination}
+            list(RouteFareSummary.objects.select_for_update().filter(**route))
+            # Not .first(): its ORDER BY pk would end up in the GROUP BY
+            aggregate = next(iter(route_aggregates(Flight.objects.filter(**route))), None)
+            if aggregate is None:
+                RouteFareSummary.objects.filter(**route).delete()
+                continue
+            RouteFareSummary.objects.bulk_create(
+                [summary_row(aggregate)],
+                update_conflicts=True,
+                unique_fields=['origin', 'destination'],
+                update_fields=['min_price', 'max_price', 'avg_price', 'flight_count', 'airline_count', 'updated_at'],
+            )
+
+
+def rebuild_fare_summary(batch_size=1000):
+    """Replaces the whole summary with one GROUP BY over the catalogue. Returns the route count."""
+    rows = [summary_row(aggregate) for aggregate in route_aggregates(Flight.objects.all())]
+    with transaction.atomic():
+        RouteFareSummary.objects.all().delete()
+        RouteFareSummary.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
@@ -0,0 +1,43 @@
+# flights/filters.py
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+
+class StableOrderingFilter(OrderingFilter):
+    """OrderingFilter that always appends `id` so equal sort keys have a fixed order."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering = list(ordering) + ['id']
+        return ordering
+
+
+def sparse_queryset(queryset, serializer_class, params, ordering=()):
+    """
+    `queryset` narrowed with only() to the columns behind `?fields=` (see
+    serializers.SparseFieldsetMixin), keeping `ordering` and the queryset's own
+    sort keys loaded so cursors don't fetch deferred fields row by row.
+    """
+    columns = serializer_class.sparse_columns(params)
+    if columns is None:
+        return queryset
+    columns += [field.lstrip('-') for field in (*queryset.query.order_by, *ordering) if isinstance(field, str)]
+    related = {column.split('__')[0] for column in columns if '__' in column}
+    if queryset.query.select_related:
+        # Drop joins the requested fields don't need (select_related() with no args would mean all)
+        queryset = queryset.select_related(None)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns)
+
+
+class SparseFieldsFilter(BaseFilterBackend):
+    """Applies sparse_queryset() to GET lists and lookups; goes last in filter_backends."""
+
+    def filter_queryset(self, request, queryset, view):
+        serializer_class = view.get_serializer_class()
+        if request.method != 'GET' or not hasattr(serializer_class, 'sparse_columns'):
+            return queryset
+        ordering = getattr(view.pagination_class, 'ordering', None) or ()
+        return sparse_queryset(queryset, serializer_class, request.query_params,
+                               (ordering,) if isinstance(ordering, str) else ordering)
@@ -0,0 +1,130 @@
+# flights/idempotency.py
+"""
+Idempotency-Key support for POSTs that create things (bookings).
+
+A finished response is stored in IdempotencyKey and mirrored in a per-process
+LRU, so a retry is answered from memory (or one indexed read) without running
+the serializer, the transaction or the email again.
+
+Rows are kept for IDEMPOTENCY_KEY_TTL_HOURS (retries come within minutes) and
+then deleted in batches by `prune_idempotency_keys`.
+"""
+import datetime
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import IdempotencyKey
+
+MAX_KEY_LENGTH = 255
+KEY_TTL = datetime.timedelta(hours=getattr(settings, 'IDEMPOTENCY_KEY_TTL_HOURS', 24))
+PRUNE_BATCH_SIZE = 1000
+
+
+class KeyReused(Exception):
+    """The key was already used for a request with a different body."""
+
+
+class DuplicateRequest(Exception):
+    """Another request with the same key committed first; replay its response."""
+
+
+class LRUCache:
+    """Small thread-safe LRU of scope/key -> (fingerprint, status_code, response)."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+front_cache = LRUCache(getattr(settings, 'IDEMPOTENCY_CACHE_SIZE', 10_000))
+
+
+def fingerprint(body):
+    return hashlib.sha256(body).hexdigest()
+
+
+def lookup(scope, key, request_fingerprint):
+    """
+    The stored (status_code, response) for the key, or None if it is new.
+    Raises KeyReused when the key belongs to a different request body.
+    """
+    stored = front_cache.get((scope, key))
+    if stored is None:
+        row = (IdempotencyKey.objects.filter(scope=scope, key=key, status_code__isnull=False)
+               .values_list('fingerprint', 'status_code', 'response').first())
+        if row is None:
+            return None
+        stored = row
+        front_cache.set((scope, key), stored)
+
+    stored_fingerprint, status_code, response = stored
+    if stored_fingerprint != request_fingerprint:
+        raise KeyReused("This Idempotency-Key was already used with a different request body.")
+    return status_code, response
+
+
+def claim(scope, key, request_fingerprint):
+    """
+    Inserts the key at the start of the caller's transaction. A concurrent request
+    with the same key waits on the unique index and gets DuplicateRequest once
+    the first one commits.
+    """
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(scope=scope, key=key, fingerprint=request_fingerprint)
+    except IntegrityError as err:
+        raise DuplicateRequest(key) from err
+
+
+def complete(record, status_code, response):
+    """Stores the response on the claimed row; the LRU is filled once it commits."""
+    # Store exactly what DRF rendered the first time (e.g. Decimal -> number)
+    response = json.loads(json.dumps(response, cls=JSONEncoder))
+    record.status_code = status_code
+    record.response = response
+    record.save(update_fields=['status_code', 'response'])
+    stored = (record.fingerprint, status_code, response)
+    transaction.on_commit(lambda: front_cache.set((record.scope, record.key), stored))
+
+
+def expired_keys(ttl=KEY_TTL, now=None):
+    """Keys created more than `ttl` ago (a range scan on idempotency_created_idx)."""
+    now = now or timezone.now()
+    return IdempotencyKey.objects.filter(created_at__lt=now - ttl)
+
+
+def prune_in_batches(ttl=KEY_TTL, batch_size=PRUNE_BATCH_SIZE, now=None):
+    """Deletes expired keys oldest first, at most `batch_size` per DELETE; yields the number deleted."""
+    expired = expired_keys(ttl, now).order_by('created_at')
+    while True:
+        ids = list(expired.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        deleted, _ = IdempotencyKey.objects.filter(pk__in=ids).delete()
+        yield deleted
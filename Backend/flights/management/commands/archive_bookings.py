@@ -0,0 +1,28 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from flights.archive import ARCHIVE_AFTER, BATCH_SIZE, archive_in_batches, departed_bookings
+
+
+class Command(BaseCommand):
+    help = 'Moves bookings (and their food orders) whose flight departed long ago to the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, default=ARCHIVE_AFTER.days,
+                            help='Archive bookings whose flight departed more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Bookings moved per transaction')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        age = datetime.timedelta(days=options['days'])
+
+        if options['dry_run']:
+            self.stdout.write(f"{departed_bookings(age).count():,} bookings would be archived")
+            return
+
+        total = sum(archive_in_batches(age, options['batch_size'], pause=options['pause']))
+        self.stdout.write(self.style.SUCCESS(f"✅ Archived {total:,} bookings departed over {options['days']:g} days ago"))
@@ -0,0 +1,103 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from flights import middleware
+from flights.benchmarking import (benchmark_database, bulk_insert, explicit_timestamps, synthetic_bookings,
+                                  synthetic_flights)
+from flights.models import Booking, Flight
+from flights.renderers import FastJSONRenderer, orjson
+from flights.views import BookingViewSet, FlightViewSet
+
+EMAIL = "frequent.flyer@example.com"
+# What the search results and My Bookings screens actually show
+FLIGHT_FIELDS = 'id,airline,origin,destination,price'
+BOOKING_FIELDS = ('id,flight_origin,flight_destination,flight_airline,seat_number,status,'
+                  'flight_departure_datetime,total_price,can_cancel')
+
+
+@contextmanager
+def renderer(view_classes, renderer_class):
+    previous = [view.renderer_classes for view in view_classes]
+    for view in view_classes:
+        view.renderer_classes = [renderer_class]
+    try:
+        yield
+    finally:
+        for view, classes in zip(view_classes, previous):
+            view.renderer_classes = classes
+
+
+class Command(BaseCommand):
+    help = ('Bytes on the wire and CPU time per 10k-row response: DRF JSONRenderer with every field vs '
+            'FastJSONRenderer, ?fields= and gzip/brotli compression')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--iterations', type=int, default=10)
+
+    @override_settings(METRICS_SAMPLE_RATE=0.0, THROTTLE_ENABLED=False)
+    def handle(self, *args, **options):
+        rows, iterations = options['rows'], options['iterations']
+        with benchmark_database():
+            bulk_insert(Flight, synthetic_flights(rows))
+            flight_ids = list(Flight.objects.values_list('id', flat=True))
+            with explicit_timestamps(Booking, 'created_at'):
+                bulk_insert(Booking, synthetic_bookings(rows, flight_ids, [EMAIL]))
+
+            client = Client()
+            cache, FlightViewSet.response_cache = FlightViewSet.response_cache, None  # time the work, not the cache
+            try:
+                for name, url, params in (
+                    ("flights", '/api/flights/', {'fields': FLIGHT_FIELDS}),
+                    ("My Bookings", '/api/bookings/', {'email': EMAIL, 'fields': BOOKING_FIELDS}),
+                ):
+                    self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}: {rows:,} rows per response"))
+                    self.run_suite(client, url, params, iterations)
+            finally:
+                FlightViewSet.response_cache = cache
+
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed: FastJSONRenderer used the stdlib encoder"))
+        self.stdout.write(self.style.SUCCESS("✅ Same JSON from every variant"))
+
+    def run_suite(self, client, url, sparse, iterations):
+        full = {key: value for key, value in sparse.items() if key != 'fields'}
+        variants = [
+            ("before: JSONRenderer, every field", JSONRenderer, full, ''),
+            ("FastJSONRenderer, every field", FastJSONRenderer, full, ''),
+            ("FastJSONRenderer, ?fields=", FastJSONRenderer, sparse, ''),
+            ("FastJSONRenderer, ?fields=, gzip", FastJSONRenderer, sparse, 'gzip'),
+        ]
+        if middleware.brotli is not None:
+            variants.append(("FastJSONRenderer, ?fields=, brotli", FastJSONRenderer, sparse, 'br'))
+
+        bodies = {}
+        for label, renderer_class, params, encoding in variants:
+            with renderer((FlightViewSet, BookingViewSet), renderer_class):
+                response = client.get(url, params, HTTP_ACCEPT_ENCODING=encoding)
+                samples = []
+                for _ in range(iterations):
+                    started = time.process_time()
+                    client.get(url, params, HTTP_ACCEPT_ENCODING=encoding)
+                    samples.append(time.process_time() - started)
+            size = len(response.content)
+            self.stdout.write(f"{label:<38} {size / 1024:9,.0f} KiB   CPU p50 {statistics.median(samples) * 1000:8.1f} ms")
+            if not encoding:
+                bodies.setdefault(params is sparse, set()).add(response.content)
+        assert all(len(contents) == 1 for contents in bodies.values())
+
+        # The renderer alone, on the same serialized data
+        data = client.get(url, full).data
+        for renderer_class in (JSONRenderer, FastJSONRenderer):
+            instance, samples = renderer_class(), []
+            for _ in range(iterations):
+                started = time.process_time()
+                instance.render(data)
+                samples.append(time.process_time() - started)
+            label = f"render only: {renderer_class.__name__}"
+            self.stdout.write(f"{label:<38} {'':>13}   CPU p50 {statistics.median(samples) * 1000:8.1f} ms")
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from flights.benchmarking import (benchmark_database, bulk_insert, explicit_timestamps, percentile,
+                                  synthetic_bookings, synthetic_flights)
+from flights.models import Booking, Flight
+
+EMAILS = [f"user{i}@example.com" for i in range(2000)]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def slow_client(port, stop):
+    """Sends its request headers a byte every half second, like a client on a bad mobile link."""
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    except OSError:
+        return
+    request = f"GET /api/flights/1/ HTTP/1.1\r\nHost: 127.0.0.1\r\nX-Padding: {'x' * 200}\r\n\r\n".encode()
+    try:
+        for byte in request:
+            if stop.is_set():
+                break
+            writer.write(bytes([byte]))
+            await writer.drain()
+            await asyncio.sleep(0.5)
+    except OSError:
+        pass
+    finally:
+        writer.close()
+
+
+async def fast_clients(httpx, base_url, path, connections, duration):
+    """`connections` clients requesting My Bookings back to back for `duration` seconds."""
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=5.0) as client:
+        async def run(n):
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path, params={'email': EMAILS[n % len(EMAILS)]})
+                    if response.status_code == 200:
+                        latencies.append(time.perf_counter() - started)
+                    else:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+        await asyncio.gather(*(run(n) for n in range(connections)))
+    return latencies, errors
+
+
+async def load(httpx, port, path, connections, slow, duration):
+    stop = asyncio.Event()
+    trickling = [asyncio.create_task(slow_client(port, stop)) for _ in range(slow)]
+    await asyncio.sleep(0.5)  # let the slow clients grab their connections first
+    try:
+        return await fast_clients(httpx, f"http://127.0.0.1:{port}", path, connections, duration)
+    finally:
+        stop.set()
+        await asyncio.gather(*trickling)
+
+
+class Command(BaseCommand):
+    help = ('Concurrent-connection load test: the current WSGI setup (gunicorn sync workers) vs '
+            'gunicorn_asgi.conf.py (uvicorn workers + async views), with and without slow clients')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Processes for both servers')
+        parser.add_argument('--connections', type=int, default=50, help='Concurrent fast clients')
+        parser.add_argument('--slow-clients', type=int, default=4)
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per run')
+        parser.add_argument('--bookings', type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        try:
+            import httpx
+        except ImportError:
+            raise CommandError("The load test needs httpx: pip install httpx")
+
+        servers = [
+            ("WSGI: gunicorn sync workers", '/api/bookings/?flat=1',
+             ['travelgo_django.wsgi']),
+            ("ASGI: gunicorn_asgi.conf.py", '/api/async/bookings/',
+             ['travelgo_django.asgi:application', '-c', 'gunicorn_asgi.conf.py']),
+        ]
+        with benchmark_database(on_disk=True) as connection:
+            bulk_insert(Flight, synthetic_flights(500))
+            flight_ids = list(Flight.objects.values_list('id', flat=True))
+            with explicit_timestamps(Booking, 'created_at'):
+                bulk_insert(Booking, synthetic_bookings(options['bookings'], flight_ids, EMAILS))
+            env = {**os.environ, 'SQLITE_PATH': str(connection.settings_dict['NAME']), 'METRICS_SAMPLE_RATE': '0', 'THROTTLE_ENABLED': '0'}
+
+            for label, path, app in servers:
+                port = free_port()
+                server = subprocess.Popen(
+                    [sys.executable, '-m', 'gunicorn', *app, '--workers', str(options['workers']),
+                     '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+                    cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                try:
+                    self.wait_until_up(httpx, port, server)
+                    for slow in (0, options['slow_clients']):
+                        latencies, errors = asyncio.run(load(
+                            httpx, port, path, options['connections'], slow, options['duration']))
+                        self.report(label, slow, latencies, errors, options['duration'])
+                finally:
+                    server.terminate()
+                    server.wait(timeout=30)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {options['connections']} concurrent clients, {options['workers']} workers per server"))
+
+    def wait_until_up(self, httpx, port, server, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError("The server exited during startup (is gunicorn/uvicorn installed?)")
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/api/metrics", timeout=1.0)
+                return
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        raise CommandError(f"The server did not come up on port {port}")
+
+    def report(self, label, slow, latencies, errors, duration):
+        if latencies:
+            latency = (f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+                       f"p99 {percentile(latencies, 99) * 1000:7.1f} ms")
+        else:
+            latency = "no successful requests"
+        self.stdout.write(f"{label:<30} {slow:2} slow clients  {len(latencies) / duration:8,.0f} req/s  "
+                          f"{latency}  {errors:5} errors/timeouts")
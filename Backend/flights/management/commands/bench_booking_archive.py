@@ -0,0 +1,98 @@
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+
+from flights.archive import ARCHIVE_AFTER, archive_in_batches
+from flights.benchmarking import (
+    benchmark_database, bulk_insert, explicit_timestamps, format_summary, measure,
+    synthetic_bookings, synthetic_flights,
+)
+from flights.models import ArchivedBooking, Booking, Flight, FoodOrder
+
+
+def table_megabytes(*names):
+    """Pages held by the tables and their indexes (SQLite's dbstat), in MB."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT SUM(pgsize) FROM dbstat WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name IN (%s))"
+            % ', '.join('%s' for _ in names), names)
+        return (cursor.fetchone()[0] or 0) / 1e6
+
+
+def synthetic_food_orders(booking_ids, seed=42):
+    rng = random.Random(seed)
+    for booking_id, flight_id, seat_number in booking_ids:
+        yield FoodOrder(booking_id=booking_id, flight_id=flight_id, passenger_name="Passenger",
+                        flight_number=f"TG-{flight_id}", seat_number=seat_number,
+                        food_type=rng.choice(("VEG", "NON-VEG", "JAIN")), price=350)
+
+
+class Command(BaseCommand):
+    help = 'Booking queries on one big hot table vs after archiving departed bookings, and the archive move itself'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=1_000_000)
+        parser.add_argument('--emails', type=int, default=50_000)
+        parser.add_argument('--days', type=int, default=ARCHIVE_AFTER.days)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=20)
+
+    @override_settings(THROTTLE_ENABLED=False, METRICS_SAMPLE_RATE=0.0)
+    def handle(self, *args, **options):
+        emails = [f"user{i}@example.com" for i in range(options['emails'])]
+        with benchmark_database(on_disk=True):
+            flight_ids = [f.id for f in Flight.objects.bulk_create(synthetic_flights(2000))]
+            self.stdout.write(f"⏳ Loading {options['bookings']:,} bookings (two years of departures)...")
+            with explicit_timestamps(Booking, 'created_at'):
+                bulk_insert(Booking, synthetic_bookings(options['bookings'], flight_ids, emails))
+            # A meal on every fifth booking, so the archive moves food orders too
+            bulk_insert(FoodOrder, synthetic_food_orders(
+                list(Booking.objects.values_list('id', 'flight_id', 'seat_number'))[::5]))
+            connection.cursor().execute("ANALYZE")
+
+            client = Client()
+            email = emails[0]
+            expected = [b['id'] for b in client.get('/api/bookings/', {'email': email}).json()]
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"\nBefore: {Booking.objects.count():,} bookings in the hot table "
+                f"({table_megabytes('flights_booking'):.0f} MB with indexes)"))
+            self.run_suite(client, email, options['iterations'])
+
+            started = time.perf_counter()
+            moved = sum(archive_in_batches(datetime.timedelta(days=options['days']), options['batch_size']))
+            elapsed = time.perf_counter() - started
+            connection.cursor().execute("ANALYZE")
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"\nArchived {moved:,} bookings in {elapsed:.1f}s ({moved / elapsed:,.0f} bookings/s, "
+                f"batches of {options['batch_size']:,})"))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"\nAfter: {Booking.objects.count():,} bookings in the hot table "
+                f"({table_megabytes('flights_booking'):.0f} MB with indexes), "
+                f"{ArchivedBooking.objects.count():,} archived "
+                f"({table_megabytes('flights_archivedbooking'):.0f} MB)"))
+            self.run_suite(client, email, options['iterations'])
+
+            history = measure(lambda: client.get('/api/bookings/', {'email': email, 'include_archived': '1'}),
+                              options['iterations'])
+            self.stdout.write(format_summary("My Bookings ?include_archived=1", history))
+
+            restored = [b['id'] for b in client.get('/api/bookings/', {'email': email, 'include_archived': '1'}).json()]
+            assert restored == expected, "include_archived must return the pre-archive history"
+        self.stdout.write(self.style.SUCCESS("✅ Archived history reads back identically"))
+
+    def run_suite(self, client, email, iterations):
+        runs = [
+            ("My Bookings (hot only)", lambda: client.get('/api/bookings/', {'email': email})),
+            ("cancellable bookings count", lambda: Booking.objects.cancellable().count()),
+            ("admin: count all", lambda: Booking.objects.count()),
+            ("admin: status filter count", lambda: Booking.objects.filter(status='BOOKED').count()),
+            ("admin: name search (scan)", lambda: Booking.objects.filter(passenger_name__icontains='99999').count()),
+        ]
+        for label, run in runs:
+            self.stdout.write(format_summary(label, measure(run, iterations, warmup=1)))
@@ -0,0 +1,108 @@
+import datetime
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.db.models import F
+from django.utils import timezone
+
+from flights.benchmarking import (benchmark_database, bulk_insert, explicit_timestamps, format_summary, measure,
+                                  percentile, synthetic_bookings, synthetic_flights)
+from flights.expiry import PENDING_TTL, expire_in_batches
+from flights.models import Booking, Flight
+
+
+def legacy_sweep(now):
+    """One UPDATE over every stale row, holding the write lock throughout: kept here only as the baseline."""
+    return Booking.objects.filter(status='PENDING', created_at__lt=now - PENDING_TTL).update(status='EXPIRED')
+
+
+class Command(BaseCommand):
+    help = 'Expiry sweep on a large bookings table: one big UPDATE vs index-driven batches, with a concurrent writer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=1_000_000)
+        parser.add_argument('--pending-every', type=int, default=5, help='Every Nth booking is left PENDING')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with benchmark_database(on_disk=True):
+            flight_ids = [f.id for f in Flight.objects.bulk_create(synthetic_flights(500))]
+            self.stdout.write(f"Seeding {options['bookings']:,} bookings...")
+            with explicit_timestamps(Booking, 'created_at'):
+                bulk_insert(Booking, synthetic_bookings(options['bookings'], flight_ids,
+                                                        [f"user{i}@example.com" for i in range(50_000)]))
+            Booking.objects.annotate(bucket=F('id') % options['pending_every']).filter(bucket=0).update(status='PENDING')
+            now = timezone.now()
+            stale = Booking.objects.filter(status='PENDING', created_at__lt=now - PENDING_TTL)
+
+            index = next(i for i in Booking._meta.indexes if i.name == 'booking_status_created_idx')
+            with connection.schema_editor() as editor:
+                editor.remove_index(Booking, index)
+            self.stdout.write(format_summary("before: count stale, no index", measure(stale.count, 5, warmup=1)))
+            with connection.schema_editor() as editor:
+                editor.add_index(Booking, index)
+            self.stdout.write(format_summary("after: count stale, status index", measure(stale.count, 5, warmup=1)))
+            pending = stale.count()
+            self.stdout.write(f"\n{pending:,} stale PENDING bookings to expire")
+
+            expired, *writer = self.with_writer(lambda: [legacy_sweep(now)], flight_ids)
+            self.report("before: one UPDATE", sum(expired), *writer)
+            Booking.objects.filter(status='EXPIRED').update(status='PENDING')
+
+            batch_times = []
+
+            def batched():
+                counts, started = [], time.perf_counter()
+                for count in expire_in_batches(batch_size=options['batch_size'], now=now):
+                    batch_times.append(time.perf_counter() - started)
+                    counts.append(count)
+                    started = time.perf_counter()
+                return counts
+
+            expired, *writer = self.with_writer(batched, flight_ids)
+            self.report(f"after: batches of {options['batch_size']:,}", sum(expired), *writer)
+            self.stdout.write(format_summary("  per batch (longest lock hold)", batch_times))
+            assert sum(expired) == pending and not stale.exists()
+        self.stdout.write(self.style.SUCCESS("✅ Every stale booking expired"))
+
+    def with_writer(self, sweep, flight_ids):
+        """Runs `sweep` while another thread keeps creating bookings; returns (result, seconds, insert latencies)."""
+        stop, latencies, failures = threading.Event(), [], []
+        departure = timezone.now() + datetime.timedelta(days=400)
+
+        def writer():
+            try:
+                n = 0
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        Booking.objects.create(
+                            flight_id=flight_ids[n % len(flight_ids)], passenger_name="Writer",
+                            passenger_email="writer@example.com", passenger_phone="9876543210", seat_number="1A",
+                            total_price=4200, status='BOOKED', flight_departure_datetime=departure + datetime.timedelta(minutes=n))
+                    except OperationalError:
+                        failures.append(n)  # "database is locked": the booking would have been lost
+                    latencies.append(time.perf_counter() - started)
+                    n += 1
+                    time.sleep(0.005)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        time.sleep(0.2)
+        started = time.perf_counter()
+        try:
+            result = sweep()
+        finally:
+            elapsed = time.perf_counter() - started
+            stop.set()
+            thread.join()
+        return result, elapsed, latencies, len(failures)
+
+    def report(self, label, expired, elapsed, writes, failures):
+        self.stdout.write(f"{label:<26} {expired:9,} rows in {elapsed:6.2f}s ({expired / elapsed:8,.0f} rows/s)   "
+                          f"concurrent inserts: {len(writes):5,}, p99 {percentile(writes, 99) * 1000:7.1f} ms, "
+                          f"max {max(writes) * 1000:7.1f} ms, {failures} failed")
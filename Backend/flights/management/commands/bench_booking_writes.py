@@ -0,0 +1,96 @@
+import datetime
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from flights.benchmarking import benchmark_database, run_threads
+from flights.models import Flight
+
+# SQLite profiles compared on the same workload. On PostgreSQL (DATABASE_URL set)
+# the command runs the configured database once instead.
+SQLITE_PROFILES = {
+    'sqlite-default': {
+        'pragmas': {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 5000},
+        'transaction_mode': None,
+    },
+    'sqlite-wal': {
+        'pragmas': None,  # settings.SQLITE_PRAGMAS
+        'transaction_mode': 'IMMEDIATE',
+    },
+}
+
+
+class Command(BaseCommand):
+    help = 'Load test: concurrent booking POST throughput for SQLite default vs WAL (or the configured PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--bookings', type=int, default=3000)
+
+    @override_settings(THROTTLE_ENABLED=False)  # measure the endpoint, not the rate limiter
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.run_profile(connection.vendor, options)
+            return
+
+        default_pragmas = settings.SQLITE_PRAGMAS
+        default_options = dict(connection.settings_dict['OPTIONS'])
+        try:
+            for name, profile in SQLITE_PROFILES.items():
+                settings.SQLITE_PRAGMAS = profile['pragmas'] or default_pragmas
+                connection.settings_dict['OPTIONS'] = {
+                    **default_options, 'transaction_mode': profile['transaction_mode'],
+                }
+                connection.close()
+                self.run_profile(name, options)
+        finally:
+            settings.SQLITE_PRAGMAS = default_pragmas
+            connection.settings_dict['OPTIONS'] = default_options
+            connection.close()
+
+    def run_profile(self, name, options):
+        threads, total = options['threads'], options['bookings']
+        departure = (timezone.now() + datetime.timedelta(days=7)).replace(microsecond=0)
+        seats = [f"{row}{letter}" for row in range(1, 31) for letter in "ABCDEF"]
+
+        with benchmark_database(on_disk=True):
+            # Enough flights that every attempt gets its own free seat: this measures
+            # write throughput, not seat conflicts.
+            flights = Flight.objects.bulk_create(
+                Flight(airline="IndiGo", origin="Mumbai", destination=f"City {i}", price=4200)
+                for i in range(total // len(seats) + 1)
+            )
+            outcomes = Counter()
+            lock = threading.Lock()
+
+            def worker(n):
+                client = Client()
+                for i in range(n, total, threads):
+                    flight, seat = divmod(i, len(seats))
+                    response = client.post('/api/bookings/', {
+                        "flight": flights[flight].id,
+                        "passenger_name": f"Passenger {i}",
+                        "passenger_email": f"p{i}@example.com",
+                        "passenger_phone": "9876543210",
+                        "seat_number": seats[seat],
+                        "total_price": "4200.00",
+                        "flight_departure_datetime": departure.isoformat(),
+                    }, content_type='application/json')
+                    with lock:
+                        outcomes[response.status_code] += 1
+
+            elapsed = run_threads(threads, worker)
+            journal = '-'
+            if connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute("PRAGMA journal_mode")
+                    journal = cursor.fetchone()[0]
+
+        errors = total - outcomes[201]
+        self.stdout.write(f"{name:<16} journal={journal:<7} {outcomes[201] / elapsed:8.0f} bookings/s   "
+                          f"({total:,} POSTs, {threads} threads, {errors} errors)")
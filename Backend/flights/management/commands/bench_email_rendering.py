@@ -0,0 +1,76 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+from email.mime.image import MIMEImage
+
+from flights.benchmarking import AIRLINES, CITIES
+from flights.emails import LOGO_PATH, build_professional_email, renderer
+
+TEMPLATES = {
+    'cancellation': ('Ticket Cancelled', 'emails/cancellation_email.html'),
+    'confirmation': ('Official Ticket', 'emails/booking_confirmation.html'),
+}
+
+
+def legacy_professional_email(subject, context, template, recipient_email):
+    """The previous per-email logic, kept here only as the benchmark baseline."""
+    html_content = render_to_string(template, context)
+    text_content = strip_tags(html_content)
+    email = EmailMultiAlternatives(subject=subject, body=text_content,
+                                   from_email=settings.DEFAULT_FROM_EMAIL, to=[recipient_email])
+    email.attach_alternative(html_content, "text/html")
+    if os.path.exists(LOGO_PATH):
+        with open(LOGO_PATH, 'rb') as f:
+            logo = MIMEImage(f.read())
+            logo.add_header('Content-ID', '<logo_image>')
+            logo.add_header('Content-Disposition', 'inline', filename='TravelGo_logo.png')
+            email.attach(logo)
+    return email
+
+
+class Command(BaseCommand):
+    help = 'Messages built per second for a bulk send (e.g. a flight cancellation blast), before vs after'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--passengers', type=int, default=300,
+                            help='Emails in the blast (the baseline re-encodes the 2.3 MB logo per email, so keep it modest)')
+        parser.add_argument('--template', choices=sorted(TEMPLATES), default='cancellation')
+
+    def handle(self, *args, **options):
+        subject, template = TEMPLATES[options['template']]
+        contexts = [{
+            'passenger_name': f"Passenger {i}",
+            'airline': AIRLINES[i % len(AIRLINES)],
+            'origin': CITIES[i % len(CITIES)],
+            'destination': CITIES[(i + 7) % len(CITIES)],
+            'seat_number': f"{i % 30 + 1}{'ABCDEF'[i % 6]}",
+            'refund_status': "Full Refund",
+            'departure_time': "01 Nov 2026, 09:30",
+            'location': "Mumbai, IN",
+            'device_id': "bench",
+            'transaction_id': f"pay_{i:010d}",
+        } for i in range(options['passengers'])]
+
+        renderer.clear()
+        runs = [
+            ("before: render + strip_tags + logo read", legacy_professional_email),
+            ("after: compiled pair + cached logo", build_professional_email),
+        ]
+        rates = []
+        for label, build in runs:
+            # message() is what EmailMessage.send() builds before handing it to SMTP
+            build(subject, contexts[0], template, "warmup@example.com").message()
+            started = time.perf_counter()
+            for i, context in enumerate(contexts):
+                build(subject, context, template, f"p{i}@example.com").message()
+            rate = len(contexts) / (time.perf_counter() - started)
+            rates.append(rate)
+            self.stdout.write(f"{label:<42} {rate:10,.0f} msg/s")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {rates[1] / rates[0]:.1f}x faster for {len(contexts):,} "
+                                             f"{options['template']} emails"))
@@ -0,0 +1,60 @@
+import csv
+import io
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from flights import exports
+from flights.benchmarking import benchmark_database, bulk_insert, explicit_timestamps, synthetic_bookings, synthetic_flights
+from flights.models import Booking, Flight
+
+
+def export_in_memory(start, end):
+    """The naive export (model instances, whole file built in memory), kept here only as the baseline."""
+    _, timestamp, columns = exports.EXPORTS['bookings']
+    bookings = list(Booking.objects.filter(created_at__gte=start, created_at__lt=end).order_by('pk'))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for booking in bookings:
+        writer.writerow([getattr(booking, column) for column in columns])
+    return [buffer.getvalue().encode()]
+
+
+class Command(BaseCommand):
+    help = 'Peak Python memory and throughput of the bookings CSV export as the date range grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=300_000)
+        parser.add_argument('--gzip', action='store_true', help='Also gzip the streamed output')
+
+    def handle(self, *args, **options):
+        with benchmark_database(on_disk=True):
+            bulk_insert(Flight, synthetic_flights(200))
+            flight_ids = list(Flight.objects.values_list('id', flat=True))
+            emails = [f"user{i}@example.com" for i in range(5_000)]
+            with explicit_timestamps(Booking, 'created_at'):
+                bulk_insert(Booking, synthetic_bookings(options['bookings'], flight_ids, emails))
+
+            first, last = (Booking.objects.order_by(field).values_list('created_at', flat=True).first()
+                           for field in ('created_at', '-created_at'))
+            span = last - first
+            runs = [
+                ("before: list() + in-memory CSV", lambda start, end: export_in_memory(start, end)),
+                ("after: streamed values_list", lambda start, end: exports.export_stream(
+                    'bookings', 'csv', start, end, compress=options['gzip'])),
+            ]
+            for fraction in (0.01, 0.1, 1.0):
+                end = first + span * fraction + span / 1_000_000
+                for label, run in runs:
+                    tracemalloc.start()
+                    started = time.perf_counter()
+                    size = sum(len(chunk) for chunk in run(first, end))
+                    elapsed = time.perf_counter() - started
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    rows = Booking.objects.filter(created_at__gte=first, created_at__lt=end).count()
+                    self.stdout.write(f"{label:<32} {rows:>9,} rows  {size / 1e6:8.1f} MB out  "
+                                      f"peak {peak / 1e6:7.1f} MB  {rows / elapsed:10,.0f} rows/s")
+        self.stdout.write(self.style.SUCCESS("✅ Streamed peak memory should stay flat as the range grows"))
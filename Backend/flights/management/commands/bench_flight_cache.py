@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from flights.benchmarking import benchmark_database, bulk_insert, synthetic_flights
+from flights.cache import flight_cache
+from flights.models import Flight
+from flights.views import FlightViewSet
+
+
+class Command(BaseCommand):
+    help = 'Measures /api/flights/ throughput with and without the catalogue response cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--flights', type=int, default=100, help='Catalogue size (seed_flights loads 100)')
+        parser.add_argument('--seconds', type=float, default=3.0, help='Duration of each run')
+
+    @override_settings(THROTTLE_ENABLED=False)  # measure the endpoint, not the rate limiter
+    def handle(self, *args, **options):
+        with benchmark_database():
+            bulk_insert(Flight, synthetic_flights(options['flights']))
+            client = Client()
+            flight_id = Flight.objects.values_list('id', flat=True).first()
+
+            list_url, detail_url = '/api/flights/', f'/api/flights/{flight_id}/'
+            runs = [
+                # (label, cache, url, send If-None-Match)
+                ("list, uncached", None, list_url, False),
+                ("list, cached", flight_cache, list_url, False),
+                ("list, cached + If-None-Match (304)", flight_cache, list_url, True),
+                ("detail, uncached", None, detail_url, False),
+                ("detail, cached", flight_cache, detail_url, False),
+            ]
+            baseline = {}
+            for label, cache, url, conditional in runs:
+                FlightViewSet.response_cache = cache
+                headers = {'HTTP_IF_NONE_MATCH': client.get(url)['ETag']} if conditional else {}
+                rate = self.throughput(client, url, headers, options['seconds'])
+                if cache is None:
+                    baseline[url] = rate
+                    speedup = ""
+                else:
+                    speedup = f"  x{rate / baseline[url]:.1f}"
+                self.stdout.write(f"{label:<40} {rate:10.0f} req/s{speedup}")
+
+            FlightViewSet.response_cache = flight_cache
+            self.stdout.write(f"\ncache counters: {flight_cache.stats()}")
+
+    def throughput(self, client, url, headers, seconds):
+        client.get(url, **headers)  # warm up (and fill the cache)
+        count, deadline = 0, time.perf_counter() + seconds
+        start = time.perf_counter()
+        while time.perf_counter() < deadline:
+            client.get(url, **headers)
+            count += 1
+        return count / (time.perf_counter() - start)
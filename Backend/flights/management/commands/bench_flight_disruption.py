@@ -0,0 +1,75 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from flights.benchmarking import benchmark_database, bulk_insert, explicit_timestamps
+from flights.disruptions import CANCEL, disrupt_flight
+from flights.models import Booking, EmailOutbox, Flight
+from flights.outbox import queue_email
+
+
+def cancel_one_by_one(flight, departure):
+    """The per-booking cancel_ticket logic, kept here only as the benchmark baseline."""
+    for booking in Booking.objects.filter(flight=flight, flight_departure_datetime=departure,
+                                          status__in=['PENDING', 'BOOKED']):
+        if not booking.can_cancel:
+            continue
+        booking.status = 'CANCELLED'
+        booking.save()
+        context = {
+            'passenger_name': booking.passenger_name,
+            'airline': booking.flight.airline,
+            'refund_status': booking.refund_eligibility,
+            'origin': booking.flight.origin,
+            'destination': booking.flight.destination,
+            'seat_number': booking.seat_number
+        }
+        queue_email('Ticket Cancelled', 'emails/cancellation_email.html', context, booking.passenger_email)
+
+
+class Command(BaseCommand):
+    help = 'Times cancelling every booking on one flight: per-booking loop vs one set-based disruption'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        with benchmark_database(on_disk=True):
+            # One departure carrying every booking: a seat map big enough for all of them
+            flight = Flight.objects.create(airline="IndiGo", origin="Mumbai", destination="Delhi", price=4200,
+                                           seat_rows=-(-options['bookings'] // 6), seat_letters='ABCDEF')
+            departure = self.seed(flight, options['bookings'])
+
+            for label, run in (("before: cancel_ticket per booking", lambda: cancel_one_by_one(flight, departure)),
+                               ("after: disrupt_flight", lambda: disrupt_flight(flight, CANCEL, departure))):
+                Booking.objects.update(status='BOOKED')
+                EmailOutbox.objects.all().delete()
+                queries = []
+                with connection.execute_wrapper(lambda execute, sql, *rest: queries.append(sql) or execute(sql, *rest)):
+                    started = time.perf_counter()
+                    run()
+                    elapsed = time.perf_counter() - started
+                cancelled = Booking.objects.filter(status='CANCELLED').count()
+                self.stdout.write(f"{label:<36} {elapsed * 1000:9.1f} ms  {len(queries):6} queries  "
+                                  f"{cancelled} cancelled, {EmailOutbox.objects.count()} emails queued")
+
+    def seed(self, flight, count):
+        """`count` bookings on one departure, one per seat, half made in the last day. Returns the departure."""
+        seats = [f"{row}{letter}" for row in range(1, flight.seat_rows + 1) for letter in flight.seat_letters]
+        now = timezone.now()
+        departure = now + datetime.timedelta(days=1)
+        bookings = (
+            Booking(
+                flight=flight, passenger_name=f"Passenger {i}", passenger_email=f"p{i}@example.com",
+                passenger_phone="9876543210", seat_number=seats[i % len(seats)], total_price=4200, status='BOOKED',
+                created_at=now - datetime.timedelta(hours=2 if i % 2 else 72),
+                flight_departure_datetime=departure,
+            )
+            for i in range(count)
+        )
+        with explicit_timestamps(Booking, 'created_at'):
+            bulk_insert(Booking, bookings)
+        return departure
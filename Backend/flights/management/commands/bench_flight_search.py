@@ -0,0 +1,50 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from flights.benchmarking import CITIES, benchmark_database, bulk_insert, format_summary, measure, synthetic_flights
+from flights.models import Flight
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the full /api/flights/ list against indexed, paginated search (p50/p99)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000', help='Comma separated catalogue sizes')
+        parser.add_argument('--iterations', type=int, default=50, help='Search requests per size')
+        parser.add_argument('--full-iterations', type=int, default=5, help='Full-list requests per size (slow at 1M)')
+        parser.add_argument('--page-size', type=int, default=20)
+
+    @override_settings(THROTTLE_ENABLED=False)  # measure the endpoint, not the rate limiter
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        rng = random.Random(7)
+
+        with benchmark_database():
+            client = Client()
+            loaded = 0
+            for size in sizes:
+                # Grow the same catalogue instead of reloading it for every size
+                loaded += bulk_insert(Flight, synthetic_flights(size - loaded, seed=size))
+                self.stdout.write(self.style.MIGRATE_HEADING(f"\n✈️  {loaded:,} flights"))
+
+                full = measure(lambda: client.get('/api/flights/'), options['full_iterations'], warmup=1)
+                self.stdout.write(format_summary("GET /api/flights/ (full list)", full))
+
+                def search():
+                    origin, destination = rng.sample(CITIES, 2)
+                    response = client.get('/api/flights/', {
+                        'origin': origin, 'destination': destination,
+                        'max_price': 60000, 'ordering': 'price', 'page_size': options['page_size'],
+                    })
+                    assert response.status_code == 200, response.status_code
+
+                self.stdout.write(format_summary("search route + price, 1 page", measure(search, options['iterations'])))
+
+                def next_page():
+                    first = client.get('/api/flights/', {'origin': 'Mumbai', 'page_size': options['page_size']}).json()
+                    if first['next']:
+                        client.get(first['next'])
+
+                self.stdout.write(format_summary("origin only, 2 cursor pages", measure(next_page, options['iterations'])))
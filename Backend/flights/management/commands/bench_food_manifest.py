@@ -0,0 +1,73 @@
+import random
+from collections import defaultdict
+from itertools import cycle
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+
+from flights.benchmarking import benchmark_database, bulk_insert, format_summary, measure, synthetic_flights
+from flights.manifests import build_manifest, manifest_cache, seat_sort_key
+from flights.models import Flight, FoodOrder
+
+MEALS = ["VEG", "NON-VEG", "JAIN", "VEGAN", "DIABETIC", "CHILD"]
+
+
+def legacy_manifest(flight):
+    """Scan the orders by free-text flight_number and count in Python, kept here only as the baseline."""
+    meals = defaultdict(list)
+    for order in FoodOrder.objects.filter(flight_number=f"TG-{flight.id}"):
+        meals[order.food_type].append(order)
+    return [{
+        'food_type': food_type,
+        'count': len(orders),
+        'revenue': str(sum(order.price for order in orders)),
+        'seats': sorted((order.seat_number for order in orders), key=seat_sort_key),
+    } for food_type, orders in sorted(meals.items())]
+
+
+def synthetic_orders(count, flight_ids, seed=42):
+    rng = random.Random(seed)
+    for i in range(count):
+        flight_id = rng.choice(flight_ids)
+        yield FoodOrder(
+            flight_id=flight_id,
+            flight_number=f"TG-{flight_id}",
+            passenger_name=f"Passenger {i}",
+            seat_number=f"{rng.randint(1, 30)}{rng.choice('ABCDEF')}",
+            food_type=rng.choice(MEALS),
+            price=rng.choice((250, 350, 450)),
+        )
+
+
+class Command(BaseCommand):
+    help = 'Kitchen manifest for one flight: scan + Python grouping vs indexed GROUP BY vs cached'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1_000_000)
+        parser.add_argument('--flights', type=int, default=2_000)
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with benchmark_database(on_disk=True):
+            bulk_insert(Flight, synthetic_flights(options['flights']))
+            flight_ids = list(Flight.objects.values_list('id', flat=True))
+            self.stdout.write(f"Seeding {options['orders']:,} food orders over {len(flight_ids):,} flights...")
+            bulk_insert(FoodOrder, synthetic_orders(options['orders'], flight_ids))
+
+            # Each run takes the next flight; a small --flights catalogue is cycled through
+            sample = random.Random(7).sample(flight_ids, min(200, len(flight_ids)))
+            flights = cycle(Flight.objects.filter(pk__in=sample))
+            caches['catalogue'].clear()
+            hot = next(flights)
+            manifest_cache.get_or_build(hot.id)
+            runs = [
+                ("before: scan flight_number + Python", lambda: legacy_manifest(next(flights)), 5),
+                ("after: GROUP BY on the index (cold)", lambda: build_manifest(next(flights).id), options['iterations']),
+                ("after: cached manifest", lambda: manifest_cache.get_or_build(hot.id), options['iterations']),
+            ]
+            for label, run, iterations in runs:
+                self.stdout.write(format_summary(label, measure(run, iterations, warmup=1)))
+
+            check = next(flights)
+            assert legacy_manifest(check) == build_manifest(check.id)['meals']
+        self.stdout.write(self.style.SUCCESS("✅ Manifests match the legacy scan"))
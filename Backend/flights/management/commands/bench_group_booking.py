@@ -0,0 +1,68 @@
+import datetime
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from flights.benchmarking import benchmark_database
+from flights.models import EmailOutbox, Flight
+
+
+class Command(BaseCommand):
+    help = 'Booking a group through the full request stack: N single POSTs vs one POST /api/bookings/group/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--passengers', type=int, default=20)
+        parser.add_argument('--rounds', type=int, default=20, help='Groups booked per strategy (one departure each)')
+
+    def handle(self, *args, **options):
+        count = options['passengers']
+        # No per-request JSON log lines in the middle of the results
+        with benchmark_database(on_disk=True), override_settings(METRICS_SAMPLE_RATE=0.0, THROTTLE_ENABLED=False):
+            flight = Flight.objects.create(airline="IndiGo", origin="Mumbai", destination="Goa", price=4200)
+            seats = [f"{row}{letter}" for row in range(1, flight.seat_rows + 1) for letter in flight.seat_letters][:count]
+            client = APIClient()
+            start = timezone.now() + datetime.timedelta(days=30)
+
+            def passenger(i):
+                return {"passenger_name": f"Traveller {i}", "passenger_email": f"traveller{i}@example.com",
+                        "passenger_phone": "9876543210", "seat_number": seats[i]}
+
+            def singles(departure):
+                for i in range(count):
+                    response = client.post('/api/bookings/', {
+                        **passenger(i), "flight": flight.id, "total_price": "4200.00",
+                        "flight_departure_datetime": departure.isoformat(),
+                    }, format='json')
+                    assert response.status_code == 201, response.content
+
+            def batch(departure):
+                response = client.post('/api/bookings/group/', {
+                    "flight": flight.id, "flight_departure_datetime": departure.isoformat(),
+                    "passengers": [passenger(i) for i in range(count)],
+                }, format='json')
+                assert response.status_code == 201, response.content
+
+            runs = [(f"before: {count} x POST /api/bookings/", singles),
+                    ("after: 1 x POST /api/bookings/group/", batch)]
+            medians = []
+            for offset, (label, book) in enumerate(runs):
+                EmailOutbox.objects.all().delete()
+                samples, queries = [], []
+                for i in range(options['rounds']):
+                    departure = start + datetime.timedelta(hours=len(runs) * i + offset)
+                    executed = []
+                    with connection.execute_wrapper(lambda execute, sql, *rest: executed.append(sql) or execute(sql, *rest)):
+                        started = time.perf_counter()
+                        book(departure)
+                        samples.append(time.perf_counter() - started)
+                    queries.append(len(executed))
+                medians.append(statistics.median(samples))
+                self.stdout.write(f"{label:<38} {medians[-1] * 1000:8.1f} ms/group  {queries[0]:4} queries  "
+                                  f"{EmailOutbox.objects.count() / options['rounds']:4.0f} emails/group")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {medians[0] / medians[1]:.1f}x faster per {count}-passenger group"))
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+
+from flights.benchmarking import (
+    benchmark_database, bulk_insert, explicit_timestamps, format_summary, measure,
+    synthetic_bookings, synthetic_flights,
+)
+from flights.models import Booking, Flight
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks My Bookings (email lookup + cursor pages) on a large bookings table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=1_000_000)
+        parser.add_argument('--emails', type=int, default=50_000)
+        parser.add_argument('--frequent-flyer-bookings', type=int, default=5000,
+                            help='Extra bookings for one heavy user')
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--compare-unindexed', action='store_true',
+                            help='Also measure with booking_email_created_idx dropped')
+
+    @override_settings(THROTTLE_ENABLED=False)  # measure the endpoint, not the rate limiter
+    def handle(self, *args, **options):
+        emails = [f"user{i}@example.com" for i in range(options['emails'])]
+        frequent = "frequent.flyer@example.com"
+
+        with benchmark_database():
+            flight_ids = [f.id for f in Flight.objects.bulk_create(synthetic_flights(200))]
+            self.stdout.write(f"⏳ Loading {options['bookings']:,} bookings across {len(emails):,} emails...")
+            with explicit_timestamps(Booking, 'created_at'):
+                bulk_insert(Booking, synthetic_bookings(options['bookings'], flight_ids, emails))
+                bulk_insert(Booking, synthetic_bookings(options['frequent_flyer_bookings'], flight_ids, [frequent], seed=1))
+
+            self.run_suite(options, emails[0], frequent)
+
+            if options['compare_unindexed']:
+                index = next(i for i in Booking._meta.indexes if i.name == 'booking_email_created_idx')
+                with connection.schema_editor() as editor:
+                    editor.remove_index(Booking, index)
+                self.stdout.write(self.style.WARNING("\nWithout booking_email_created_idx:"))
+                self.run_suite(options, emails[0], frequent)
+
+    def run_suite(self, options, typical, frequent):
+        client = Client()
+        page_size = options['page_size']
+        iterations = options['iterations']
+
+        for label, email in (("typical user", typical), ("frequent flyer", frequent)):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n👤 {label} ({Booking.objects.filter(passenger_email=email).count():,} bookings)"))
+
+            full = measure(lambda: client.get('/api/bookings/', {'email': email}), max(3, iterations // 5), warmup=1)
+            self.stdout.write(format_summary("full history (unpaginated)", full))
+
+            first = measure(lambda: client.get('/api/bookings/', {'email': email, 'page_size': page_size}), iterations)
+            self.stdout.write(format_summary(f"first page ({page_size})", first))
+
+            # Walk 10 pages deep and time only the last hop
+            url, deep_cursor = None, None
+            response = client.get('/api/bookings/', {'email': email, 'page_size': page_size}).json()
+            for _ in range(10):
+                if not response['next']:
+                    break
+                url = response['next']
+                response = client.get(url).json()
+            if url:
+                deep_cursor = measure(lambda: client.get(url), iterations)
+                self.stdout.write(format_summary("cursor page ~10 deep", deep_cursor))
@@ -0,0 +1,95 @@
+import random
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from rest_framework import viewsets
+from rest_framework.test import APIRequestFactory
+
+from flights.benchmarking import CITIES, benchmark_database, bulk_insert, format_summary, measure
+from flights.cache import package_cache
+from flights.models import TravelPackage
+from flights.pagination import PackageCursorPagination
+from flights.serializers import TravelPackageSerializer
+from flights.views import TravelPackageViewSet
+
+CATEGORIES = [code for code, _ in TravelPackage.CATEGORY_CHOICES]
+
+
+class LegacyPackageViewSet(viewsets.ReadOnlyModelViewSet):
+    """Whole rows, description and all, never cached: kept here only as the baseline."""
+    serializer_class = TravelPackageSerializer
+    pagination_class = PackageCursorPagination
+
+    def get_queryset(self):
+        return TravelPackage.objects.filter(category=self.request.query_params['category'])
+
+
+def synthetic_packages(count, description_bytes, seed=42):
+    rng = random.Random(seed)
+    itinerary = "Day {day}: sightseeing, local cuisine and an evening at leisure. "
+    for i in range(count):
+        city = rng.choice(CITIES)
+        description = "".join(itinerary.format(day=day) for day in range(1, 1 + description_bytes // 64))
+        yield TravelPackage(
+            title=f"{city} Escape #{i}",
+            category=rng.choice(CATEGORIES),
+            description=description,
+            price_per_person=rng.randrange(5_000, 150_000, 500),
+            image_url=f"https://images.example.com/packages/{i}.jpg",
+            flight_inclusion="IndiGo Return Flight",
+            hotel_inclusion=f"{rng.choice((3, 4, 5))}-Star Hotel, {rng.randint(2, 7)} Nights",
+        )
+
+
+class Command(BaseCommand):
+    help = 'Package listing by category: unindexed full rows (before) vs only() on the category index vs cached pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--packages', type=int, default=100_000)
+        parser.add_argument('--description-bytes', type=int, default=4_000)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--iterations', type=int, default=30)
+
+    @override_settings(METRICS_SAMPLE_RATE=0.0)
+    def handle(self, *args, **options):
+        with benchmark_database(on_disk=True):
+            self.stdout.write(f"Seeding {options['packages']:,} packages "
+                              f"(~{options['description_bytes']:,} byte descriptions)...")
+            bulk_insert(TravelPackage, synthetic_packages(options['packages'], options['description_bytes']))
+            caches['catalogue'].clear()
+
+            factory = APIRequestFactory()
+            legacy = LegacyPackageViewSet.as_view({'get': 'list'})
+            listing = TravelPackageViewSet.as_view({'get': 'list'})
+            category, page_size, iterations = 'HONEYMOON', options['page_size'], options['iterations']
+            self.stdout.write(f"{TravelPackage.objects.filter(category=category).count():,} {category} packages")
+
+            def get(view, cold=False, **params):
+                if cold:
+                    package_cache(category).invalidate()
+                return view(factory.get('/api/packages/', {'category': category, **params})).render()
+
+            page = {'page_size': page_size}
+            index = next(i for i in TravelPackage._meta.indexes if i.name == 'package_category_price_idx')
+            with connection.schema_editor() as editor:
+                editor.remove_index(TravelPackage, index)
+            self.run(f"before: page of {page_size}, full rows", lambda: get(legacy, **page), iterations)
+            self.run("before: category, full rows", lambda: get(legacy), 3)
+            with connection.schema_editor() as editor:
+                editor.add_index(TravelPackage, index)
+
+            self.run(f"after: page of {page_size}, only() cold", lambda: get(listing, cold=True, **page), iterations)
+            self.run(f"after: page of {page_size}, cached", lambda: get(listing, **page), iterations)
+            self.run("after: category, only() cold", lambda: get(listing, cold=True), 3)
+            self.run("after: category, cached", lambda: get(listing), iterations)
+
+            listed = get(listing, **page).data['results']
+            expected = get(legacy, **page).data['results']
+            assert [row['id'] for row in listed] == [row['id'] for row in expected]
+            assert all('description' not in row for row in listed)
+        self.stdout.write(self.style.SUCCESS("✅ Listings match the full-row query, without descriptions"))
+
+    def run(self, label, fn, iterations):
+        self.stdout.write(format_summary(label, measure(fn, iterations, warmup=1)))
@@ -0,0 +1,52 @@
+import random
+import resource
+import time
+
+from django.core.management.base import BaseCommand
+
+from flights.benchmarking import format_summary, measure
+from flights.routes import MAX_LEGS, RouteGraph
+
+
+class Command(BaseCommand):
+    help = 'Builds the route graph from a synthetic network (1M flights by default) and times connection searches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--edges', type=int, default=1_000_000, help='Synthetic flights (edges, incl. parallel ones)')
+        parser.add_argument('--cities', type=int, default=1_500)
+        parser.add_argument('--iterations', type=int, default=200, help='Searches per configuration')
+        parser.add_argument('--limit', type=int, default=5, help='Itineraries per search')
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        cities = [f"City {i:04d}" for i in range(options['cities'])]
+        # Hub-and-spoke-ish: a tenth of the cities take most of the traffic
+        hubs = cities[:max(2, len(cities) // 10)]
+
+        def rows():
+            for flight_id in range(1, options['edges'] + 1):
+                origin = rng.choice(hubs if rng.random() < 0.6 else cities)
+                destination = rng.choice(hubs if rng.random() < 0.6 else cities)
+                if origin != destination:
+                    yield flight_id, origin, destination, rng.randrange(1500, 90000)
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        graph = RouteGraph.build(rows())
+        elapsed = time.perf_counter() - started
+        grown = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before  # KiB on Linux
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"🗺️  {options['edges']:,} flights -> {len(graph.best):,} routes between {len(graph.cities):,} cities"))
+        self.stdout.write(f"build {elapsed:.2f}s (incl. generating the rows), peak RSS +{grown / 1024:.0f} MB")
+
+        for max_legs in range(1, MAX_LEGS + 1):
+            for by in ('price', 'legs'):
+                found = []
+
+                def search():
+                    origin, destination = rng.sample(cities, 2)
+                    found.append(len(graph.search(origin, destination, max_legs, options['limit'], by=by)))
+
+                samples = measure(search, options['iterations'])
+                self.stdout.write(format_summary(f"max_legs={max_legs} by {by}", samples) +
+                                  f"   avg {sum(found) / len(found):.1f} itineraries")
@@ -0,0 +1,67 @@
+import datetime
+import random
+import threading
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from flights.benchmarking import benchmark_database, run_threads
+from flights.models import Booking, Flight
+
+
+class Command(BaseCommand):
+    help = 'Fires concurrent booking POSTs at a few flights and proves no seat is booked twice'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=32)
+        parser.add_argument('--bookings', type=int, default=5000, help='Total booking attempts')
+        parser.add_argument('--flights', type=int, default=5)
+
+    @override_settings(THROTTLE_ENABLED=False)  # measure the endpoint, not the rate limiter
+    def handle(self, *args, **options):
+        threads, attempts = options['threads'], options['bookings']
+        departure = (timezone.now() + datetime.timedelta(days=7)).replace(microsecond=0)
+
+        with benchmark_database(on_disk=True):
+            flights = [
+                Flight.objects.create(airline="IndiGo", origin="Mumbai", destination=f"City {i}", price=4200)
+                for i in range(options['flights'])
+            ]
+            seats = [f"{row}{letter}" for row in range(1, 31) for letter in "ABCDEF"]
+            outcomes = Counter()
+            lock = threading.Lock()
+
+            def worker(n):
+                rng = random.Random(n)
+                client = Client()
+                for i in range(n, attempts, threads):
+                    response = client.post('/api/bookings/', {
+                        "flight": rng.choice(flights).id,
+                        "passenger_name": f"Passenger {i}",
+                        "passenger_email": f"p{i}@example.com",
+                        "passenger_phone": "9876543210",
+                        "seat_number": rng.choice(seats),
+                        "total_price": "4200.00",
+                        "flight_departure_datetime": departure.isoformat(),
+                    }, content_type='application/json')
+                    with lock:
+                        outcomes[response.status_code] += 1
+
+            self.stdout.write(f"🔥 {attempts:,} booking attempts from {threads} threads on "
+                              f"{len(flights)} flights x {len(seats)} seats...")
+            elapsed = run_threads(threads, worker)
+
+            doubles = (Booking.objects.filter(status__in=['PENDING', 'BOOKED'])
+                       .values('flight', 'flight_departure_datetime', 'seat_number')
+                       .annotate(n=Count('id')).filter(n__gt=1).count())
+            booked = Booking.objects.count()
+
+            self.stdout.write(f"   201 booked: {outcomes[201]:,}   409 seat taken: {outcomes[409]:,}   "
+                              f"other: {sum(outcomes.values()) - outcomes[201] - outcomes[409]:,}")
+            self.stdout.write(f"   {attempts / elapsed:,.0f} attempts/s, {outcomes[201] / elapsed:,.0f} bookings/s")
+            if doubles or booked != outcomes[201]:
+                raise CommandError(f"❌ {doubles} double-booked seats ({booked} rows for {outcomes[201]} successes)")
+            self.stdout.write(self.style.SUCCESS("✅ 0 double-booked seats"))
@@ -0,0 +1,57 @@
+import random
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from flights.benchmarking import benchmark_database, bulk_insert, format_summary, measure, synthetic_flights
+from flights.models import Flight
+from flights.throttling import buckets
+
+# Limits high enough that the measured requests are all allowed
+UNLIMITED = {'/api/': {'ip': '1000000/s'}, '/api/flights/': {'ip': '1000000/s'}}
+
+
+class Command(BaseCommand):
+    help = 'ThrottleMiddleware cost per request, and a scraper bursting among ordinary clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5000)
+        parser.add_argument('--clients', type=int, default=50, help='Ordinary clients in the burst run')
+
+    @override_settings(METRICS_SAMPLE_RATE=0.0)
+    def handle(self, *args, **options):
+        with benchmark_database():
+            bulk_insert(Flight, synthetic_flights(100))
+            flight_id = Flight.objects.values_list('id', flat=True).first()
+            url = f'/api/flights/{flight_id}/'  # served from the response cache: the throttle is a visible share
+
+            for label, overrides in (("throttling off", {'THROTTLE_ENABLED': False}),
+                                     ("throttling on (2 buckets, allowed)", {'THROTTLES': UNLIMITED})):
+                with override_settings(**overrides):
+                    client = Client()
+                    samples = measure(lambda: client.get(url), options['iterations'], warmup=50)
+                self.stdout.write(format_summary(label, samples))
+
+            self.burst(url, options['clients'])
+
+    def burst(self, url, clients):
+        """One scraper sends 20x the traffic of each ordinary client, interleaved at random."""
+        buckets.clear()
+        rng = random.Random(42)
+        with override_settings(THROTTLES={'/api/': {'ip': '120/min'}}):
+            scraper = Client(REMOTE_ADDR='203.0.113.9')
+            users = [Client(REMOTE_ADDR=f'198.51.100.{n}') for n in range(clients)]
+            schedule = ['scraper'] * (20 * 30) + [n for n in range(clients) for _ in range(30)]
+            rng.shuffle(schedule)
+            results = Counter()
+            for who in schedule:
+                status = (scraper if who == 'scraper' else users[who]).get(url).status_code
+                results['scraper' if who == 'scraper' else 'users', status] += 1
+
+        self.stdout.write(f"\nburst, limit 120/min per address ({len(schedule):,} requests):")
+        for who in ('scraper', 'users'):
+            ok, limited = results[who, 200], results[who, 429]
+            self.stdout.write(f"  {who:<8} {ok:6,} served  {limited:6,} rejected with 429")
+        assert results['users', 429] == 0
+        self.stdout.write(self.style.SUCCESS("✅ Only the scraper was throttled"))
@@ -0,0 +1,95 @@
+import json
+import re
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse, JsonResponse
+from django.test import RequestFactory, override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+
+from flights.middleware import RequestValidationMiddleware
+from flights.parsers import SharedJSONParser
+
+PAYLOAD = {
+    "flight": 1,
+    "passenger_name": "Asha Rao",
+    "passenger_email": "asha@example.com",
+    "passenger_phone": "9876543210",
+    "seat_number": "12A",
+    "total_price": "4200.00",
+    "flight_departure_datetime": "2026-11-01T09:30:00Z",
+    "booking_location": "Mumbai, IN",
+    "device_id": "a3f1c2d4-9b8e-4f6a-8c7d-1e2f3a4b5c6d",
+}
+
+
+class LegacyBookingValidationMiddleware:
+    """The previous per-request logic, kept here only as the benchmark baseline."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == '/api/bookings/' and request.method == 'POST':
+            try:
+                body = json.loads(request.body)
+                name = body.get('passenger_name', '')
+                if not name or len(name) < 3:
+                    return JsonResponse({"message": "Middleware Error: Name must be at least 3 characters."}, status=400)
+                email = body.get('passenger_email', '')
+                email_regex = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
+                if not re.match(email_regex, email):
+                    return JsonResponse({"message": "Middleware Error: Invalid email format."}, status=400)
+                phone = body.get('passenger_phone', '')
+                if not str(phone).isdigit() or len(str(phone)) < 10:
+                    return JsonResponse({"message": "Middleware Error: Phone must be at least 10 digits."}, status=400)
+                seat = body.get('seat_number', '')
+                if not re.match(r'^\d+[A-F]$', seat):
+                    return JsonResponse({"message": "Middleware Error: Seat must be format like '5A' or '10C'."}, status=400)
+            except json.JSONDecodeError:
+                return JsonResponse({"message": "Middleware Error: Malformed JSON data."}, status=400)
+        return self.get_response(request)
+
+
+class Command(BaseCommand):
+    help = 'Microbenchmark: per-request cost of booking payload validation + DRF parsing, before vs after'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50_000)
+        parser.add_argument('--passengers', type=int, default=1,
+                            help='Repeat the payload in a list field to simulate larger bodies')
+
+    def handle(self, *args, **options):
+        payload = dict(PAYLOAD)
+        if options['passengers'] > 1:
+            payload['companions'] = [PAYLOAD] * (options['passengers'] - 1)
+        body = json.dumps(payload)
+        factory = RequestFactory()
+
+        def view_that_reads_data(parser_class):
+            def view(request):
+                Request(request, parsers=[parser_class()]).data
+                return HttpResponse()
+            return view
+
+        with override_settings(REQUEST_VALIDATION={'/api/bookings/': 'booking'}):
+            runs = [
+                ("before: validate + DRF re-parse", LegacyBookingValidationMiddleware(view_that_reads_data(JSONParser))),
+                ("after: parse once, compiled checks", RequestValidationMiddleware(view_that_reads_data(SharedJSONParser))),
+            ]
+            results = {}
+            for label, handler in runs:
+                results[label] = self.per_request(factory, handler, body, options['iterations'])
+                self.stdout.write(f"{label:<38} {results[label]:8.2f} µs/request")
+
+        before, after = results.values()
+        self.stdout.write(self.style.SUCCESS(f"overhead reduced by {before - after:.2f} µs ({(1 - after / before) * 100:.0f}%) "
+                                             f"for a {len(body)} byte body"))
+
+    def per_request(self, factory, handler, body, iterations):
+        requests = [factory.post('/api/bookings/', body, content_type='application/json') for _ in range(iterations)]
+        started = time.perf_counter()
+        for request in requests:
+            handler(request)
+        return (time.perf_counter() - started) / iterations * 1_000_000
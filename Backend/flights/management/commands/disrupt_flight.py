@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from flights.disruptions import CANCEL, RESCHEDULE, disrupt_flight
+from flights.models import Flight
+from flights.seats import SeatUnavailable
+
+
+class Command(BaseCommand):
+    help = 'Cancels or reschedules every active booking on a flight and queues the passenger emails'
+
+    def add_arguments(self, parser):
+        parser.add_argument('flight_id', type=int)
+        parser.add_argument('--departure', required=True, help='ISO datetime of the affected departure')
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument('--cancel', action='store_true', help='Cancel the bookings')
+        group.add_argument('--reschedule-to', metavar='ISO_DATETIME', help='Move the bookings to this departure')
+
+    def handle(self, *args, **options):
+        try:
+            flight = Flight.objects.get(pk=options['flight_id'])
+        except Flight.DoesNotExist:
+            raise CommandError(f"Flight {options['flight_id']} does not exist.")
+
+        departure = self.parse(options['departure'], '--departure')
+        new_departure = self.parse(options['reschedule_to'], '--reschedule-to')
+        action = RESCHEDULE if new_departure else CANCEL
+
+        try:
+            result = disrupt_flight(flight, action, departure=departure, new_departure=new_departure)
+        except SeatUnavailable as err:
+            raise CommandError(str(err))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {action.title()}: {result['bookings']} bookings on {flight.airline} {flight.origin} → {flight.destination}, "
+            f"{result['notifications']} emails queued"
+        ))
+
+    @staticmethod
+    def parse(value, option):
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise CommandError(f"{option} must be an ISO 8601 datetime.")
+        return parsed
@@ -0,0 +1,32 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from flights.expiry import BATCH_SIZE, PENDING_TTL, expire_in_batches, stale_bookings
+
+
+class Command(BaseCommand):
+    help = 'Expires PENDING bookings older than the TTL in small batches, releasing their seats'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl-minutes', type=float, default=PENDING_TTL.total_seconds() / 60,
+                            help='Age after which an unpaid booking expires')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per UPDATE')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+        parser.add_argument('--include-failed', action='store_true',
+                            help='Also expire FAILED bookings older than the TTL (they hold no seat)')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would expire')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        ttl = datetime.timedelta(minutes=options['ttl_minutes'])
+        statuses = ('PENDING', 'FAILED') if options['include_failed'] else ('PENDING',)
+
+        if options['dry_run']:
+            for status in statuses:
+                self.stdout.write(f"{stale_bookings(status, ttl).count():,} {status} bookings would expire")
+            return
+
+        total = sum(expire_in_batches(statuses, ttl, options['batch_size'], pause=options['pause']))
+        self.stdout.write(self.style.SUCCESS(f"✅ Expired {total:,} stale bookings ({', '.join(statuses)})"))
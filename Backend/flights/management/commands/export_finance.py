@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from flights import exports
+
+
+class Command(BaseCommand):
+    help = 'Streams bookings or food orders (with razorpay ids) as CSV/JSONL for finance reconciliation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(exports.EXPORTS))
+        parser.add_argument('--format', dest='fmt', choices=sorted(exports.FORMATS), default='csv')
+        parser.add_argument('--from', dest='start', help='ISO date/datetime, inclusive')
+        parser.add_argument('--to', dest='end', help='ISO date/datetime, exclusive')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--output', '-o', help='File to write (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=exports.CHUNK_SIZE)
+        parser.add_argument('--include-archived', action='store_true',
+                            help='Append the rows moved by archive_bookings')
+
+    def handle(self, *args, **options):
+        try:
+            start = exports.parse_bound(options['start'])
+            end = exports.parse_bound(options['end'])
+        except ValueError as err:
+            raise CommandError(str(err))
+
+        stream = exports.export_stream(options['kind'], options['fmt'], start, end,
+                                       compress=options['gzip'], chunk_size=options['chunk_size'],
+                                       include_archived=options['include_archived'])
+        path = options['output']
+        if not path:
+            self.write_stdout(stream, options['gzip'])
+            return
+
+        written = 0
+        with open(path, 'wb') as out:
+            for chunk in stream:
+                out.write(chunk)
+                written += len(chunk)
+        self.stderr.write(self.style.SUCCESS(f"✅ Wrote {written / 1e6:.1f} MB to {path}"))
+
+    def write_stdout(self, stream, compressed):
+        """CSV/JSONL goes out as text through self.stdout; gzip needs its binary buffer."""
+        if not compressed:
+            for chunk in stream:  # whole encoded rows, so each chunk decodes on its own
+                self.stdout.write(chunk.decode(), ending='')
+            return
+        # OutputWrapper hands attribute lookups to the wrapped stream: sys.stdout has a
+        # buffer, a StringIO passed to call_command() doesn't
+        binary = getattr(self.stdout, 'buffer', None)
+        if binary is None:
+            raise CommandError("--gzip needs --output or a binary stdout.")
+        self.stdout.flush()
+        for chunk in stream:
+            binary.write(chunk)
+        binary.flush()
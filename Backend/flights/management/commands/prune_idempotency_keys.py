@@ -0,0 +1,27 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from flights.idempotency import KEY_TTL, PRUNE_BATCH_SIZE, expired_keys, prune_in_batches
+
+
+class Command(BaseCommand):
+    help = 'Deletes stored Idempotency-Key responses older than the TTL in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl-hours', type=float, default=KEY_TTL.total_seconds() / 3600,
+                            help='Age after which a stored key is deleted')
+        parser.add_argument('--batch-size', type=int, default=PRUNE_BATCH_SIZE, help='Rows per DELETE')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        ttl = datetime.timedelta(hours=options['ttl_hours'])
+
+        if options['dry_run']:
+            self.stdout.write(f"{expired_keys(ttl).count():,} idempotency keys would be deleted")
+            return
+
+        total = sum(prune_in_batches(ttl, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(f"✅ Deleted {total:,} expired idempotency keys"))
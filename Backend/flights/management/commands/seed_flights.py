@@ -1,140 +1,190 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from flights.cache import flight_cache
+from flights.fares import rebuild_fare_summary
+from flights.catalogue import load_flights, read_rows
 from flights.models import Flight
 
+# Define 100 diverse flights
+DEFAULT_FLIGHTS = [
+    # MUMBAI HUB
+    {"airline": "IndiGo", "origin": "Mumbai", "destination": "Delhi", "price": 4200},
+    {"airline": "Air India", "origin": "Mumbai", "destination": "Bangalore", "price": 3800},
+    {"airline": "Akasa Air", "origin": "Mumbai", "destination": "Hyderabad", "price": 3100},
+    {"airline": "SpiceJet", "origin": "Mumbai", "destination": "Goa", "price": 2800},
+    {"airline": "Air India Express", "origin": "Mumbai", "destination": "Kochi", "price": 4500},
+    {"airline": "IndiGo", "origin": "Mumbai", "destination": "Chennai", "price": 4100},
+    {"airline": "Akasa Air", "origin": "Mumbai", "destination": "Kolkata", "price": 5200},
+    {"airline": "Air India", "origin": "Mumbai", "destination": "Dubai", "price": 14500},
+    {"airline": "IndiGo", "origin": "Mumbai", "destination": "Singapore", "price": 18200},
+    {"airline": "Air India", "origin": "Mumbai", "destination": "London", "price": 48000},
+
+    # DELHI HUB
+    {"airline": "IndiGo", "origin": "Delhi", "destination": "Mumbai", "price": 4400},
+    {"airline": "Air India", "origin": "Delhi", "destination": "Bangalore", "price": 5500},
+    {"airline": "SpiceJet", "origin": "Delhi", "destination": "Jaipur", "price": 2200},
+    {"airline": "IndiGo", "origin": "Delhi", "destination": "Leh", "price": 7800},
+    {"airline": "Akasa Air", "origin": "Delhi", "destination": "Hyderabad", "price": 4900},
+    {"airline": "Air India Express", "origin": "Delhi", "destination": "Dubai", "price": 12800},
+    {"airline": "Air India", "origin": "Delhi", "destination": "New York", "price": 75000},
+    {"airline": "SpiceJet", "origin": "Delhi", "destination": "Kathmandu", "price": 8500},
+    {"airline": "IndiGo", "origin": "Delhi", "destination": "Pune", "price": 5100},
+    {"airline": "Akasa Air", "origin": "Delhi", "destination": "Ahmedabad", "price": 3200},
+
+    # BANGALORE HUB
+    {"airline": "Akasa Air", "origin": "Bangalore", "destination": "Mumbai", "price": 3600},
+    {"airline": "IndiGo", "origin": "Bangalore", "destination": "Delhi", "price": 5400},
+    {"airline": "Air India", "origin": "Bangalore", "destination": "Hyderabad", "price": 2800},
+    {"airline": "IndiGo", "origin": "Bangalore", "destination": "Chennai", "price": 2100},
+    {"airline": "SpiceJet", "origin": "Bangalore", "destination": "Kolkata", "price": 6200},
+    {"airline": "Air India Express", "origin": "Bangalore", "destination": "Goa", "price": 3300},
+    {"airline": "IndiGo", "origin": "Bangalore", "destination": "Lucknow", "price": 5100},
+    {"airline": "Air India", "origin": "Bangalore", "destination": "Paris", "price": 52000},
+    {"airline": "Akasa Air", "origin": "Bangalore", "destination": "Pune", "price": 3100},
+    {"airline": "IndiGo", "origin": "Bangalore", "destination": "Amritsar", "price": 7200},
+
+    # HYDERABAD HUB
+    {"airline": "IndiGo", "origin": "Hyderabad", "destination": "Visakhapatnam", "price": 2500},
+    {"airline": "SpiceJet", "origin": "Hyderabad", "destination": "Tirupati", "price": 2200},
+    {"airline": "Air India", "origin": "Hyderabad", "destination": "Delhi", "price": 5100},
+    {"airline": "Akasa Air", "origin": "Hyderabad", "destination": "Bangalore", "price": 2900},
+    {"airline": "Air India Express", "origin": "Hyderabad", "destination": "Mumbai", "price": 3200},
+    {"airline": "IndiGo", "origin": "Hyderabad", "destination": "Chennai", "price": 2700},
+    {"airline": "Air India", "origin": "Hyderabad", "destination": "London", "price": 55000},
+    {"airline": "IndiGo", "origin": "Hyderabad", "destination": "Goa", "price": 3400},
+    {"airline": "Akasa Air", "origin": "Hyderabad", "destination": "Kolkata", "price": 5800},
+    {"airline": "IndiGo", "origin": "Hyderabad", "destination": "Raipur", "price": 3100},
+
+    # CHENNAI & KOLKATA TIERS
+    {"airline": "IndiGo", "origin": "Chennai", "destination": "Coimbatore", "price": 2400},
+    {"airline": "Air India", "origin": "Chennai", "destination": "Port Blair", "price": 8500},
+    {"airline": "SpiceJet", "origin": "Kolkata", "destination": "Guwahati", "price": 2800},
+    {"airline": "IndiGo", "origin": "Kolkata", "destination": "Bagdogra", "price": 3100},
+    {"airline": "Air India", "origin": "Kolkata", "destination": "Bangkok", "price": 14200},
+    {"airline": "Air India Express", "origin": "Chennai", "destination": "Colombo", "price": 9500},
+    {"airline": "Akasa Air", "origin": "Kolkata", "destination": "Bhubaneswar", "price": 2200},
+    {"airline": "IndiGo", "origin": "Kolkata", "destination": "Ranchi", "price": 2600},
+    {"airline": "Air India", "origin": "Chennai", "destination": "Madurai", "price": 2900},
+    {"airline": "SpiceJet", "origin": "Kolkata", "destination": "Delhi", "price": 5800},
+
+    # TIER 2 & HOLIDAY ROUTES
+    {"airline": "IndiGo", "origin": "Goa", "destination": "Mumbai", "price": 2900},
+    {"airline": "SpiceJet", "origin": "Goa", "destination": "Delhi", "price": 5200},
+    {"airline": "Akasa Air", "origin": "Kochi", "destination": "Bangalore", "price": 2400},
+    {"airline": "Air India", "origin": "Ahmedabad", "destination": "Mumbai", "price": 2800},
+    {"airline": "IndiGo", "origin": "Pune", "destination": "Nagpur", "price": 3400},
+    {"airline": "SpiceJet", "origin": "Jaipur", "destination": "Jaisalmer", "price": 1800},
+    {"airline": "Air India Express", "origin": "Lucknow", "destination": "Dubai", "price": 11500},
+    {"airline": "IndiGo", "origin": "Surat", "destination": "Delhi", "price": 4200},
+    {"airline": "Akasa Air", "origin": "Varanasi", "destination": "Mumbai", "price": 5100},
+    {"airline": "Air India", "origin": "Indore", "destination": "Hyderabad", "price": 3700},
+
+    # INTERNATIONAL SEGMENT
+    {"airline": "Air India", "origin": "Dubai", "destination": "Delhi", "price": 12400},
+    {"airline": "IndiGo", "origin": "Singapore", "destination": "Chennai", "price": 13500},
+    {"airline": "Air India", "origin": "London", "destination": "Mumbai", "price": 51000},
+    {"airline": "Air India Express", "origin": "Abu Dhabi", "destination": "Kochi", "price": 10800},
+    {"airline": "SpiceJet", "origin": "Dubai", "destination": "Mumbai", "price": 11200},
+    {"airline": "IndiGo", "origin": "Bangkok", "destination": "Kolkata", "price": 12800},
+    {"airline": "Air India", "origin": "San Francisco", "destination": "Delhi", "price": 82000},
+    {"airline": "IndiGo", "origin": "Doha", "destination": "Hyderabad", "price": 15500},
+    {"airline": "Air India Express", "origin": "Muscat", "destination": "Calicut", "price": 9800},
+    {"airline": "IndiGo", "origin": "Hong Kong", "destination": "Delhi", "price": 22000},
+
+    # MIXED UTILITY ROUTES (20+ more)
+    {"airline": "IndiGo", "origin": "Mangalore", "destination": "Mumbai", "price": 3200},
+    {"airline": "Akasa Air", "origin": "Guwahati", "destination": "Bangalore", "price": 7200},
+    {"airline": "Air India", "origin": "Delhi", "destination": "Dehradun", "price": 2800},
+    {"airline": "SpiceJet", "origin": "Mumbai", "destination": "Aurangabad", "price": 2100},
+    {"airline": "IndiGo", "origin": "Bhopal", "destination": "Hyderabad", "price": 3500},
+    {"airline": "Akasa Air", "origin": "Mumbai", "destination": "Varanasi", "price": 4800},
+    {"airline": "Air India Express", "origin": "Surat", "destination": "Bangalore", "price": 4100},
+    {"airline": "IndiGo", "origin": "Delhi", "destination": "Patna", "price": 4200},
+    {"airline": "Air India", "origin": "Vijayawada", "destination": "Hyderabad", "price": 1900},
+    {"airline": "SpiceJet", "origin": "Delhi", "destination": "Srinagar", "price": 4800},
+    {"airline": "IndiGo", "origin": "Udaipur", "destination": "Mumbai", "price": 3100},
+    {"airline": "Akasa Air", "origin": "Mumbai", "destination": "Ahmedabad", "price": 2600},
+    {"airline": "Air India", "origin": "Pune", "destination": "Bangalore", "price": 3900},
+    {"airline": "IndiGo", "origin": "Jodhpur", "destination": "Delhi", "price": 3500},
+    {"airline": "SpiceJet", "origin": "Patna", "destination": "Mumbai", "price": 5200},
+    {"airline": "Air India Express", "origin": "Mumbai", "destination": "Mangalore", "price": 2800},
+    {"airline": "IndiGo", "origin": "Shimla", "destination": "Delhi", "price": 4500},
+    {"airline": "Akasa Air", "origin": "Guwahati", "destination": "Delhi", "price": 6100},
+    {"airline": "Air India", "origin": "Rajkot", "destination": "Mumbai", "price": 3200},
+    {"airline": "IndiGo", "origin": "Chennai", "destination": "Port Blair", "price": 9200},
+    {"airline": "SpiceJet", "origin": "Delhi", "destination": "Kolkata", "price": 6100},
+    {"airline": "Air India", "origin": "Trivandrum", "destination": "Delhi", "price": 6800},
+    {"airline": "Akasa Air", "origin": "Hyderabad", "destination": "Kochi", "price": 2900},
+    {"airline": "IndiGo", "origin": "Mumbai", "destination": "Lucknow", "price": 4900},
+    {"airline": "IndiGo", "origin": "Mumbai", "destination": "Amritsar", "price": 5400},
+    {"airline": "SpiceJet", "origin": "Varanasi", "destination": "Delhi", "price": 4100},
+    {"airline": "Akasa Air", "origin": "Bangalore", "destination": "Agartala", "price": 6800},
+    {"airline": "IndiGo", "origin": "Guwahati", "destination": "Delhi", "price": 5100},
+    {"airline": "Air India Express", "origin": "Calicut", "destination": "Riyadh", "price": 14200},
+    {"airline": "Air India", "origin": "Sydney", "destination": "Delhi", "price": 72000},
+]
+
+
 class Command(BaseCommand):
-    help = 'Bulk upload 100 production-ready flights for TravelGo'
-
-    def handle(self, *args, **kwargs):
-        self.stdout.write("🧹 Wiping database for a clean square...")
-        Flight.objects.all().delete()
-
-        # Define 100 diverse flights
-        flight_data = [
-            # MUMBAI HUB
-            {"airline": "IndiGo", "origin": "Mumbai", "destination": "Delhi", "price": 4200},
-            {"airline": "Air India", "origin": "Mumbai", "destination": "Bangalore", "price": 3800},
-            {"airline": "Akasa Air", "origin": "Mumbai", "destination": "Hyderabad", "price": 3100},
-            {"airline": "SpiceJet", "origin": "Mumbai", "destination": "Goa", "price": 2800},
-            {"airline": "Air India Express", "origin": "Mumbai", "destination": "Kochi", "price": 4500},
-            {"airline": "IndiGo", "origin": "Mumbai", "destination": "Chennai", "price": 4100},
-            {"airline": "Akasa Air", "origin": "Mumbai", "destination": "Kolkata", "price": 5200},
-            {"airline": "Air India", "origin": "Mumbai", "destination": "Dubai", "price": 14500},
-            {"airline": "IndiGo", "origin": "Mumbai", "destination": "Singapore", "price": 18200},
-            {"airline": "Air India", "origin": "Mumbai", "destination": "London", "price": 48000},
-
-            # DELHI HUB
-            {"airline": "IndiGo", "origin": "Delhi", "destination": "Mumbai", "price": 4400},
-            {"airline": "Air India", "origin": "Delhi", "destination": "Bangalore", "price": 5500},
-            {"airline": "SpiceJet", "origin": "Delhi", "destination": "Jaipur", "price": 2200},
-            {"airline": "IndiGo", "origin": "Delhi", "destination": "Leh", "price": 7800},
-            {"airline": "Akasa Air", "origin": "Delhi", "destination": "Hyderabad", "price": 4900},
-            {"airline": "Air India Express", "origin": "Delhi", "destination": "Dubai", "price": 12800},
-            {"airline": "Air India", "origin": "Delhi", "destination": "New York", "price": 75000},
-            {"airline": "SpiceJet", "origin": "Delhi", "destination": "Kathmandu", "price": 8500},
-            {"airline": "IndiGo", "origin": "Delhi", "destination": "Pune", "price": 5100},
-            {"airline": "Akasa Air", "origin": "Delhi", "destination": "Ahmedabad", "price": 3200},
-
-            # BANGALORE HUB
-            {"airline": "Akasa Air", "origin": "Bangalore", "destination": "Mumbai", "price": 3600},
-            {"airline": "IndiGo", "origin": "Bangalore", "destination": "Delhi", "price": 5400},
-            {"airline": "Air India", "origin": "Bangalore", "destination": "Hyderabad", "price": 2800},
-            {"airline": "IndiGo", "origin": "Bangalore", "destination": "Chennai", "price": 2100},
-            {"airline": "SpiceJet", "origin": "Bangalore", "destination": "Kolkata", "price": 6200},
-            {"airline": "Air India Express", "origin": "Bangalore", "destination": "Goa", "price": 3300},
-            {"airline": "IndiGo", "origin": "Bangalore", "destination": "Lucknow", "price": 5100},
-            {"airline": "Air India", "origin": "Bangalore", "destination": "Paris", "price": 52000},
-            {"airline": "Akasa Air", "origin": "Bangalore", "destination": "Pune", "price": 3100},
-            {"airline": "IndiGo", "origin": "Bangalore", "destination": "Amritsar", "price": 7200},
-
-            # HYDERABAD HUB
-            {"airline": "IndiGo", "origin": "Hyderabad", "destination": "Visakhapatnam", "price": 2500},
-            {"airline": "SpiceJet", "origin": "Hyderabad", "destination": "Tirupati", "price": 2200},
-            {"airline": "Air India", "origin": "Hyderabad", "destination": "Delhi", "price": 5100},
-            {"airline": "Akasa Air", "origin": "Hyderabad", "destination": "Bangalore", "price": 2900},
-            {"airline": "Air India Express", "origin": "Hyderabad", "destination": "Mumbai", "price": 3200},
-            {"airline": "IndiGo", "origin": "Hyderabad", "destination": "Chennai", "price": 2700},
-            {"airline": "Air India", "origin": "Hyderabad", "destination": "London", "price": 55000},
-            {"airline": "IndiGo", "origin": "Hyderabad", "destination": "Goa", "price": 3400},
-            {"airline": "Akasa Air", "origin": "Hyderabad", "destination": "Kolkata", "price": 5800},
-            {"airline": "IndiGo", "origin": "Hyderabad", "destination": "Raipur", "price": 3100},
-
-            # CHENNAI & KOLKATA TIERS
-            {"airline": "IndiGo", "origin": "Chennai", "destination": "Coimbatore", "price": 2400},
-            {"airline": "Air India", "origin": "Chennai", "destination": "Port Blair", "price": 8500},
-            {"airline": "SpiceJet", "origin": "Kolkata", "destination": "Guwahati", "price": 2800},
-            {"airline": "IndiGo", "origin": "Kolkata", "destination": "Bagdogra", "price": 3100},
-            {"airline": "Air India", "origin": "Kolkata", "destination": "Bangkok", "price": 14200},
-            {"airline": "Air India Express", "origin": "Chennai", "destination": "Colombo", "price": 9500},
-            {"airline": "Akasa Air", "origin": "Kolkata", "destination": "Bhubaneswar", "price": 2200},
-            {"airline": "IndiGo", "origin": "Kolkata", "destination": "Ranchi", "price": 2600},
-            {"airline": "Air India", "origin": "Chennai", "destination": "Madurai", "price": 2900},
-            {"airline": "SpiceJet", "origin": "Kolkata", "destination": "Delhi", "price": 5800},
-
-            # TIER 2 & HOLIDAY ROUTES
-            {"airline": "IndiGo", "origin": "Goa", "destination": "Mumbai", "price": 2900},
-            {"airline": "SpiceJet", "origin": "Goa", "destination": "Delhi", "price": 5200},
-            {"airline": "Akasa Air", "origin": "Kochi", "destination": "Bangalore", "price": 2400},
-            {"airline": "Air India", "origin": "Ahmedabad", "destination": "Mumbai", "price": 2800},
-            {"airline": "IndiGo", "origin": "Pune", "destination": "Nagpur", "price": 3400},
-            {"airline": "SpiceJet", "origin": "Jaipur", "destination": "Jaisalmer", "price": 1800},
-            {"airline": "Air India Express", "origin": "Lucknow", "destination": "Dubai", "price": 11500},
-            {"airline": "IndiGo", "origin": "Surat", "destination": "Delhi", "price": 4200},
-            {"airline": "Akasa Air", "origin": "Varanasi", "destination": "Mumbai", "price": 5100},
-            {"airline": "Air India", "origin": "Indore", "destination": "Hyderabad", "price": 3700},
-
-            # INTERNATIONAL SEGMENT
-            {"airline": "Air India", "origin": "Dubai", "destination": "Delhi", "price": 12400},
-            {"airline": "IndiGo", "origin": "Singapore", "destination": "Chennai", "price": 13500},
-            {"airline": "Air India", "origin": "London", "destination": "Mumbai", "price": 51000},
-            {"airline": "Air India Express", "origin": "Abu Dhabi", "destination": "Kochi", "price": 10800},
-            {"airline": "SpiceJet", "origin": "Dubai", "destination": "Mumbai", "price": 11200},
-            {"airline": "IndiGo", "origin": "Bangkok", "destination": "Kolkata", "price": 12800},
-            {"airline": "Air India", "origin": "San Francisco", "destination": "Delhi", "price": 82000},
-            {"airline": "IndiGo", "origin": "Doha", "destination": "Hyderabad", "price": 15500},
-            {"airline": "Air India Express", "origin": "Muscat", "destination": "Calicut", "price": 9800},
-            {"airline": "IndiGo", "origin": "Hong Kong", "destination": "Delhi", "price": 22000},
-
-            # MIXED UTILITY ROUTES (20+ more)
-            {"airline": "IndiGo", "origin": "Mangalore", "destination": "Mumbai", "price": 3200},
-            {"airline": "Akasa Air", "origin": "Guwahati", "destination": "Bangalore", "price": 7200},
-            {"airline": "Air India", "origin": "Delhi", "destination": "Dehradun", "price": 2800},
-            {"airline": "SpiceJet", "origin": "Mumbai", "destination": "Aurangabad", "price": 2100},
-            {"airline": "IndiGo", "origin": "Bhopal", "destination": "Hyderabad", "price": 3500},
-            {"airline": "Akasa Air", "origin": "Mumbai", "destination": "Varanasi", "price": 4800},
-            {"airline": "Air India Express", "origin": "Surat", "destination": "Bangalore", "price": 4100},
-            {"airline": "IndiGo", "origin": "Delhi", "destination": "Patna", "price": 4200},
-            {"airline": "Air India", "origin": "Vijayawada", "destination": "Hyderabad", "price": 1900},
-            {"airline": "SpiceJet", "origin": "Delhi", "destination": "Srinagar", "price": 4800},
-            {"airline": "IndiGo", "origin": "Udaipur", "destination": "Mumbai", "price": 3100},
-            {"airline": "Akasa Air", "origin": "Mumbai", "destination": "Ahmedabad", "price": 2600},
-            {"airline": "Air India", "origin": "Pune", "destination": "Bangalore", "price": 3900},
-            {"airline": "IndiGo", "origin": "Jodhpur", "destination": "Delhi", "price": 3500},
-            {"airline": "SpiceJet", "origin": "Patna", "destination": "Mumbai", "price": 5200},
-            {"airline": "Air India Express", "origin": "Mumbai", "destination": "Mangalore", "price": 2800},
-            {"airline": "IndiGo", "origin": "Shimla", "destination": "Delhi", "price": 4500},
-            {"airline": "Akasa Air", "origin": "Guwahati", "destination": "Delhi", "price": 6100},
-            {"airline": "Air India", "origin": "Rajkot", "destination": "Mumbai", "price": 3200},
-            {"airline": "IndiGo", "origin": "Chennai", "destination": "Port Blair", "price": 9200},
-            {"airline": "SpiceJet", "origin": "Delhi", "destination": "Kolkata", "price": 6100},
-            {"airline": "Air India", "origin": "Trivandrum", "destination": "Delhi", "price": 6800},
-            {"airline": "Akasa Air", "origin": "Hyderabad", "destination": "Kochi", "price": 2900},
-            {"airline": "IndiGo", "origin": "Mumbai", "destination": "Lucknow", "price": 4900},
-            {"airline": "IndiGo", "origin": "Mumbai", "destination": "Amritsar", "price": 5400},
-            {"airline": "SpiceJet", "origin": "Varanasi", "destination": "Delhi", "price": 4100},
-            {"airline": "Akasa Air", "origin": "Bangalore", "destination": "Agartala", "price": 6800},
-            {"airline": "IndiGo", "origin": "Guwahati", "destination": "Delhi", "price": 5100},
-            {"airline": "Air India Express", "origin": "Calicut", "destination": "Riyadh", "price": 14200},
-            {"airline": "Air India", "origin": "Sydney", "destination": "Delhi", "price": 72000},
-        ]
-
-        # Bulk creation
-        for f in flight_data:
-            Flight.objects.create(
-                airline=f["airline"],
-                origin=f["origin"],
-                destination=f["destination"],
-                price=f["price"],
-                special_offer="Official Flight Square"
+    help = 'Loads the flight catalogue: the 100 built-in TravelGo flights, or a CSV/JSONL file of any size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='CSV or JSONL file with airline, origin, destination, price[, special_offer]')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk INSERT / transaction')
+        parser.add_argument('--insert-only', action='store_true',
+                            help='Skip the (airline, origin, destination) upsert lookup; fastest for an empty table')
+        parser.add_argument('--replace', action='store_true',
+                            help='Wipe the table first (old behaviour; the catalogue is empty while loading)')
+
+    def handle(self, *args, **options):
+        if options['file']:
+            try:
+                rows = read_rows(options['file'], options['format'])
+            except OSError as err:
+                raise CommandError(f"Cannot read {options['file']}: {err}")
+            source = options['file']
+        else:
+            rows = ({**f, "special_offer": "Official Flight Square"} for f in DEFAULT_FLIGHTS)
+            source = "built-in catalogue"
+
+        if options['replace']:
+            self.stdout.write("🧹 Wiping database for a clean square...")
+            with transaction.atomic():
+                Flight.objects.all().delete()
+
+        self.next_report = 100_000
+        self.batches = 0
+        self.stdout.write(f"📥 Loading flights from {source} in batches of {options['batch_size']}...")
+        try:
+            stats = load_flights(
+                rows,
+                batch_size=options['batch_size'],
+                upsert=not (options['insert_only'] or options['replace']),
+                progress=self.report_progress,
             )
+        except (OSError, ValueError) as err:
+            raise CommandError(f"Import aborted: {err}")
+        finally:
+            # bulk_create/bulk_update skip model signals: rebuild the fare summary and
+            # invalidate the cached catalogue once for the whole import. Also when it
+            # fails halfway, as the batches before the error are committed.
+            if self.batches or options['replace']:
+                rebuild_fare_summary()
+                flight_cache.invalidate()
+
+        for error in stats['errors']:
+            self.stdout.write(self.style.WARNING(f"⚠️  Skipped {error}"))
+        total = stats['created'] + stats['updated']
+        rate = total / stats['seconds'] if stats['seconds'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"🚀 Squared {total} flights ({stats['created']} new, {stats['updated']} updated, "
+            f"{stats['skipped']} skipped) in {stats['seconds']:.2f}s - {rate:,.0f} rows/s"
+        ))
 
-        self.stdout.write(self.style.SUCCESS(f"🚀 Successfully Uploaded {len(flight_data)} Flights! TravelGo is now Squared."))
\ No newline at end of file
+    def report_progress(self, stats):
+        self.batches += 1  # called once each batch has committed
+        done = stats['created'] + stats['updated']
+        if done >= self.next_report:
+            self.stdout.write(f"   ... {done:,} rows ({done / stats['seconds']:,.0f} rows/s)")
+            self.next_report = done + 100_000
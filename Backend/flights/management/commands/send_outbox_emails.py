@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from flights.outbox import MAX_ATTEMPTS, claim_batch, deliver_batch
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued booking/cancellation emails from the outbox in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Emails sent per SMTP session')
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to sleep when the outbox is empty')
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS, help='Give up on an email after this many failures')
+        parser.add_argument('--once', action='store_true', help='Drain the due emails once and exit (cron mode)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stdout.write(f"📬 Outbox worker started (batch size {batch_size})")
+
+        while True:
+            rows = claim_batch(batch_size)
+            if rows:
+                sent, failed = deliver_batch(rows, max_attempts=options['max_attempts'])
+                self.stdout.write(f"✉️  Sent {sent}, failed {failed}")
+                # A full batch means more mail is probably waiting
+                if len(rows) == batch_size:
+                    continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS("✅ Outbox drained."))
@@ -0,0 +1,132 @@
+# flights/manifests.py
+"""
+Kitchen manifests for catering: per flight, how many meals of each food_type
+and for which seats.
+
+One GROUP BY over foodorder_manifest_idx (flight, food_type, seat_number)
+builds the manifest, with the seat lists concatenated by the database. Only
+meals of active (PENDING/BOOKED) bookings count. Results are cached per flight
+(and departure) until an order for that flight is written, or one of its
+bookings is cancelled, expired or moved (flights.signals, invalidate_on_commit).
+"""
+import re
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Aggregate, CharField, Count, Q, Sum
+
+from .fares import CENT
+from .models import Flight, FoodOrder
+from .seats import ACTIVE_STATUSES
+
+_SEAT = re.compile(r'^(\d+)(.*)$')
+
+
+class SeatList(Aggregate):
+    """The group's seat numbers as one comma-separated string (GROUP_CONCAT / STRING_AGG)."""
+    function = 'GROUP_CONCAT'
+    output_field = CharField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template="%(function)s(%(expressions)s, ',')", **extra_context)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, function='STRING_AGG',
+                           template="%(function)s(%(expressions)s, ',')", **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template="%(function)s(%(expressions)s SEPARATOR ',')", **extra_context)
+
+
+def seat_sort_key(seat):
+    """12A after 2B: row number first, then the letter."""
+    match = _SEAT.match(seat)
+    return (int(match.group(1)), match.group(2)) if match else (float('inf'), seat)
+
+
+def build_manifest(flight_id, departure=None):
+    """Raises Flight.DoesNotExist for an unknown flight."""
+    flight = Flight.objects.only('airline', 'origin', 'destination').get(pk=flight_id)
+    # Orders placed without a booking stay; a cancelled or expired booking's meal is not served
+    orders = FoodOrder.objects.filter(Q(booking__isnull=True) | Q(booking__status__in=ACTIVE_STATUSES), flight=flight)
+    if departure is not None:
+        orders = orders.filter(booking__flight_departure_datetime=departure)
+    groups = (orders.order_by().values('food_type')
+              .annotate(count=Count('id'), revenue=Sum('price'), seats=SeatList('seat_number'))
+              .order_by('food_type'))
+
+    meals = [{
+        'food_type': group['food_type'],
+        'count': group['count'],
+        'revenue': str(group['revenue'].quantize(CENT)),
+        'seats': sorted(group['seats'].split(','), key=seat_sort_key) if group['seats'] else [],
+    } for group in groups]
+    return {
+        'flight': flight.id,
+        'airline': flight.airline,
+        'origin': flight.origin,
+        'destination': flight.destination,
+        'departure': departure.isoformat() if departure else None,
+        'total_orders': sum(meal['count'] for meal in meals),
+        'meals': meals,
+    }
+
+
+class ManifestCache:
+    """
+    Manifests in the `catalogue` cache backend, one generation counter per flight:
+    an order for flight 7 only drops flight 7's manifests, whatever their departure.
+    """
+
+    def __init__(self, alias='catalogue'):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def generation(self, flight_id):
+        key = f"manifest:{flight_id}:generation"
+        generation = self.cache.get(key)
+        if generation is None:
+            # Never restart at 1: manifests of an evicted generation could still be cached
+            self.cache.add(key, time.time_ns(), timeout=None)
+            generation = self.cache.get(key)
+        return generation
+
+    def key_for(self, flight_id, departure):
+        return f"manifest:{flight_id}:{self.generation(flight_id)}:{departure.isoformat() if departure else 'all'}"
+
+    def get_or_build(self, flight_id, departure=None):
+        """(manifest, 'HIT' or 'MISS'); a hit costs no query at all."""
+        key = self.key_for(flight_id, departure)
+        manifest = self.cache.get(key)
+        if manifest is not None:
+            return manifest, 'HIT'
+        manifest = build_manifest(flight_id, departure)
+        self.cache.set(key, manifest)
+        return manifest, 'MISS'
+
+    def invalidate(self, flight_id):
+        try:
+            self.cache.incr(f"manifest:{flight_id}:generation")
+        except ValueError:
+            pass  # nothing cached for this flight (or evicted): next read starts a generation
+
+
+manifest_cache = ManifestCache()
+
+
+def invalidate_on_commit(flight_ids):
+    """
+    Drops the manifests of `flight_ids` once the current transaction commits.
+    For bulk booking changes (UPDATE / raw SQL) that no signal sees.
+    """
+    flight_ids = set(flight_ids) - {None}
+
+    def invalidate():
+        for flight_id in flight_ids:
+            manifest_cache.invalidate(flight_id)
+    if flight_ids:
+        transaction.on_commit(invalidate)
@@ -0,0 +1,192 @@
+# flights/metrics.py
+"""
+In-process request metrics: per-request timing (wall, DB, serializer, template),
+aggregated into per-endpoint histograms and exposed in Prometheus text format
+at /api/metrics.
+
+Everything here is per worker process; Prometheus sums the workers when it
+scrapes each one.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.template.base import Template
+
+# Upper bounds (seconds) for the latency histograms
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_current = ContextVar('flights_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Timings collected while a single sampled request is being handled."""
+    __slots__ = ('queries', 'db', 'serializer', 'template', 'active')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serializer = 0.0
+        self.template = 0.0
+        self.active = set()
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+@contextmanager
+def track(phase):
+    """
+    Adds the time spent in the block to the current request's `phase`
+    ('serializer' or 'template'). No-op outside a sampled request; nested
+    blocks of the same phase are only counted once.
+    """
+    metrics = _current.get()
+    if metrics is None or phase in metrics.active:
+        yield
+        return
+    metrics.active.add(phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, phase, getattr(metrics, phase) + time.perf_counter() - started)
+        metrics.active.discard(phase)
+
+
+def query_timer(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every DB connection (install_query_timer): counts
+    and times the queries of the current sampled request. The request is found
+    through the context variable, which asgiref carries into the threads running
+    async views' ORM calls, so sync and async requests are both measured.
+    """
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if metrics is not None:
+            metrics.queries += 1
+            metrics.db += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """connection_created hook: adds query_timer to the connection's execute wrappers (once)."""
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+def install_template_timer():
+    """
+    Wraps django.template's Template.render (once) so sampled requests report the
+    time spent rendering templates: admin pages, the browsable API, error pages.
+    Outside a sampled request (e.g. the outbox worker's emails) it only costs a lookup.
+    """
+    render = Template.render
+    if getattr(render, 'timed', False):
+        return
+
+    @functools.wraps(render)
+    def timed_render(self, context):
+        with track('template'):
+            return render(self, context)
+
+    timed_render.timed = True
+    Template.render = timed_render
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe per-endpoint counters and histograms."""
+
+    HISTOGRAMS = {
+        # name: (help text, buckets, RequestMetrics attribute or 'wall')
+        'travelgo_http_request_duration_seconds': ("Request wall time", TIME_BUCKETS, 'wall'),
+        'travelgo_db_query_duration_seconds': ("Total DB query time per request", TIME_BUCKETS, 'db'),
+        'travelgo_db_queries_per_request': ("DB queries issued per request", QUERY_BUCKETS, 'queries'),
+        'travelgo_serializer_duration_seconds': ("Serializer time per request", TIME_BUCKETS, 'serializer'),
+        'travelgo_template_render_duration_seconds': ("Template render time per request", TIME_BUCKETS, 'template'),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}    # (endpoint, method, status) -> count
+        self.histograms = {}  # (name, endpoint) -> Histogram
+
+    def count_request(self, endpoint, method, status):
+        key = (endpoint, method, str(status))
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def observe(self, endpoint, wall, metrics):
+        with self._lock:
+            for name, (_, buckets, source) in self.HISTOGRAMS.items():
+                histogram = self.histograms.get((name, endpoint))
+                if histogram is None:
+                    histogram = self.histograms[(name, endpoint)] = Histogram(buckets)
+                histogram.observe(wall if source == 'wall' else getattr(metrics, source))
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.histograms.clear()
+
+    def render_prometheus(self, extra_counters=()):
+        """Prometheus text exposition format 0.0.4."""
+        lines = [
+            "# HELP travelgo_http_requests_total Requests handled, by endpoint, method and status",
+            "# TYPE travelgo_http_requests_total counter",
+        ]
+        with self._lock:
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'travelgo_http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+            for name, (help_text, buckets, _) in self.HISTOGRAMS.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (metric, endpoint), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {histogram.total}')
+                    lines.append(f'{name}_count{{endpoint="{endpoint}"}} {histogram.count}')
+
+        for name, help_text, samples in extra_counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
@@ -1,42 +1,331 @@
 # flights/middleware.py
 import json
-import re
+import logging
+import math
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import metrics
+from .throttling import buckets, parse_rate
+from .validation import VALIDATORS
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+metrics_logger = logging.getLogger('flights.metrics')
+
+
+class HybridMiddleware:
+    """
+    Base for middleware that runs natively in both modes. Under ASGI, Django
+    would otherwise wrap a sync-only middleware in a thread hop for every request.
+    Subclasses implement __call__ (sync) and __acall__ (async).
+    """
+    sync_capable = True
+    async_capable = True
 
-class BookingValidationMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+def parsed_json(request):
+    """request.body decoded as JSON at most once per request; raises ValueError when malformed."""
+    if not hasattr(request, '_parsed_json'):
+        try:
+            request._parsed_json = json.loads(request.body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as err:
+            request._parsed_json = err
+    if isinstance(request._parsed_json, ValueError):
+        raise request._parsed_json
+    return request._parsed_json
+
+
+class ThrottleMiddleware(HybridMiddleware):
+    """
+    Per-client token buckets (flights.throttling) for the path prefixes in
+    settings.THROTTLES, e.g.
+
+        '/api/bookings/': {'methods': ['POST'], 'ip': '30/min', 'device': '10/min'}
+
+    'ip' counts per client address (DRF's NUM_PROXIES rules for X-Forwarded-For;
+    REMOTE_ADDR when no proxy count is configured, so a spoofed header can't mint buckets),
+    'device' per X-Device-ID header or `device_id` in the JSON body. Every
+    matching prefix applies. Over the limit: 429 with Retry-After.
+    settings.THROTTLE_ENABLED = False turns it off.
+    """
+    ident = BaseThrottle()
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.rules = []
+        if getattr(settings, 'THROTTLE_ENABLED', True):
+            for prefix, rule in getattr(settings, 'THROTTLES', {}).items():
+                methods = {method.upper() for method in rule.get('methods', ())}
+                limits = [(scope, *parse_rate(rule[scope])) for scope in ('ip', 'device') if scope in rule]
+                self.rules.append((prefix, methods, limits))
 
     def __call__(self, request):
-        # We only validate POST requests going to our bookings endpoint
-        if request.path == '/api/bookings/' and request.method == 'POST':
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.reject(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.reject(request) or await self.get_response(request)
+
+    def reject(self, request):
+        """The 429 response when a bucket is empty, or None."""
+        wait = 0.0
+        for prefix, methods, limits in self.rules:
+            if not request.path.startswith(prefix) or (methods and request.method not in methods):
+                continue
+            for scope, capacity, rate in limits:
+                client = self.client_id(request, scope)
+                if client:
+                    wait = max(wait, buckets.take(f"{prefix}|{scope}|{client}", capacity, rate))
+        if not wait:
+            return None
+        response = JsonResponse({"message": "Too many requests. Please slow down and try again shortly."}, status=429)
+        response['Retry-After'] = str(math.ceil(wait))
+        return response
+
+    def client_id(self, request, scope):
+        if scope == 'ip':
+            if api_settings.NUM_PROXIES is None:
+                # DRF would return the raw, client-supplied X-Forwarded-For
+                return request.META.get('REMOTE_ADDR')
+            return self.ident.get_ident(request)
+        device_id = request.headers.get('X-Device-ID')
+        if not device_id and request.method == 'POST' and request.content_type == 'application/json':
             try:
-                # Load the JSON body
-                body = json.loads(request.body)
-                
-                # 1. Validate Name
-                name = body.get('passenger_name', '')
-                if not name or len(name) < 3:
-                    return JsonResponse({"message": "Middleware Error: Name must be at least 3 characters."}, status=400)
-
-                # 2. Validate Email
-                email = body.get('passenger_email', '')
-                email_regex = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
-                if not re.match(email_regex, email):
-                    return JsonResponse({"message": "Middleware Error: Invalid email format."}, status=400)
-
-                # 3. Validate Phone (numeric and at least 10 digits)
-                phone = body.get('passenger_phone', '')
-                if not str(phone).isdigit() or len(str(phone)) < 10:
-                    return JsonResponse({"message": "Middleware Error: Phone must be at least 10 digits."}, status=400)
-
-                # 4. Validate Seat Format (e.g., 1A, 10F)
-                seat = body.get('seat_number', '')
-                if not re.match(r'^\d+[A-F]$', seat):
-                    return JsonResponse({"message": "Middleware Error: Seat must be format like '5A' or '10C'."}, status=400)
-
-            except json.JSONDecodeError:
-                return JsonResponse({"message": "Middleware Error: Malformed JSON data."}, status=400)
+                body = parsed_json(request)
+            except ValueError:
+                return None  # RequestValidationMiddleware / the parser answer with a 400
+            device_id = body.get('device_id') if isinstance(body, dict) else None
+        return str(device_id) if device_id else None
+
+
+class RequestValidationMiddleware(HybridMiddleware):
+    """
+    Validates JSON POST payloads for the endpoints listed in settings.REQUEST_VALIDATION
+    (path -> validator name in flights.validation.VALIDATORS).
+
+    The body is parsed once here and kept on `request.json_payload`;
+    flights.parsers.SharedJSONParser hands that same dict to DRF instead of
+    parsing the body a second time.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.rules = {
+            path: VALIDATORS[name]
+            for path, name in getattr(settings, 'REQUEST_VALIDATION', {}).items()
+        }
 
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
         # If data is valid, proceed to the view
-        return self.get_response(request)
\ No newline at end of file
+        return self.reject(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.reject(request) or await self.get_response(request)
+
+    def reject(self, request):
+        """
+        The 400 response for an invalid payload, or None. Only JSON bodies are
+        checked here; form and multipart posts (the browsable API) are left to
+        DRF's parsers and the serializers.
+        """
+        if request.method == 'POST' and request.content_type == 'application/json':
+            validator = self.rules.get(request.path)
+            if validator is not None:
+                try:
+                    body = parsed_json(request)
+                except ValueError:
+                    return JsonResponse({"message": "Middleware Error: Malformed JSON data."}, status=400)
+                if not isinstance(body, dict):
+                    return JsonResponse({"message": "Middleware Error: Expected a JSON object."}, status=400)
+
+                error = validator(body)
+                if error:
+                    return JsonResponse({"message": error}, status=400)
+                request.json_payload = body
+        return None
+
+
+class PerformanceMetricsMiddleware(HybridMiddleware):
+    """
+    Records wall time, DB query count/time, serializer and template time per request
+    and endpoint (URL name), feeds the /api/metrics histograms and writes one JSON
+    log line per sampled request to the `flights.metrics` logger.
+
+    settings.METRICS_SAMPLE_RATE (0.0-1.0) controls how many requests get the
+    detailed timing; every request is still counted.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled():
+            response = self.get_response(request)
+            metrics.registry.count_request(self.endpoint(request), request.method, response.status_code)
+            return response
+
+        request_metrics, token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self.record(request, response, time.perf_counter() - started, request_metrics)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            response = await self.get_response(request)
+            metrics.registry.count_request(self.endpoint(request), request.method, response.status_code)
+            return response
+
+        request_metrics, token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self.record(request, response, time.perf_counter() - started, request_metrics)
+        return response
+
+    @staticmethod
+    def sampled():
+        return random.random() < getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+
+    def record(self, request, response, wall, request_metrics):
+        endpoint = self.endpoint(request)
+        metrics.registry.count_request(endpoint, request.method, response.status_code)
+        metrics.registry.observe(endpoint, wall, request_metrics)
+        if metrics_logger.isEnabledFor(logging.INFO):
+            metrics_logger.info(json.dumps({
+                "endpoint": endpoint,
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "wall_ms": round(wall * 1000, 3),
+                "db_queries": request_metrics.queries,
+                "db_ms": round(request_metrics.db * 1000, 3),
+                "serializer_ms": round(request_metrics.serializer * 1000, 3),
+                "template_ms": round(request_metrics.template * 1000, 3),
+            }))
+
+    @staticmethod
+    def endpoint(request):
+        # URL names (e.g. "flight-list") keep the label set small, unlike raw paths
+        match = getattr(request, 'resolver_match', None)
+        return match.view_name if match else 'unmatched'
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that also runs natively under ASGI (WhiteNoise 6 is sync-only):
+    static files are served from a worker thread, everything else goes straight
+    on to the async handler.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        static_file = self.find_file(request.path_info) if self.autorefresh else self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+class CompressionMiddleware(HybridMiddleware):
+    """
+    Compresses large responses with brotli (when installed and accepted) or gzip.
+
+    Streaming responses are left alone: the finance exports gzip themselves and
+    WhiteNoise serves precompressed static files. Responses under
+    settings.COMPRESSION_MIN_SIZE bytes aren't worth the CPU.
+    """
+    # Random bytes in the gzip header, as django.middleware.gzip.GZipMiddleware (BREACH)
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding') or len(response.content) < self.min_size:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = self.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding == 'br':
+            compressed = brotli.compress(response.content, quality=4)  # fast; 11 is for static assets
+        elif encoding == 'gzip':
+            compressed = compress_string(response.content, max_random_bytes=self.max_random_bytes)
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+        # A strong ETag must not be shared by two encodings (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
+
+    @staticmethod
+    def negotiate(accept_encoding):
+        """'br', 'gzip' or None for an Accept-Encoding header (q=0 means refused)."""
+        accepted = set()
+        for item in accept_encoding.split(','):
+            coding, _, params = item.strip().partition(';')
+            quality = params.strip().removeprefix('q=')
+            try:
+                if params and float(quality) <= 0:
+                    continue
+            except ValueError:
+                continue
+            accepted.add(coding.strip().lower())
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted or '*' in accepted:
+            return 'gzip'
+        return None
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0008_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['origin', 'destination', 'price'], name='flight_route_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['airline', 'price'], name='flight_airline_price_idx'),
+        ),
+    ]
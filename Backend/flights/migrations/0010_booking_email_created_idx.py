@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0009_flight_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['passenger_email', '-created_at', '-id'], name='booking_email_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0011_seat_inventory'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['flight_departure_datetime'], name='booking_departure_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:58
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Max, Min
+
+
+def populate_fare_summary(apps, schema_editor):
+    # The aggregation is inlined (not flights.fares) so later changes to the app code can't break this migration
+    Flight = apps.get_model('flights', 'Flight')
+    RouteFareSummary = apps.get_model('flights', 'RouteFareSummary')
+    routes = Flight.objects.order_by().values('origin', 'destination').annotate(
+        min_price=Min('price'),
+        max_price=Max('price'),
+        avg_price=Avg('price'),
+        flight_count=Count('id'),
+        airline_count=Count('airline', distinct=True),
+    )
+    RouteFareSummary.objects.bulk_create(
+        RouteFareSummary(**{**route, 'avg_price': Decimal(str(route['avg_price'])).quantize(Decimal('0.01'))})
+        for route in routes
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0013_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RouteFareSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origin', models.CharField(max_length=100)),
+                ('destination', models.CharField(max_length=100)),
+                ('min_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('max_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('avg_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('flight_count', models.PositiveIntegerField()),
+                ('airline_count', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['origin', 'min_price'], name='fare_origin_min_price_idx')],
+                'constraints': [models.UniqueConstraint(fields=('origin', 'destination'), name='unique_fare_route')],
+            },
+        ),
+        migrations.RunPython(populate_fare_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import BigIntegerField, OuterRef, Subquery
+from django.db.models.functions import Cast
+
+
+def link_orders_to_flights(apps, schema_editor):
+    """The booking's flight where there is one, else a flight_number that is a Flight id."""
+    FoodOrder = apps.get_model('flights', 'FoodOrder')
+    Booking = apps.get_model('flights', 'Booking')
+    Flight = apps.get_model('flights', 'Flight')
+    FoodOrder.objects.filter(flight__isnull=True, booking__isnull=False).update(
+        flight=Subquery(Booking.objects.filter(pk=OuterRef('booking_id')).values('flight_id')[:1]))
+    FoodOrder.objects.filter(flight__isnull=True, flight_number__regex=r'^[0-9]{1,18}$').update(
+        flight=Subquery(Flight.objects.filter(
+            pk=Cast(OuterRef('flight_number'), BigIntegerField())).values('pk')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0014_routefaresummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='foodorder',
+            name='flight',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='food_orders', to='flights.flight'),
+        ),
+        migrations.AddIndex(
+            model_name='foodorder',
+            index=models.Index(fields=['flight', 'food_type', 'seat_number'], name='foodorder_manifest_idx'),
+        ),
+        migrations.RunPython(link_orders_to_flights, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0015_foodorder_flight'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='travelpackage',
+            index=models.Index(fields=['category', 'price_per_person', 'id'], name='package_category_price_idx'),
+        ),
+    ]
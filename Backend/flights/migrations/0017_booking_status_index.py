@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0016_travelpackage_category_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending Payment'), ('BOOKED', 'Confirmed'), ('CANCELLED', 'Cancelled'), ('FAILED', 'Payment Failed'), ('EXPIRED', 'Expired (never paid)')], default='PENDING', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'created_at'], name='booking_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+# Booking UNION ALL ArchivedBooking, read through the unmanaged BookingHistory model
+BOOKING_COLUMNS = (
+    'id, flight_id, passenger_name, passenger_email, passenger_phone, seat_number, total_price, '
+    'booking_location, device_id, status, razorpay_order_id, razorpay_payment_id, razorpay_signature, '
+    'created_at, flight_departure_datetime'
+)
+CREATE_HISTORY_VIEW = (
+    f"CREATE VIEW flights_bookinghistory AS "
+    f"SELECT {BOOKING_COLUMNS}, FALSE AS archived FROM flights_booking "
+    f"UNION ALL "
+    f"SELECT {BOOKING_COLUMNS}, TRUE AS archived FROM flights_archivedbooking"
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0017_booking_status_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingHistory',
+            fields=[
+                ('passenger_name', models.CharField(max_length=255)),
+                ('passenger_email', models.EmailField(max_length=254)),
+                ('passenger_phone', models.CharField(max_length=20)),
+                ('seat_number', models.CharField(max_length=10)),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('booking_location', models.CharField(blank=True, max_length=255)),
+                ('device_id', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending Payment'), ('BOOKED', 'Confirmed'), ('CANCELLED', 'Cancelled'), ('FAILED', 'Payment Failed'), ('EXPIRED', 'Expired (never paid)')], default='PENDING', max_length=20)),
+                ('razorpay_order_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('razorpay_payment_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('razorpay_signature', models.CharField(blank=True, max_length=200, null=True)),
+                ('flight_departure_datetime', models.DateTimeField(null=True)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('archived', models.BooleanField()),
+            ],
+            options={
+                'db_table': 'flights_bookinghistory',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('passenger_name', models.CharField(max_length=255)),
+                ('passenger_email', models.EmailField(max_length=254)),
+                ('passenger_phone', models.CharField(max_length=20)),
+                ('seat_number', models.CharField(max_length=10)),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('booking_location', models.CharField(blank=True, max_length=255)),
+                ('device_id', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending Payment'), ('BOOKED', 'Confirmed'), ('CANCELLED', 'Cancelled'), ('FAILED', 'Payment Failed'), ('EXPIRED', 'Expired (never paid)')], default='PENDING', max_length=20)),
+                ('razorpay_order_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('razorpay_payment_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('razorpay_signature', models.CharField(blank=True, max_length=200, null=True)),
+                ('flight_departure_datetime', models.DateTimeField(null=True)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('flight', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to='flights.flight')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedFoodOrder',
+            fields=[
+                ('passenger_name', models.CharField(max_length=255)),
+                ('flight_number', models.CharField(max_length=100)),
+                ('seat_number', models.CharField(max_length=10)),
+                ('food_type', models.CharField(max_length=100)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('ordered_at', models.DateTimeField()),
+                ('booking', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='food_orders', to='flights.archivedbooking')),
+                ('flight', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_food_orders', to='flights.flight')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedbooking',
+            index=models.Index(fields=['passenger_email', '-created_at', '-id'], name='archived_email_created_idx'),
+        ),
+        migrations.RunSQL(CREATE_HISTORY_VIEW, 'DROP VIEW flights_bookinghistory'),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:11
+
+import logging
+
+from django.db import migrations, models
+from django.db.models import Case, Count, When
+
+logger = logging.getLogger(__name__)
+
+
+def cancel_double_bookings(apps, schema_editor):
+    """
+    Seats held by more than one active booking without a departure can't take the
+    constraint: per seat, a paid (BOOKED) booking beats a PENDING one, then the oldest
+    wins; the others are marked CANCELLED and logged.
+    """
+    Booking = apps.get_model('flights', 'Booking')
+    active = Booking.objects.filter(status__in=['PENDING', 'BOOKED'], flight_departure_datetime__isnull=True)
+    clashes = list(active.order_by().values('flight', 'seat_number')
+                   .annotate(holders=Count('id')).filter(holders__gt=1))
+    for clash in clashes:
+        clash.pop('holders')
+        keep, *cancel = active.filter(**clash).order_by(
+            Case(When(status='BOOKED', then=0), default=1), 'created_at', 'id').values_list('id', flat=True)
+        Booking.objects.filter(pk__in=cancel).update(status='CANCELLED')
+        logger.warning("Double-booked seat %s: kept booking %s, cancelled %s", clash, keep, cancel)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0018_booking_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_double_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(condition=models.Q(('flight_departure_datetime__isnull', True), ('status__in', ['PENDING', 'BOOKED'])), fields=('flight', 'seat_number'), name='unique_active_seat_undated'),
+        ),
+    ]
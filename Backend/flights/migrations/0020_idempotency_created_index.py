@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0019_booking_undated_seat_constraint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='idempotencykey',
+            index=models.Index(fields=['created_at'], name='idempotency_created_idx'),
+        ),
+    ]
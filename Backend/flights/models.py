@@ -8,11 +8,97 @@ class Flight(models.Model):
     destination = models.CharField(max_length=100)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     special_offer = models.CharField(max_length=255, blank=True)
+    # Seat map: rows 1..seat_rows, one letter per seat in the row (e.g. 12A)
+    seat_rows = models.PositiveSmallIntegerField(default=30)
+    seat_letters = models.CharField(max_length=10, default='ABCDEF')
+
+    class Meta:
+        indexes = [
+            # Route search: WHERE origin = ? AND destination = ? [AND price BETWEEN ..] ORDER BY price
+            models.Index(fields=['origin', 'destination', 'price'], name='flight_route_price_idx'),
+            models.Index(fields=['airline', 'price'], name='flight_airline_price_idx'),
+        ]
 
     def __str__(self):
         return f"{self.airline}: {self.origin} to {self.destination}"
 
-class Booking(models.Model):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded route, so a save that moves the flight can refresh the old one too
+        instance._loaded_route = (instance.__dict__.get('origin'), instance.__dict__.get('destination'))
+        return instance
+
+class RouteFareSummary(models.Model):
+    """
+    Price aggregates per origin/destination, maintained by flights.fares: refreshed
+    per route on Flight writes and rebuilt in bulk by `seed_flights`.
+    """
+    origin = models.CharField(max_length=100)
+    destination = models.CharField(max_length=100)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2)
+    avg_price = models.DecimalField(max_digits=10, decimal_places=2)
+    flight_count = models.PositiveIntegerField()
+    airline_count = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['origin', 'destination'], name='unique_fare_route'),
+        ]
+        indexes = [
+            # "Cheapest fares from Mumbai": WHERE origin = ? ORDER BY min_price
+            models.Index(fields=['origin', 'min_price'], name='fare_origin_min_price_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.origin} to {self.destination}: from {self.min_price}"
+
+
+# Cancellation rules: no cancellations in the last 4 hours before departure, and
+# bookings cancelled within 24 hours of being made get their money back in full
+CANCELLATION_CUTOFF = datetime.timedelta(hours=4)
+FULL_REFUND_WINDOW = datetime.timedelta(hours=24)
+FULL_REFUND = "100% Full Refund"
+PARTIAL_REFUND = "70% Partial Refund"
+
+
+class BookingQuerySet(models.QuerySet):
+    """
+    Database-side versions of Booking.can_cancel / Booking.refund_eligibility.
+    Pass the same `now` to combine them so every row is judged at one instant.
+    """
+
+    def with_refund_status(self, now=None):
+        """Annotates `refund_status` (the refund_eligibility text) computed in SQL."""
+        now = now or timezone.now()
+        return self.annotate(refund_status=models.Case(
+            models.When(created_at__gt=now - FULL_REFUND_WINDOW, then=models.Value(FULL_REFUND)),
+            default=models.Value(PARTIAL_REFUND),
+            output_field=models.CharField(),
+        ))
+
+    def with_cancellation_flags(self, now=None):
+        """Annotates `cancellable` (can_cancel) and `refund_status` (refund_eligibility)."""
+        now = now or timezone.now()
+        return self.with_refund_status(now).annotate(cancellable=models.Case(
+            models.When(flight_departure_datetime__gt=now + CANCELLATION_CUTOFF, then=models.Value(True)),
+            default=models.Value(False),
+            output_field=models.BooleanField(),
+        ))
+
+    def cancellable(self, now=None):
+        """Bookings that can still be cancelled (a range scan on booking_departure_idx)."""
+        now = now or timezone.now()
+        return self.filter(flight_departure_datetime__gt=now + CANCELLATION_CUTOFF)
+
+
+class BookingRecord(models.Model):
+    """
+    The columns a booking keeps for life, shared by the hot Booking table and
+    ArchivedBooking (see flights.archive), so both read the same way.
+    """
     flight = models.ForeignKey('Flight', on_delete=models.CASCADE)
     passenger_name = models.CharField(max_length=255)
     passenger_email = models.EmailField()
@@ -30,7 +116,8 @@ class Booking(models.Model):
             ('PENDING', 'Pending Payment'),
             ('BOOKED', 'Confirmed'),
             ('CANCELLED', 'Cancelled'),
-            ('FAILED', 'Payment Failed')
+            ('FAILED', 'Payment Failed'),
+            ('EXPIRED', 'Expired (never paid)'),
         ],
         default='PENDING' 
     )
@@ -44,6 +131,11 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     flight_departure_datetime = models.DateTimeField(null=True) 
 
+    objects = BookingQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
     def __str__(self):
         return f"{self.passenger_name} - {self.status} ({self.seat_number})"
 
@@ -55,21 +147,87 @@ class Booking(models.Model):
         
         now = timezone.now()
         # Flight time must be at least 4 hours in the future from now
-        return self.flight_departure_datetime > (now + datetime.timedelta(hours=4))
+        return self.flight_departure_datetime > (now + CANCELLATION_CUTOFF)
 
     @property
     def refund_eligibility(self):
         """Logic: 100% Refund if cancelled within 24 hours of booking"""
         now = timezone.now()
-        diff = (now - self.created_at).total_seconds()
-        
-        if diff < 86400: # 24 hours in seconds
-            return "100% Full Refund"
-        return "70% Partial Refund"
-class FoodOrder(models.Model):
-    # Relate it to a booking for better data integrity
-    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='food_orders', null=True)
-    
+        if now - self.created_at < FULL_REFUND_WINDOW:
+            return FULL_REFUND
+        return PARTIAL_REFUND
+
+class Booking(BookingRecord):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the kitchen manifests depend on, so a save that changes it can refresh them
+        instance._loaded_manifest_state = cls.manifest_state(instance)
+        return instance
+
+    @staticmethod
+    def manifest_state(instance):
+        return (instance.__dict__.get('flight_id'), instance.__dict__.get('status'),
+                instance.__dict__.get('flight_departure_datetime'))
+
+    class Meta:
+        indexes = [
+            # My Bookings: WHERE passenger_email = ? ORDER BY created_at DESC, id DESC (cursor order)
+            models.Index(fields=['passenger_email', '-created_at', '-id'], name='booking_email_created_idx'),
+            # Cancellable listings / sweeps: WHERE flight_departure_datetime > now + cutoff
+            models.Index(fields=['flight_departure_datetime'], name='booking_departure_idx'),
+            # Status filters (admin list_filter) and the expiry sweep: WHERE status = ? AND created_at < ?
+            models.Index(fields=['status', 'created_at'], name='booking_status_created_idx'),
+        ]
+        constraints = [
+            # A seat can only be held once per departure. The database enforces it,
+            # so two concurrent POSTs for the same seat cannot both succeed.
+            models.UniqueConstraint(
+                fields=['flight', 'flight_departure_datetime', 'seat_number'],
+                condition=models.Q(status__in=['PENDING', 'BOOKED']),
+                name='unique_active_seat_per_departure',
+            ),
+            # NULLs are distinct in a unique index, so bookings without a departure
+            # need their own constraint to be held to one per seat as well
+            models.UniqueConstraint(
+                fields=['flight', 'seat_number'],
+                condition=models.Q(status__in=['PENDING', 'BOOKED'], flight_departure_datetime__isnull=True),
+                name='unique_active_seat_undated',
+            ),
+        ]
+
+class ArchivedBooking(BookingRecord):
+    """
+    A booking whose flight departed long ago, moved out of the hot table by
+    `archive_bookings`. Keeps the original id; timestamps are copied, not reset.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    flight = models.ForeignKey('Flight', on_delete=models.CASCADE, related_name='archived_bookings')
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # My Bookings with ?include_archived=1: the same lookup as booking_email_created_idx
+            models.Index(fields=['passenger_email', '-created_at', '-id'], name='archived_email_created_idx'),
+        ]
+
+class BookingHistory(BookingRecord):
+    """
+    Read-only view over Booking UNION ALL ArchivedBooking (created in migration
+    0018), for the reads that ask for archived history (?include_archived=1).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    flight = models.ForeignKey('Flight', on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    created_at = models.DateTimeField()
+    archived = models.BooleanField()
+
+    class Meta:
+        managed = False
+        db_table = 'flights_bookinghistory'
+
+class FoodOrderRecord(models.Model):
+    """The FoodOrder columns ArchivedFoodOrder keeps alongside its ArchivedBooking."""
     # Fields requested
     passenger_name = models.CharField(max_length=255)
     flight_number = models.CharField(max_length=100)
@@ -78,9 +236,31 @@ class FoodOrder(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     ordered_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        abstract = True
+
     def __str__(self):
         return f"{self.food_type} for {self.passenger_name}"    
 
+class FoodOrder(FoodOrderRecord):
+    # Relate it to a booking for better data integrity
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='food_orders', null=True)
+    # Set from the booking when omitted; what catering manifests are grouped by
+    flight = models.ForeignKey(Flight, on_delete=models.CASCADE, related_name='food_orders', null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Kitchen manifest: WHERE flight_id = ? GROUP BY food_type, seat list from the index alone
+            models.Index(fields=['flight', 'food_type', 'seat_number'], name='foodorder_manifest_idx'),
+        ]
+
+class ArchivedFoodOrder(FoodOrderRecord):
+    """A FoodOrder moved to the archive together with its booking."""
+    id = models.BigIntegerField(primary_key=True)
+    booking = models.ForeignKey(ArchivedBooking, on_delete=models.CASCADE, related_name='food_orders', null=True)
+    flight = models.ForeignKey(Flight, on_delete=models.CASCADE, related_name='archived_food_orders', null=True, blank=True)
+    ordered_at = models.DateTimeField()
+
 
 class TravelPackage(models.Model):
     CATEGORY_CHOICES = [
@@ -99,9 +279,25 @@ class TravelPackage(models.Model):
     flight_inclusion = models.CharField(max_length=255) # e.g. "Indigo Return Flight"
     hotel_inclusion = models.CharField(max_length=255)  # e.g. "5-Star Resort, 3 Nights"
 
+    # Everything the package listing shows; `description` is only loaded for the detail view
+    LIST_FIELDS = ('id', 'title', 'category', 'price_per_person', 'image_url', 'flight_inclusion', 'hotel_inclusion')
+
+    class Meta:
+        indexes = [
+            # Package listing: WHERE category = ? ORDER BY price_per_person, id (cursor order)
+            models.Index(fields=['category', 'price_per_person', 'id'], name='package_category_price_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.category})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded category, so a save that moves the package can invalidate the old one too
+        instance._loaded_category = instance.__dict__.get('category')
+        return instance
+
 class PackageBooking(models.Model):
     package = models.ForeignKey(TravelPackage, on_delete=models.CASCADE)
     passenger_name = models.CharField(max_length=255)
@@ -111,4 +307,61 @@ class PackageBooking(models.Model):
     booked_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.passenger_name} - {self.package.title}"        
\ No newline at end of file
+        return f"{self.passenger_name} - {self.package.title}"
+
+class EmailOutbox(models.Model):
+    """Outbound emails waiting for the `send_outbox_emails` worker."""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    recipient = models.EmailField()
+    template = models.CharField(max_length=255)
+    context = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # The worker only picks up rows whose next attempt is due (retry backoff / claim lease)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    The stored response of a POST sent with an Idempotency-Key header. The row is
+    written in the same transaction as the booking, so a retry either finds the
+    finished response or is the request that creates it.
+    """
+    scope = models.CharField(max_length=50)
+    key = models.CharField(max_length=255)
+    # sha256 of the request body: the same key with a different body is rejected
+    fingerprint = models.CharField(max_length=64)
+    # Filled in before the transaction commits; other requests never see them empty
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='unique_idempotency_key'),
+        ]
+        indexes = [
+            # The TTL sweep (prune_idempotency_keys): WHERE created_at < ? ORDER BY created_at
+            models.Index(fields=['created_at'], name='idempotency_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.key} ({self.status_code})"
@@ -0,0 +1,125 @@
+# flights/outbox.py
+import datetime
+
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .emails import build_professional_email
+from .models import EmailOutbox
+
+# A claimed row is retried by another worker if it is not resolved within this window
+CLAIM_LEASE = datetime.timedelta(minutes=5)
+RETRY_BASE_DELAY = 30       # seconds, doubled on every failed attempt
+RETRY_MAX_DELAY = 60 * 60   # never wait more than an hour between attempts
+MAX_ATTEMPTS = 5
+QUEUE_BATCH_SIZE = 1000
+
+
+def queue_email(subject, template, context, recipient_email):
+    """
+    Stores the email in the outbox once the surrounding transaction commits.
+    Outside of a transaction the row is written immediately.
+    """
+    transaction.on_commit(lambda: EmailOutbox.objects.create(
+        subject=subject,
+        template=template,
+        context=context,
+        recipient=recipient_email,
+    ))
+
+
+def queue_emails(messages, batch_size=QUEUE_BATCH_SIZE):
+    """
+    Bulk version of queue_email for fan-outs (e.g. a cancelled flight): `messages`
+    is a list of (subject, template, context, recipient) tuples, written on commit
+    with one bulk INSERT per `batch_size` rows.
+    """
+    transaction.on_commit(lambda: EmailOutbox.objects.bulk_create([
+        EmailOutbox(subject=subject, template=template, context=context, recipient=recipient)
+        for subject, template, context, recipient in messages
+    ], batch_size=batch_size))
+
+
+def retry_delay(attempts):
+    """Exponential backoff: 30s, 60s, 120s ... capped at RETRY_MAX_DELAY."""
+    return datetime.timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY))
+
+
+def _due_rows(now, batch_size):
+    return list(
+        EmailOutbox.objects.select_for_update(skip_locked=True)
+        .filter(status__in=['PENDING', 'SENDING'], next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id')[:batch_size]
+    )
+
+
+def claim_batch(batch_size):
+    """
+    Marks up to `batch_size` due rows as SENDING and returns them.
+
+    skip_locked lets several workers drain the outbox in parallel on PostgreSQL,
+    but it is a no-op on SQLite (and some MySQL setups). So each row is claimed
+    with a conditional UPDATE on the status and lease it was read with: a row
+    another worker claimed in between matches nothing and is left to that worker.
+    """
+    now = timezone.now()
+    lease = now + CLAIM_LEASE
+    claimed = []
+    with transaction.atomic():
+        for row in _due_rows(now, batch_size):
+            won = EmailOutbox.objects.filter(
+                pk=row.pk, status=row.status, next_attempt_at=row.next_attempt_at,
+            ).update(status='SENDING', next_attempt_at=lease)
+            if won:
+                row.status, row.next_attempt_at = 'SENDING', lease
+                claimed.append(row)
+    return claimed
+
+
+def deliver_batch(rows, connection=None, max_attempts=MAX_ATTEMPTS):
+    """
+    Sends the claimed rows over a single SMTP connection.
+    Returns a (sent, failed) tuple for the worker's progress output.
+    """
+    connection = connection or get_connection(fail_silently=False)
+    sent = failed = 0
+    try:
+        connection.open()
+    except Exception as err:
+        # Mail server unreachable: push the whole batch back with backoff
+        for row in rows:
+            row.attempts += 1
+            _mark_failed(row, err, max_attempts)
+            row.save(update_fields=['attempts', 'status', 'next_attempt_at', 'last_error'])
+        return 0, len(rows)
+
+    try:
+        for row in rows:
+            row.attempts += 1
+            try:
+                email = build_professional_email(row.subject, row.context, row.template, row.recipient, connection=connection)
+                email.send(fail_silently=False)
+            except Exception as err:
+                failed += 1
+                _mark_failed(row, err, max_attempts)
+                # A broken session is reopened by the next send_messages() call
+                connection.close()
+            else:
+                sent += 1
+                row.status = 'SENT'
+                row.sent_at = timezone.now()
+                row.last_error = ''
+            row.save(update_fields=['attempts', 'status', 'next_attempt_at', 'last_error', 'sent_at'])
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def _mark_failed(row, err, max_attempts):
+    row.last_error = str(err)[:1000]
+    if row.attempts >= max_attempts:
+        row.status = 'FAILED'
+    else:
+        row.status = 'PENDING'
+        row.next_attempt_at = timezone.now() + retry_delay(row.attempts)
@@ -0,0 +1,38 @@
+# flights/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class OptInCursorPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination that only kicks in when the client asks for it
+    with `?page_size=` or `?cursor=`. Without those params the endpoint keeps
+    returning a plain list, so the existing React screens keep working.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class FlightCursorPagination(OptInCursorPagination):
+    ordering = ('price', 'id')
+
+
+class FareSummaryCursorPagination(OptInCursorPagination):
+    ordering = ('min_price', 'id')
+
+
+class BookingCursorPagination(OptInCursorPagination):
+    # Newest first; bookings inserted while a client pages land before its cursor,
+    # so later pages never shift or repeat rows.
+    ordering = ('-created_at', '-id')
+
+
+class PackageCursorPagination(OptInCursorPagination):
+    # Cheapest first, the order of package_category_price_idx
+    ordering = ('price_per_person', 'id')
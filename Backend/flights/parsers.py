@@ -0,0 +1,16 @@
+# flights/parsers.py
+from rest_framework.parsers import JSONParser
+
+
+class SharedJSONParser(JSONParser):
+    """
+    JSONParser that reuses the body already parsed by RequestValidationMiddleware
+    (request.json_payload) instead of decoding the same bytes twice.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = (parser_context or {}).get('request')
+        payload = getattr(getattr(request, '_request', None), 'json_payload', None)
+        if payload is not None:
+            return payload
+        return super().parse(stream, media_type, parser_context)
@@ -0,0 +1,38 @@
+# flights/renderers.py
+"""
+JSON rendering for every API response (REST_FRAMEWORK DEFAULT_RENDERER_CLASSES
+and flights.async_views).
+
+With orjson installed, FastJSONRenderer encodes in C, Decimal and datetime
+included; without it, it is DRF's JSONRenderer. Both produce the same JSON:
+values orjson has no native form for matching DRF's (datetimes with a 'Z'
+suffix, Decimal as a number) go through DRF's encoder.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+_drf_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # orjson only writes compact UTF-8 (the DRF defaults): pretty printing (browsable
+        # API, `; indent=4`) and COMPACT_JSON/UNICODE_JSON = False stay on the stdlib path
+        if (orjson is None or not self.compact or self.ensure_ascii
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        rendered = orjson.dumps(data, default=_drf_default, option=ORJSON_OPTIONS)
+        # Like JSONRenderer: keep the output a strict JavaScript subset
+        if b'\xe2\x80\xa8' in rendered or b'\xe2\x80\xa9' in rendered:
+            rendered = rendered.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return rendered
@@ -0,0 +1,213 @@
+# flights/routes.py
+"""
+In-process route graph for connection search (/api/flights/connections/).
+
+Cities are interned to small integers and each city keeps three parallel
+arrays (destination ids, prices, flight ids) holding the cheapest flight per
+route, sorted by price. Searches are a lazy k-best Dijkstra: a heap entry is
+"take edge i of city u", and popping it only pushes the next sibling edge and
+the first edge of the city reached, so a query touches a few hundred edges
+even on a million-edge network.
+
+The graph follows the catalogue cache generation (flight_cache): writes made
+through the ORM patch the affected routes in place, anything else (bulk loads,
+other workers) makes the next search rebuild it from the Flight table.
+"""
+import heapq
+import threading
+from array import array
+
+from .cache import flight_cache
+from .models import Flight
+
+MAX_LEGS = 4
+
+
+class RouteGraph:
+
+    def __init__(self, generation=None):
+        self.generation = generation
+        self.cities = []      # city id -> name
+        self.city_ids = {}    # name -> city id
+        self.best = {}        # (origin id, destination id) -> (price, flight id) of the cheapest flight
+        self.route_of = {}    # flight id -> (origin id, destination id) for the flights in `best`
+        self.adjacency = []   # city id -> (destinations, prices, flight ids), sorted by price
+        self._lock = threading.Lock()
+
+    def intern(self, city):
+        city_id = self.city_ids.get(city)
+        if city_id is None:
+            city_id = self.city_ids[city] = len(self.cities)
+            self.cities.append(city)
+            self.adjacency.append((array('i'), array('d'), array('q')))
+        return city_id
+
+    @classmethod
+    def build(cls, rows, generation=None):
+        """`rows` yields (flight id, origin, destination, price)."""
+        graph = cls(generation)
+        best = graph.best
+        for flight_id, origin, destination, price in rows:
+            route = (graph.intern(origin), graph.intern(destination))
+            price = float(price)
+            current = best.get(route)
+            if current is None or (price, flight_id) < current:
+                best[route] = (price, flight_id)
+
+        outgoing = [[] for _ in graph.cities]
+        for (origin, destination), (price, flight_id) in best.items():
+            outgoing[origin].append((price, destination, flight_id))
+            graph.route_of[flight_id] = (origin, destination)
+        for city_id, edges in enumerate(outgoing):
+            graph.adjacency[city_id] = graph.pack(edges)
+        return graph
+
+    @classmethod
+    def from_database(cls, generation=None):
+        rows = Flight.objects.order_by().values_list('id', 'origin', 'destination', 'price').iterator(chunk_size=10_000)
+        return cls.build(rows, generation)
+
+    @staticmethod
+    def pack(edges):
+        edges.sort()
+        return (array('i', [edge[1] for edge in edges]),
+                array('d', [edge[0] for edge in edges]),
+                array('q', [edge[2] for edge in edges]))
+
+    # --- incremental maintenance -------------------------------------------------
+
+    def refresh_route(self, origin, destination):
+        """Re-reads the cheapest flight of one route (flight_route_price_idx) and patches the arrays."""
+        cheapest = (Flight.objects.filter(origin=origin, destination=destination)
+                    .order_by('price', 'id').values_list('price', 'id').first())
+        with self._lock:
+            route = (self.intern(origin), self.intern(destination))
+            previous = self.best.pop(route, None)
+            if previous is not None:
+                self.route_of.pop(previous[1], None)
+            if cheapest is not None:
+                self.best[route] = (float(cheapest[0]), cheapest[1])
+                self.route_of[cheapest[1]] = route
+
+            # Copy-on-write: searches running right now keep iterating the old arrays
+            targets, prices, flight_ids = self.adjacency[route[0]]
+            edges = [(price, target, flight_id) for target, price, flight_id in zip(targets, prices, flight_ids)
+                     if target != route[1]]
+            if cheapest is not None:
+                edges.append((float(cheapest[0]), route[1], cheapest[1]))
+            self.adjacency[route[0]] = self.pack(edges)
+
+    def flight_changed(self, flight_id, origin, destination):
+        """A flight was saved or deleted: refresh its route and the route it was cheapest on before."""
+        routes = {(origin, destination)}
+        previous = self.route_of.get(flight_id)
+        if previous is not None:
+            routes.add((self.cities[previous[0]], self.cities[previous[1]]))
+        for origin, destination in routes:
+            self.refresh_route(origin, destination)
+
+    # --- search -------------------------------------------------------------------
+
+    def search(self, origin, destination, max_legs=2, limit=5, by='price'):
+        """
+        Up to `limit` itineraries with at most `max_legs` flights, no city visited
+        twice, ordered by total price (`by='price'`) or by legs then price
+        (`by='legs'`). Each itinerary is (total price, [flight ids]).
+        """
+        source, target = self.city_ids.get(origin), self.city_ids.get(destination)
+        if source is None or target is None or source == target or max_legs < 1:
+            return []
+
+        by_legs = by == 'legs'
+        adjacency, best = self.adjacency, self.best
+        expanded = {}  # city id -> times it has been expanded (k-shortest rule)
+        results = []
+        heap = []
+        counter = 0  # tie-breaker so the heap never compares paths
+
+        def push(cost, legs, edges, edge, path, visited):
+            # `edges` is the city's array triple itself, so a concurrent
+            # refresh_route() swapping it out cannot shift the edge index
+            nonlocal counter
+            if edge < len(edges[0]):
+                total = cost + edges[1][edge]
+                counter += 1
+                key = (legs + 1, total) if by_legs else (total, legs + 1)
+                heapq.heappush(heap, (key, counter, cost, legs, edges, edge, path, visited))
+
+        def push_final(cost, legs, city, path, visited):
+            # Only one flight left: the last leg must land on the destination
+            nonlocal counter
+            direct = best.get((city, target))
+            if direct is not None:
+                total = cost + direct[0]
+                counter += 1
+                key = (legs + 1, total) if by_legs else (total, legs + 1)
+                heapq.heappush(heap, (key, counter, cost, legs, None, -1, path + (direct[1],), visited))
+
+        if max_legs == 1:
+            push_final(0.0, 0, source, (), (source,))
+        else:
+            push(0.0, 0, adjacency[source], 0, (), (source,))
+
+        while heap and len(results) < limit:
+            key, _, cost, legs, edges, edge, path, visited = heapq.heappop(heap)
+            if edge < 0:
+                results.append((key[1] if by_legs else key[0], path))
+                continue
+
+            targets, prices, flight_ids = edges
+            # The next-cheapest sibling edge from the same prefix
+            push(cost, legs, edges, edge + 1, path, visited)
+
+            reached, total = targets[edge], cost + prices[edge]
+            if reached in visited:
+                continue
+            step = path + (flight_ids[edge],)
+            if reached == target:
+                results.append((total, step))
+                continue
+            if legs + 1 >= max_legs or expanded.get(reached, 0) >= limit:
+                continue
+            expanded[reached] = expanded.get(reached, 0) + 1
+            if legs + 2 == max_legs:
+                push_final(total, legs + 1, reached, step, visited + (reached,))
+            else:
+                push(total, legs + 1, adjacency[reached], 0, step, visited + (reached,))
+        return results
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def route_graph():
+    """The current graph, rebuilt if the catalogue changed in a way it hasn't seen."""
+    global _graph
+    generation = flight_cache.generation()
+    graph = _graph
+    if graph is not None and graph.generation == generation:
+        return graph
+    with _graph_lock:
+        if _graph is None or _graph.generation != generation:
+            _graph = RouteGraph.from_database(generation)
+        return _graph
+
+
+def flights_changed(changes, generation):
+    """
+    Called after commit with the (flight id, origin, destination) of the written
+    flights and the generation the commit produced. If the graph is exactly one
+    generation behind, nothing else happened in between: patch it in place.
+    Otherwise leave it stale and let the next search rebuild it.
+    """
+    graph = _graph
+    if graph is not None and graph.generation == generation - 1:
+        for flight_id, origin, destination in changes:
+            graph.flight_changed(flight_id, origin, destination)
+        graph.generation = generation
+
+
+def reset():
+    global _graph
+    _graph = None
@@ -0,0 +1,141 @@
+# flights/seats.py
+"""
+Seat inventory: the per-flight seat map, the atomic reserve operations (one
+seat, or a whole group in one INSERT) and the compact availability bitmap
+served by /api/flights/<id>/seats/.
+"""
+import base64
+import random
+import re
+import time
+
+from django.db import IntegrityError, OperationalError, connection, transaction
+
+from .models import Booking
+
+# Statuses that hold a seat (mirrors the unique_active_seat_per_departure condition)
+ACTIVE_STATUSES = ('PENDING', 'BOOKED')
+SEAT_PATTERN = re.compile(r'^(\d+)([A-Z])$')
+LOCK_RETRIES = 5
+
+
+class SeatUnavailable(Exception):
+    """The seat is already held by another PENDING/BOOKED booking on this departure."""
+
+
+def seat_index(flight, seat_number):
+    """Position of the seat in the flight's seat map (row-major), or None if it is not on the map."""
+    match = SEAT_PATTERN.match(seat_number or '')
+    if not match:
+        return None
+    row, letter = int(match.group(1)), match.group(2)
+    if not 1 <= row <= flight.seat_rows or letter not in flight.seat_letters:
+        return None
+    return (row - 1) * len(flight.seat_letters) + flight.seat_letters.index(letter)
+
+
+def seat_label(flight, index):
+    """Inverse of seat_index(): 0 -> '1A'."""
+    row, position = divmod(index, len(flight.seat_letters))
+    return f"{row + 1}{flight.seat_letters[position]}"
+
+
+def allocate_seats(flight, departure, count, held=()):
+    """
+    `count` free seats for a group, side by side when possible: the first run of
+    `count` consecutive free seats in row-major order, else the first free ones.
+    `held` are seats already spoken for (e.g. picked by other group members).
+    """
+    total = flight.seat_rows * len(flight.seat_letters)
+    taken = {seat_index(flight, seat) for seat in taken_seats(flight, departure)}
+    taken.update(seat_index(flight, seat) for seat in held)
+    free = [index for index in range(total) if index not in taken]
+    if len(free) < count:
+        raise SeatUnavailable(f"Only {len(free)} seats left on this departure, {count} needed.")
+    for start in range(len(free) - count + 1):
+        if free[start + count - 1] - free[start] == count - 1:
+            return [seat_label(flight, index) for index in free[start:start + count]]
+    return [seat_label(flight, index) for index in free[:count]]
+
+
+def reserve_group(flight, departure, passengers, **shared_fields):
+    """
+    Books every passenger (dicts of Booking fields, `seat_number` optional) with
+    one bulk INSERT, all or nothing. Passengers without a seat get adjacent free
+    ones; if a concurrent booking grabs one of those first, the allocation is
+    redone. A requested seat that is taken raises SeatUnavailable.
+    """
+    requested = [passenger['seat_number'] for passenger in passengers if passenger.get('seat_number')]
+    unassigned = len(passengers) - len(requested)
+    for attempt in range(LOCK_RETRIES):
+        seats = iter(allocate_seats(flight, departure, unassigned, held=requested) if unassigned else ())
+        bookings = [
+            Booking(flight=flight, flight_departure_datetime=departure, **shared_fields,
+                    **{**passenger, 'seat_number': passenger.get('seat_number') or next(seats)})
+            for passenger in passengers
+        ]
+        try:
+            with transaction.atomic():
+                return Booking.objects.bulk_create(bookings)
+        except IntegrityError as err:
+            if 'unique_active_seat_per_departure' not in str(err) and 'seat_number' not in str(err):
+                raise
+            lost = sorted(set(taken_seats(flight, departure)) & set(requested))
+            if lost:
+                raise SeatUnavailable(f"Seats {', '.join(lost)} are already booked on this flight.")
+            if attempt == LOCK_RETRIES - 1:
+                raise SeatUnavailable("The seat map kept changing while allocating seats, please retry.")
+
+
+def reserve_seat(flight, seat_number, **booking_fields):
+    """
+    Creates the booking in one short transaction. The partial unique index is the
+    arbiter: the INSERT either claims the seat or fails, so there is no
+    read-then-write window and no flight-wide lock serializing other seats.
+
+    When called on its own, SQLite "database is locked" errors are retried with
+    jittered backoff; inside a caller's transaction they propagate to the caller.
+    """
+    nested = connection.in_atomic_block
+    for attempt in range(LOCK_RETRIES):
+        try:
+            with transaction.atomic(savepoint=False):
+                return Booking.objects.create(flight=flight, seat_number=seat_number, **booking_fields)
+        except IntegrityError as err:
+            if 'unique_active_seat_per_departure' not in str(err) and 'seat_number' not in str(err):
+                raise
+            raise SeatUnavailable(f"Seat {seat_number} is already booked on this flight.")
+        except OperationalError as err:
+            if nested or 'locked' not in str(err) or attempt == LOCK_RETRIES - 1:
+                raise
+            time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+
+
+def taken_seats(flight, departure):
+    return Booking.objects.filter(
+        flight=flight, flight_departure_datetime=departure, status__in=ACTIVE_STATUSES
+    ).values_list('seat_number', flat=True)
+
+
+def seat_availability(flight, departure):
+    """
+    One bit per seat in row-major order (bit set = taken), base64 encoded:
+    a 180-seat aircraft is 23 bytes instead of a list of booking rows.
+    """
+    total = flight.seat_rows * len(flight.seat_letters)
+    bitmap = bytearray((total + 7) // 8)
+    taken = 0
+    for seat_number in taken_seats(flight, departure):
+        index = seat_index(flight, seat_number)
+        if index is not None:
+            bitmap[index // 8] |= 0x80 >> (index % 8)
+            taken += 1
+    return {
+        'flight': flight.id,
+        'departure': departure,
+        'rows': flight.seat_rows,
+        'letters': flight.seat_letters,
+        'taken': taken,
+        'available': total - taken,
+        'bitmap': base64.b64encode(bytes(bitmap)).decode(),
+    }
@@ -1,16 +1,90 @@
 # flights/serializers.py
+from django.db.models import F
 from rest_framework import serializers
-from .models import Flight, Booking, FoodOrder
+from .models import Flight, Booking, FoodOrder, RouteFareSummary, TravelPackage, PackageBooking
+from .seats import seat_index
+from .metrics import track
 
-class FlightSerializer(serializers.ModelSerializer):
+MAX_GROUP_SIZE = 50
+
+
+class TimedSerializerMixin:
+    """Reports the time spent building `.data` to the request metrics."""
+
+    @property
+    def data(self):
+        with track('serializer'):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+def requested_fields(params, allowed):
+    """The names in `?fields=a,b` (None when absent); unknown names are a 400."""
+    value = params.get('fields')
+    if not value:
+        return None
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise serializers.ValidationError({'fields': f"Unknown fields {', '.join(unknown)}; "
+                                                     f"choose from {', '.join(allowed)}."})
+    return names
+
+class SparseFieldsetMixin:
+    """
+    `?fields=id,price` on a GET trims the response to those fields. Views narrow
+    the SQL to match with `sparse_columns()` (see SparseQuerysetMixin in views).
+    """
+    # Model columns read by fields that aren't a plain `source`
+    computed_columns = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None and request.method == 'GET':
+            # DRF Request or a plain HttpRequest (the async views)
+            names = requested_fields(getattr(request, 'query_params', request.GET), list(self.fields))
+            if names is not None:
+                for name in set(self.fields) - set(names):
+                    self.fields.pop(name)
+
+    @classmethod
+    def sparse_columns(cls, params):
+        """The only() column list for `?fields=` in `params` (None when absent)."""
+        fields = cls().fields
+        names = requested_fields(params, list(fields))
+        if names is None:
+            return None
+        columns = []
+        for name in names:
+            if name in cls.computed_columns:
+                columns.extend(cls.computed_columns[name])
+            elif fields[name].source != '*':
+                columns.append(fields[name].source.replace('.', '__'))
+        return columns
+
+class FlightSerializer(SparseFieldsetMixin, TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Flight
         fields = '__all__'
+        list_serializer_class = TimedListSerializer
 
-class BookingSerializer(serializers.ModelSerializer):
+class RouteFareSummarySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = RouteFareSummary
+        fields = ['origin', 'destination', 'min_price', 'max_price', 'avg_price', 'airline_count', 'flight_count']
+        list_serializer_class = TimedListSerializer
+
+class BookingSerializer(SparseFieldsetMixin, TimedSerializerMixin, serializers.ModelSerializer):
     flight_origin = serializers.ReadOnlyField(source='flight.origin')
     flight_destination = serializers.ReadOnlyField(source='flight.destination')
     flight_airline = serializers.ReadOnlyField(source='flight.airline')
+    can_cancel = serializers.SerializerMethodField()
+    refund_eligibility = serializers.SerializerMethodField()
+    # Fallbacks when the queryset lacks with_cancellation_flags()
+    computed_columns = {'can_cancel': ['flight_departure_datetime'], 'refund_eligibility': ['created_at']}
 
     class Meta:
         model = Booking
@@ -19,8 +93,10 @@ class BookingSerializer(serializers.ModelSerializer):
             'seat_number', 'total_price', 'booking_location', 'status', 
             'flight_departure_datetime', 'flight', 'device_id',
             'flight_origin', 'flight_destination', 'flight_airline',
-            'razorpay_order_id', 'razorpay_payment_id', 'razorpay_signature' 
+            'razorpay_order_id', 'razorpay_payment_id', 'razorpay_signature',
+            'can_cancel', 'refund_eligibility',
         ]
+        list_serializer_class = TimedListSerializer
         
         # SQUARING FIX: These fields shouldn't stop the POST request 
         # because they are filled by the BACKEND logic later.
@@ -32,8 +108,165 @@ class BookingSerializer(serializers.ModelSerializer):
             # VERY IMPORTANT: If your flight FK is failing
             'flight': {'required': True},
         }
+        # Seat uniqueness is enforced by the database (unique_active_seat_per_departure)
+        # and reported as 409 by the view, instead of a racy pre-check query here.
+        validators = []
+
+    # Read from BookingQuerySet.with_cancellation_flags() when the queryset has it,
+    # so a listing doesn't call timezone.now() per row
+    def get_can_cancel(self, obj):
+        cancellable = getattr(obj, 'cancellable', None)
+        return obj.can_cancel if cancellable is None else cancellable
+
+    def get_refund_eligibility(self, obj):
+        return getattr(obj, 'refund_status', None) or obj.refund_eligibility
+
+    def validate(self, attrs):
+        flight = attrs.get('flight') or getattr(self.instance, 'flight', None)
+        seat_number = attrs.get('seat_number')
+        if flight and seat_number and seat_index(flight, seat_number) is None:
+            raise serializers.ValidationError({
+                'seat_number': f"Seat {seat_number} is not on this flight's seat map "
+                               f"(rows 1-{flight.seat_rows}, seats {flight.seat_letters})."
+            })
+        return attrs
+
+class GroupPassengerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Booking
+        fields = ['passenger_name', 'passenger_email', 'passenger_phone', 'seat_number', 'total_price']
+        extra_kwargs = {
+            # Left out: a seat is allocated next to the rest of the group / the fare defaults to the flight's
+            'seat_number': {'required': False},
+            'total_price': {'required': False},
+        }
+        validators = []
+
+class GroupBookingSerializer(serializers.Serializer):
+    """One flight and departure, up to MAX_GROUP_SIZE passengers, validated together."""
+    flight = serializers.PrimaryKeyRelatedField(queryset=Flight.objects.all())
+    flight_departure_datetime = serializers.DateTimeField()
+    booking_location = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    device_id = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    passengers = GroupPassengerSerializer(many=True, min_length=1, max_length=MAX_GROUP_SIZE)
+
+    def validate(self, attrs):
+        flight = attrs['flight']
+        seats = [passenger['seat_number'] for passenger in attrs['passengers'] if passenger.get('seat_number')]
+        off_map = [seat for seat in seats if seat_index(flight, seat) is None]
+        if off_map:
+            raise serializers.ValidationError({
+                'passengers': f"Seats {', '.join(off_map)} are not on this flight's seat map "
+                              f"(rows 1-{flight.seat_rows}, seats {flight.seat_letters})."
+            })
+        duplicates = sorted({seat for seat in seats if seats.count(seat) > 1})
+        if duplicates:
+            raise serializers.ValidationError({'passengers': f"Seats {', '.join(duplicates)} are requested twice."})
+        return attrs
+
+def sort_keys(ordering):
+    """Column names of an ordering tuple like ('-created_at', '-id')."""
+    return [field.lstrip('-') for field in ordering]
+
+
+class BookingFlatSerializer:
+    """
+    Read-only fast path for booking listings (?flat=1).
+    Works on queryset.values() rows, so no Booking/Flight instances are built,
+    and returns the same keys and formats as BookingSerializer.
+    """
+    related_fields = {
+        'flight_origin': F('flight__origin'),
+        'flight_destination': F('flight__destination'),
+        'flight_airline': F('flight__airline'),
+        # Annotations from BookingQuerySet.with_cancellation_flags()
+        'can_cancel': F('cancellable'),
+        'refund_eligibility': F('refund_status'),
+    }
+    value_fields = [name for name in BookingSerializer.Meta.fields
+                    if name not in ('flight_origin', 'flight_destination', 'flight_airline',
+                                    'can_cancel', 'refund_eligibility')]
+
+    def __init__(self, queryset, params=None):
+        self.queryset = queryset
+        # The keys to render: `?fields=` when given (the rows may carry sort keys on top)
+        self.names = requested_fields(params, BookingSerializer.Meta.fields) if params is not None else None
+
+    @classmethod
+    def rows(cls, queryset, params=None, ordering=()):
+        """
+        The values() queryset the fast path reads from (also what gets paginated),
+        narrowed to `?fields=` when `params` has it.
+        `queryset` must come from Booking.objects (or BookingHistory.objects).with_cancellation_flags().
+        `ordering` is the paginator's: CursorPagination reads those keys off every
+        row, so they are selected too (and dropped again by `data`).
+        """
+        names = requested_fields(params, BookingSerializer.Meta.fields) if params is not None else None
+        if names is None:
+            values, related = cls.value_fields, cls.related_fields
+        else:
+            values = [name for name in cls.value_fields if name in names]
+            related = {name: expr for name, expr in cls.related_fields.items() if name in names}
+        keys = [key for key in sort_keys(ordering) if key not in values]
+        return queryset.values(*values, *keys, **related)
+
+    @property
+    def data(self):
+        with track('serializer'):
+            return self.build()
+
+    def build(self):
+        fields = BookingSerializer().fields
+        price, departure = fields['total_price'], fields['flight_departure_datetime']
+        data = []
+        rendered = set(self.names or fields)
+        hidden = None
+        for row in self.queryset:
+            if hidden is None:
+                hidden = {key for key in row if key not in rendered}
+            if hidden:
+                # A copy: the paginator still reads the sort keys off the original row
+                row = {key: value for key, value in row.items() if key not in hidden}
+            if 'total_price' in row:
+                row['total_price'] = price.to_representation(row['total_price'])
+            if row.get('flight_departure_datetime') is not None:
+                row['flight_departure_datetime'] = departure.to_representation(row['flight_departure_datetime'])
+            data.append(row)
+        return data
 
-class FoodOrderSerializer(serializers.ModelSerializer):
+class FoodOrderSerializer(SparseFieldsetMixin, TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = FoodOrder
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        list_serializer_class = TimedListSerializer
+
+    def validate(self, attrs):
+        # Link the order to its flight for the kitchen manifest when the client only sent the booking
+        booking = attrs.get('booking')
+        if attrs.get('flight') is None and booking is not None:
+            attrs.pop('flight', None)
+            attrs['flight_id'] = booking.flight_id  # no need to load the Flight
+        return attrs
+
+class TravelPackageSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = TravelPackage
+        fields = '__all__'
+        list_serializer_class = TimedListSerializer
+
+class TravelPackageListSerializer(TravelPackageSerializer):
+    """Listing cards: everything but the description, matching TravelPackage.LIST_FIELDS."""
+    class Meta(TravelPackageSerializer.Meta):
+        fields = list(TravelPackage.LIST_FIELDS)
+
+class PackageBookingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # Only the columns __str__ and the response need; never the description
+    package = serializers.PrimaryKeyRelatedField(queryset=TravelPackage.objects.only('id', 'title'))
+    package_title = serializers.ReadOnlyField(source='package.title')
+
+    class Meta:
+        model = PackageBooking
+        fields = ['id', 'package', 'package_title', 'passenger_name', 'passenger_email',
+                  'status', 'local_transaction_id', 'booked_at']
+        read_only_fields = ['status', 'local_transaction_id', 'booked_at']
+        list_serializer_class = TimedListSerializer
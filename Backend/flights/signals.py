@@ -0,0 +1,91 @@
+# flights/signals.py
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import routes
+from .cache import flight_cache, package_cache
+from .fares import rebuild_fare_summary, refresh_routes
+from .manifests import invalidate_on_commit, manifest_cache
+from .models import Booking, Flight, FoodOrder, TravelPackage
+
+# Past this many writes in one commit, rebuilding beats patching route by route
+BULK_REFRESH_THRESHOLD = 100
+
+# Per thread, like the DB connection whose commit flushes it:
+# (flight id, origin, destination, routes to refresh) awaiting a commit
+_pending = threading.local()
+
+
+@receiver([post_save, post_delete], sender=Flight)
+def flight_written(sender, instance, **kwargs):
+    # Captured now: a deleted instance has lost its pk by the time the callback runs
+    origin, destination = instance.origin, instance.destination
+    # A save can move a flight to another route; that one's fares change too
+    changed_routes = {(origin, destination), getattr(instance, '_loaded_route', (origin, destination))}
+    instance._loaded_route = (origin, destination)
+    if not hasattr(_pending, 'changes'):
+        _pending.changes = []
+    _pending.changes.append((instance.pk, origin, destination, changed_routes))
+    # After commit, so a concurrent GET cannot re-cache the pre-write rows
+    transaction.on_commit(apply_flight_changes)
+
+
+def apply_flight_changes():
+    """
+    Runs once per commit in practice: the first callback takes every pending write
+    (a bulk delete queues thousands), the rest find nothing to do. Entries left
+    by a rolled-back transaction are harmless, refreshes re-read the table.
+    """
+    changes = getattr(_pending, 'changes', None)
+    _pending.changes = []
+    if not changes:
+        return
+
+    # Fare summary first, then the generation bump, so a GET of the new
+    # generation can't cache the old fares
+    if len(changes) > BULK_REFRESH_THRESHOLD:
+        rebuild_fare_summary()
+    else:
+        refresh_routes(set().union(*(changed for *_, changed in changes)))
+
+    generation = flight_cache.invalidate()
+    if len(changes) <= BULK_REFRESH_THRESHOLD:
+        routes.flights_changed([change[:3] for change in changes], generation)
+    # Otherwise the route graph sees a generation it missed and rebuilds on the next search
+
+
+@receiver([post_save, post_delete], sender=FoodOrder)
+def food_order_written(sender, instance, **kwargs):
+    """A placed, changed or deleted order drops its flight's cached manifests once committed."""
+    if instance.flight_id is not None:
+        flight_id = instance.flight_id
+        transaction.on_commit(lambda: manifest_cache.invalidate(flight_id))
+
+
+@receiver(post_save, sender=Booking)
+def booking_written(sender, instance, created, **kwargs):
+    """
+    A booking that was cancelled, expired or moved to another departure takes its
+    meals off (or onto) a manifest: drop its flight's manifests once committed.
+    New bookings have no orders yet.
+    """
+    state = Booking.manifest_state(instance)
+    loaded = getattr(instance, '_loaded_manifest_state', None)
+    instance._loaded_manifest_state = state
+    if not created and state != loaded:
+        invalidate_on_commit({state[0], loaded[0] if loaded else None})
+
+
+@receiver([post_save, post_delete], sender=TravelPackage)
+def package_written(sender, instance, **kwargs):
+    """Drops the cached listing pages of the package's category (old and new) and of 'all'."""
+    categories = {instance.category, getattr(instance, '_loaded_category', instance.category), None}
+    instance._loaded_category = instance.category
+
+    def invalidate():
+        for category in categories:
+            package_cache(category).invalidate()
+    transaction.on_commit(invalidate)
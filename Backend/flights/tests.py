@@ -1,3 +1,1496 @@
-from django.test import TestCase
+import base64
+import csv
+import datetime
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from io import BytesIO, StringIO, TextIOWrapper
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.template.loader import render_to_string
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.utils.html import strip_tags
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .models import Flight, Booking, FoodOrder, EmailOutbox, IdempotencyKey, RouteFareSummary, TravelPackage, PackageBooking
+from .models import ArchivedBooking, ArchivedFoodOrder
+from .outbox import claim_batch, deliver_batch
+from .cache import flight_cache
+from .emails import EmailRenderer, build_professional_email
+from .expiry import expire_in_batches, stale_bookings
+from .archive import archive_in_batches
+from .disruptions import CANCEL, RESCHEDULE, disrupt_flight
+from .idempotency import front_cache
+from .routes import RouteGraph
+from .seats import SeatUnavailable, reserve_seat
+from .metrics import registry
+from . import middleware
+from .middleware import CompressionMiddleware, ThrottleMiddleware
+from .renderers import FastJSONRenderer
+from .throttling import TokenBuckets, buckets, parse_rate
+
+
+class TravelGoTestCase(TestCase):
+    """Shared fixtures: one flight and a valid booking payload."""
+
+    def setUp(self):
+        # The test run's own LocMemCache (see CACHES in settings), never a shared one
+        self.assertEqual(settings.CACHES['catalogue']['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+        caches['catalogue'].clear()
+        buckets.clear()
+        self.client = APIClient()
+        self.flight = Flight.objects.create(airline="IndiGo", origin="Mumbai", destination="Delhi", price=4200)
+
+    def booking_payload(self, **overrides):
+        payload = {
+            "flight": self.flight.id,
+            "passenger_name": "Asha Rao",
+            "passenger_email": "asha@example.com",
+            "passenger_phone": "9876543210",
+            "seat_number": "12A",
+            "total_price": "4200.00",
+            "flight_departure_datetime": (timezone.now() + datetime.timedelta(days=3)).isoformat(),
+        }
+        payload.update(overrides)
+        return payload
+
+    def make_booking(self, **overrides):
+        fields = {
+            "flight": self.flight,
+            "passenger_name": "Asha Rao",
+            "passenger_email": "asha@example.com",
+            "passenger_phone": "9876543210",
+            "seat_number": "12A",
+            "total_price": 4200,
+            "status": "BOOKED",
+            "flight_departure_datetime": timezone.now() + datetime.timedelta(days=3),
+        }
+        fields.update(overrides)
+        return Booking.objects.create(**fields)
+
+
+class EmailOutboxTests(TravelGoTestCase):
+
+    def test_booking_queues_confirmation_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post('/api/bookings/', self.booking_payload(), format='json')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(len(mail.outbox), 0)  # nothing is sent inside the request
+        queued = EmailOutbox.objects.get()
+        self.assertEqual(queued.recipient, "asha@example.com")
+        self.assertEqual(queued.template, 'emails/booking_confirmation.html')
+
+    def test_cancel_ticket_queues_cancellation(self):
+        booking = self.make_booking()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/bookings/{booking.id}/cancel_ticket/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(EmailOutbox.objects.get().template, 'emails/cancellation_email.html')
+
+    def test_worker_sends_batch_over_one_connection(self):
+        for i in range(3):
+            EmailOutbox.objects.create(subject="Ticket", recipient=f"p{i}@example.com",
+                                       template='emails/cancellation_email.html', context={"passenger_name": "P"})
+
+        call_command('send_outbox_emails', '--once', stdout=mock.MagicMock())
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(EmailOutbox.objects.filter(status='SENT').count(), 3)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        EmailOutbox.objects.create(subject="Ticket", recipient="p@example.com",
+                                   template='emails/cancellation_email.html', context={})
+        rows = claim_batch(10)
+        with mock.patch('django.core.mail.EmailMultiAlternatives.send', side_effect=OSError("smtp down")):
+            sent, failed = deliver_batch(rows, max_attempts=2)
+
+        row = EmailOutbox.objects.get()
+        self.assertEqual((sent, failed), (0, 1))
+        self.assertEqual(row.status, 'PENDING')
+        self.assertGreater(row.next_attempt_at, timezone.now())
+        self.assertEqual(claim_batch(10), [])  # not due yet
+
+    def test_rows_claimed_by_another_worker_are_not_claimed_twice(self):
+        EmailOutbox.objects.create(subject="Ticket", recipient="p@example.com",
+                                   template='emails/cancellation_email.html', context={})
+        # Worker B read the row before worker A claimed it (no skip_locked on SQLite)
+        stale = list(EmailOutbox.objects.all())
+        self.assertEqual(len(claim_batch(10)), 1)
+
+        with mock.patch('flights.outbox._due_rows', return_value=stale):
+            self.assertEqual(claim_batch(10), [])
+
+
+class EmailRendererTests(TestCase):
+    context = {
+        'passenger_name': "Asha Rao", 'airline': "IndiGo", 'origin': "Mumbai", 'destination': "Delhi",
+        'seat_number': "12A", 'refund_status': "Full Refund", 'departure_time': "01 Nov 2026, 09:30",
+    }
+
+    def test_precomputed_text_matches_stripped_html(self):
+        for template in ('emails/cancellation_email.html', 'emails/booking_confirmation.html'):
+            with self.subTest(template=template):
+                html = render_to_string(template, self.context)
+                email = build_professional_email("Ticket", self.context, template, "asha@example.com")
+                self.assertEqual(email.alternatives[0][0], html)
+                self.assertEqual(email.body, strip_tags(html))
+
+    def test_logo_part_is_cached_until_the_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'logo.png')
+            with open(path, 'wb') as f:
+                f.write(b'\x89PNG\r\n\x1a\nfirst')
+            renderer = EmailRenderer(logo_path=path)
+
+            first = renderer.logo()
+            self.assertIs(renderer.logo(), first)
+
+            with open(path, 'wb') as f:
+                f.write(b'\x89PNG\r\n\x1a\nsecond')
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+            second = renderer.logo()
+            self.assertIsNot(second, first)
+            self.assertEqual(second.get_payload(decode=True), b'\x89PNG\r\n\x1a\nsecond')
+
+            os.remove(path)
+            self.assertIsNone(renderer.logo())
+
+
+class FlightSearchTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        Flight.objects.create(airline="Air India", origin="Mumbai", destination="Delhi", price=3900)
+        Flight.objects.create(airline="SpiceJet", origin="Mumbai", destination="Goa", price=2800)
+        Flight.objects.create(airline="IndiGo", origin="Delhi", destination="Leh", price=7800)
+
+    def test_plain_list_stays_unpaginated(self):
+        response = self.client.get('/api/flights/')
+        self.assertEqual(len(response.json()), 4)
+
+    def test_filters_by_route_and_price(self):
+        response = self.client.get('/api/flights/', {'origin': 'Mumbai', 'destination': 'Delhi', 'max_price': 4000})
+        self.assertEqual([f['airline'] for f in response.json()], ["Air India"])
+
+    def test_invalid_price_is_rejected(self):
+        for value in ('cheap', 'NaN', 'sNaN', 'Infinity', '-inf'):
+            with self.subTest(value=value):
+                self.assertEqual(self.client.get('/api/flights/', {'min_price': value}).status_code, 400)
+                self.assertEqual(self.client.get('/api/fares/summary', {'max_price': value}).status_code, 400)
+
+    def test_cursor_pagination_sorted_by_price(self):
+        first = self.client.get('/api/flights/', {'origin': 'Mumbai', 'ordering': '-price', 'page_size': 2}).json()
+        self.assertEqual([f['price'] for f in first['results']], ["4200.00", "3900.00"])
+
+        second = self.client.get(first['next']).json()
+        self.assertEqual([f['price'] for f in second['results']], ["2800.00"])
+        self.assertIsNone(second['next'])
+
+
+class QueryBudgetTests(TravelGoTestCase):
+    """Fails when an endpoint starts issuing more queries than its budget (e.g. an N+1)."""
+
+    BUDGETS = {
+        ('get', '/api/flights/'): 1,
+        ('get', '/api/bookings/'): 1,
+        ('get', '/api/bookings/?email=asha@example.com'): 1,
+        ('get', '/api/bookings/?flat=1'): 1,
+        ('get', '/api/food-orders/'): 1,
+        ('get', '/api/fares/summary?origin=Pune'): 1,
+    }
+
+    def setUp(self):
+        super().setUp()
+        for i in range(10):
+            flight = Flight.objects.create(airline="Akasa Air", origin="Pune", destination=f"City {i}", price=3000 + i)
+            booking = self.make_booking(flight=flight, seat_number=f"{i + 1}B")
+            FoodOrder.objects.create(booking=booking, passenger_name="Asha Rao", flight_number=str(flight.id),
+                                     seat_number=booking.seat_number, food_type="Veg Meal", price=350)
+
+    def test_list_endpoints_stay_within_budget(self):
+        for (method, url), budget in self.BUDGETS.items():
+            with self.subTest(url=url), self.assertNumQueries(budget):
+                response = getattr(self.client, method)(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_booking_detail_and_cancel_do_not_lazy_load_flight(self):
+        booking = Booking.objects.first()
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/bookings/{booking.id}/')
+        with self.captureOnCommitCallbacks(execute=False), self.assertNumQueries(2):
+            self.client.post(f'/api/bookings/{booking.id}/cancel_ticket/')
+
+    def test_booking_create_within_budget(self):
+        # savepoint + flight lookup + insert + release
+        with self.captureOnCommitCallbacks(execute=False), self.assertNumQueries(4):
+            response = self.client.post('/api/bookings/', self.booking_payload(), format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_flat_listing_matches_serializer_output(self):
+        regular = self.client.get('/api/bookings/').json()
+        flat = self.client.get('/api/bookings/?flat=1').json()
+        self.assertEqual(flat, regular)
+
+
+class ResponseSizeTests(TravelGoTestCase):
+    """FastJSONRenderer, ?fields= sparse fieldsets and response compression."""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(30):
+            self.make_booking(seat_number=f"{i + 1}C")
+
+    def test_fast_renderer_matches_drf_output(self):
+        data = {'price': Decimal("4200.50"), 'at': datetime.datetime(2026, 1, 15, 9, 30, tzinfo=datetime.timezone.utc),
+                'day': datetime.date(2026, 1, 15), 'name': "Mumbai\u2028Delhi ✈", 7: [1, None, True]}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(data, 'application/json; indent=2'),
+                         JSONRenderer().render(data, 'application/json; indent=2'))
+
+    def test_sparse_fieldsets_narrow_the_select(self):
+        with self.assertNumQueries(1) as queries:
+            response = self.client.get('/api/flights/', {'fields': 'id,price'})
+        self.assertEqual(response.json(), [{'id': self.flight.id, 'price': "4200.00"}])
+        self.assertNotIn('special_offer', queries.captured_queries[0]['sql'])
+
+        with self.assertNumQueries(1) as queries:
+            response = self.client.get('/api/bookings/', {'fields': 'seat_number,flight_origin,can_cancel', 'page_size': 10})
+        sql = queries.captured_queries[0]['sql']
+        self.assertNotIn('razorpay', sql)
+        self.assertNotIn('"flights_flight"."airline"', sql)
+        self.assertEqual(response.json()['results'][0], {'seat_number': "30C", 'flight_origin': "Mumbai", 'can_cancel': True})
+        self.assertEqual(len(self.client.get(response.json()['next']).json()['results']), 10)
+
+        params = {'fields': 'id,total_price,flight_airline'}
+        self.assertEqual(self.client.get('/api/bookings/', {**params, 'flat': 1}).json(),
+                         self.client.get('/api/bookings/', params).json())
+        self.assertEqual(self.client.get('/api/food-orders/', {'fields': 'id,razorpay'}).status_code, 400)
+
+    def test_large_responses_are_compressed(self):
+        plain = self.client.get('/api/bookings/')
+        self.assertNotIn('Content-Encoding', plain)
+        response = self.client.get('/api/bookings/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        if middleware.brotli is not None:
+            response = self.client.get('/api/bookings/', HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(middleware.brotli.decompress(response.content), plain.content)
+        # Small responses and streamed exports go out as they are
+        small = self.client.get(f'/api/flights/{self.flight.id}/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', small)
+        self.client.force_authenticate(User.objects.create_user('finance', is_staff=True))
+        self.assertNotIn('Content-Encoding', self.client.get('/api/exports/bookings.csv', HTTP_ACCEPT_ENCODING='gzip'))
+
+    def test_accept_encoding_negotiation(self):
+        negotiate = CompressionMiddleware.negotiate
+        self.assertEqual(negotiate('gzip;q=0, identity'), None)
+        self.assertEqual(negotiate('*'), 'gzip')
+        with mock.patch('flights.middleware.brotli', None):
+            self.assertEqual(negotiate('br, gzip'), 'gzip')
+
+
+class MyBookingsPaginationTests(TravelGoTestCase):
+
+    def test_cursor_survives_concurrent_inserts(self):
+        for i in range(5):
+            self.make_booking(seat_number=f"{i + 1}C")
+
+        first = self.client.get('/api/bookings/', {'email': 'asha@example.com', 'page_size': 2}).json()
+        self.make_booking(seat_number="20C")  # a new booking arrives while the user is paging
+
+        seen = [b['id'] for b in first['results']]
+        url = first['next']
+        while url:
+            page = self.client.get(url).json()
+            seen += [b['id'] for b in page['results']]
+            url = page['next']
+
+        expected = list(Booking.objects.exclude(seat_number="20C").order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_flat_pages_match_regular_pages(self):
+        for i in range(5):
+            self.make_booking(seat_number=f"{i + 1}C")
+
+        params = {'email': 'asha@example.com', 'page_size': 2}
+        regular, flat = self.client.get('/api/bookings/', params), self.client.get('/api/bookings/', {**params, 'flat': 1})
+        self.assertEqual(flat.status_code, 200)
+        self.assertEqual(flat.json()['results'], regular.json()['results'])
+        self.assertNotIn('created_at', flat.json()['results'][0])
+
+        following = self.client.get(flat.json()['next']).json()['results']
+        self.assertEqual(following, self.client.get(regular.json()['next']).json()['results'])
+
+    def test_flat_pages_with_sparse_fields(self):
+        for i in range(5):
+            self.make_booking(seat_number=f"{i + 1}C")
+
+        params = {'email': 'asha@example.com', 'page_size': 2, 'flat': 1}
+        expected = self.client.get('/api/bookings/', {**params, 'fields': 'id'}).json()
+        for fields in ('id', 'seat_number'):
+            with self.subTest(fields=fields):
+                response = self.client.get('/api/bookings/', {**params, 'fields': fields})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([set(row) for row in response.json()['results']], [{fields}] * 2)
+                following = self.client.get(response.json()['next']).json()['results']
+                self.assertEqual(len(following), 2)
+        self.assertEqual([row['id'] for row in expected['results']],
+                         list(Booking.objects.order_by('-created_at', '-id').values_list('id', flat=True)[:2]))
+
+
+class CancellationFlagTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        self.soon = self.make_booking(seat_number="1A", flight_departure_datetime=now + datetime.timedelta(hours=2))
+        self.later = self.make_booking(seat_number="1B", flight_departure_datetime=now + datetime.timedelta(days=3))
+        self.no_date = self.make_booking(seat_number="1C", flight_departure_datetime=None)
+        Booking.objects.filter(pk=self.later.pk).update(created_at=now - datetime.timedelta(days=2))
+
+    def test_annotations_match_properties(self):
+        for booking in Booking.objects.with_cancellation_flags():
+            with self.subTest(seat=booking.seat_number):
+                self.assertEqual(booking.cancellable, booking.can_cancel)
+                self.assertEqual(booking.refund_status, booking.refund_eligibility)
+
+    def test_cancellable_listing(self):
+        response = self.client.get('/api/bookings/', {'cancellable': 1})
+        self.assertEqual([b['id'] for b in response.json()], [self.later.id])
+
+    def test_flags_in_both_listings(self):
+        for params in ({}, {'flat': 1}):
+            with self.subTest(**params):
+                rows = {b['seat_number']: b for b in self.client.get('/api/bookings/', params).json()}
+                self.assertEqual({seat: b['can_cancel'] for seat, b in rows.items()},
+                                 {"1A": False, "1B": True, "1C": False})
+                self.assertEqual(rows["1B"]['refund_eligibility'], "70% Partial Refund")
+                self.assertEqual(rows["1A"]['refund_eligibility'], "100% Full Refund")
+
+
+class ConnectionSearchTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        Flight.objects.all().delete()
+        for airline, origin, destination, price in (
+            ("IndiGo", "Mumbai", "Delhi", 5000), ("Air India", "Delhi", "Leh", 3000),
+            ("IndiGo", "Mumbai", "Leh", 9000), ("Akasa Air", "Mumbai", "Leh", 12000),
+            ("SpiceJet", "Mumbai", "Goa", 1000), ("IndiGo", "Goa", "Leh", 2500),
+        ):
+            Flight.objects.create(airline=airline, origin=origin, destination=destination, price=price)
+
+    def search(self, **params):
+        response = self.client.get('/api/flights/connections/', {'origin': 'Mumbai', 'destination': 'Leh', **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def summary(self, itineraries):
+        return [(i['total_price'], [f['origin'] for f in i['flights']] + [i['flights'][-1]['destination']])
+                for i in itineraries]
+
+    def test_cheapest_and_fewest_hops(self):
+        data = self.search(max_legs=2)
+        self.assertEqual(self.summary(data['cheapest']), [
+            ("3500.00", ["Mumbai", "Goa", "Leh"]),
+            ("8000.00", ["Mumbai", "Delhi", "Leh"]),
+            ("9000.00", ["Mumbai", "Leh"]),
+        ])
+        self.assertEqual(self.summary(data['fewest_hops'])[0], ("9000.00", ["Mumbai", "Leh"]))
+        self.assertEqual(self.summary(self.search(max_legs=1)['cheapest']), [("9000.00", ["Mumbai", "Leh"])])
+
+    def test_graph_is_patched_incrementally(self):
+        self.search()
+        with mock.patch.object(RouteGraph, 'from_database', side_effect=AssertionError("full rebuild")), \
+                self.captureOnCommitCallbacks(execute=True):
+            Flight.objects.filter(origin="Mumbai", destination="Goa").get().delete()
+            Flight.objects.create(airline="IndiGo", origin="Mumbai", destination="Leh", price=4000)
+        with mock.patch.object(RouteGraph, 'from_database', side_effect=AssertionError("full rebuild")):
+            cheapest = self.search()['cheapest']
+        self.assertEqual(self.summary(cheapest), [("4000.00", ["Mumbai", "Leh"]), ("8000.00", ["Mumbai", "Delhi", "Leh"])])
+
+    def test_matches_exhaustive_search(self):
+        import itertools
+        import random
+        rng = random.Random(7)
+        cities = [f"C{i}" for i in range(12)]
+        rows = [(i, *rng.sample(cities, 2), rng.randrange(100, 1000)) for i in range(150)]
+        graph = RouteGraph.build(rows)
+        cheapest = {}
+        for _, origin, destination, price in rows:
+            cheapest[(origin, destination)] = min(price, cheapest.get((origin, destination), price))
+
+        totals = []
+        for stops in range(3):
+            for middle in itertools.permutations(cities[2:], stops):
+                hops = list(zip(["C0", *middle], [*middle, "C1"]))
+                if all(hop in cheapest for hop in hops):
+                    totals.append(sum(cheapest[hop] for hop in hops))
+        totals.sort()
+        found = [total for total, _ in graph.search("C0", "C1", max_legs=3, limit=5)]
+        self.assertEqual(found, totals[:5])
+
+    def test_requires_origin_and_destination(self):
+        self.assertEqual(self.client.get('/api/flights/connections/', {'origin': 'Mumbai'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/flights/connections/',
+                                         {'origin': 'Mumbai', 'destination': 'Leh', 'max_legs': 9}).status_code, 400)
+
+
+class FlightCacheTests(TravelGoTestCase):
+
+    def test_second_read_is_a_hit(self):
+        first = self.client.get('/api/flights/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/flights/')
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.json(), second.json())
+
+    def test_query_params_are_part_of_the_key(self):
+        self.client.get('/api/flights/', {'origin': 'Mumbai'})
+        response = self.client.get('/api/flights/', {'origin': 'Delhi'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json(), [])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(f'/api/flights/{self.flight.id}/')['ETag']
+        response = self.client.get(f'/api/flights/{self.flight.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_invalidate_the_catalogue(self):
+        self.client.get('/api/flights/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/flights/{self.flight.id}/', {'price': '3999.00'}, format='json')
+
+        response = self.client.get('/api/flights/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()[0]['price'], "3999.00")
+
+    def test_hit_and_miss_counters(self):
+        before = flight_cache.stats()
+        self.client.get('/api/flights/')
+        self.client.get('/api/flights/')
+        after = flight_cache.stats()
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+
+
+class SeedFlightsTests(TestCase):
+
+    def write_file(self, suffix, content):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_default_seed_is_idempotent(self):
+        call_command('seed_flights', stdout=StringIO())
+        call_command('seed_flights', stdout=StringIO())
+        self.assertEqual(Flight.objects.count(), 100)
+
+    def test_csv_upsert_updates_existing_routes(self):
+        Flight.objects.create(airline="IndiGo", origin="Mumbai", destination="Delhi", price=4200)
+        path = self.write_file('.csv', (
+            "airline,origin,destination,price,special_offer\n"
+            "IndiGo,Mumbai,Delhi,3999,Monsoon sale\n"
+            "SpiceJet,Goa,Pune,2100,\n"
+            "SpiceJet,Goa,,2100,\n"
+        ))
+        out = StringIO()
+        call_command('seed_flights', file=path, batch_size=2, stdout=out)
+
+        self.assertEqual(Flight.objects.count(), 2)
+        updated = Flight.objects.get(airline="IndiGo")
+        self.assertEqual((updated.price, updated.special_offer), (3999, "Monsoon sale"))
+        self.assertIn("1 new, 1 updated, 1 skipped", out.getvalue())
+        self.assertEqual(RouteFareSummary.objects.get(origin="Mumbai", destination="Delhi").min_price, 3999)
+
+    def test_jsonl_insert_only(self):
+        path = self.write_file('.jsonl', (
+            '{"airline": "Akasa Air", "origin": "Pune", "destination": "Goa", "price": 2500}\n'
+            '\n'
+            '{"airline": "Akasa Air", "origin": "Goa", "destination": "Pune", "price": "2600.50"}\n'
+        ))
+        call_command('seed_flights', file=path, insert_only=True, stdout=StringIO())
+        self.assertEqual(sorted(Flight.objects.values_list('price', flat=True)), [2500, Decimal("2600.50")])
+
+    def test_aborted_import_still_refreshes_the_summary(self):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b"airline,origin,destination,price\n")
+            f.write(b"".join(b"IndiGo,City %d,Delhi,4200\n" % i for i in range(1000)))
+            f.write(b"IndiGo,\xff\xfe,Delhi,4200\n")  # not UTF-8: read_rows fails here
+
+        with mock.patch('flights.management.commands.seed_flights.flight_cache') as cache:
+            with self.assertRaisesMessage(CommandError, "Import aborted"):
+                call_command('seed_flights', file=path, batch_size=100, stdout=StringIO())
+
+        self.assertGreater(Flight.objects.count(), 0)
+        self.assertEqual(RouteFareSummary.objects.count(), Flight.objects.count())
+        cache.invalidate.assert_called_once_with()
+
+    def test_bad_jsonl_lines_and_prices_are_skipped(self):
+        path = self.write_file('.jsonl', (
+            '{"airline": "Akasa Air", "origin": "Pune", "destination": "Goa", "price": 2500}\n'
+            '{"airline": "Akasa Air", "origin": "Goa", \n'
+            '{"airline": "IndiGo", "origin": "Goa", "destination": "Pune", "price": "NaN"}\n'
+            '{"airline": "IndiGo", "origin": "Pune", "destination": "Delhi", "price": "Infinity"}\n'
+            '{"airline": "IndiGo", "origin": "Delhi", "destination": "Pune", "price": -10}\n'
+            '{"airline": "IndiGo", "origin": "Delhi", "destination": "Goa", "price": "3100.456"}\n'
+        ))
+        out = StringIO()
+        call_command('seed_flights', file=path, stdout=out)
+
+        self.assertEqual(sorted(Flight.objects.values_list('price', flat=True)), [2500, Decimal("3100.46")])
+        self.assertIn("2 new, 0 updated, 4 skipped", out.getvalue())
+        self.assertIn("row 2: invalid JSON", out.getvalue())
+
+
+class FareSummaryTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()  # IndiGo Mumbai -> Delhi 4200
+        with self.captureOnCommitCallbacks(execute=True):
+            Flight.objects.create(airline="Air India", origin="Mumbai", destination="Delhi", price=5800)
+            Flight.objects.create(airline="IndiGo", origin="Mumbai", destination="Delhi", price=5000)
+            self.goa = Flight.objects.create(airline="SpiceJet", origin="Mumbai", destination="Goa", price=2100)
+
+    def summary(self, origin, destination):
+        return RouteFareSummary.objects.filter(origin=origin, destination=destination).values(
+            'min_price', 'max_price', 'avg_price', 'flight_count', 'airline_count').first()
+
+    def test_summary_follows_flight_writes(self):
+        self.assertEqual(self.summary("Mumbai", "Delhi"), {
+            'min_price': 4200, 'max_price': 5800, 'avg_price': 5000, 'flight_count': 3, 'airline_count': 2,
+        })
+
+        with self.captureOnCommitCallbacks(execute=True):
+            goa = Flight.objects.get(pk=self.goa.pk)
+            goa.destination, goa.price = "Delhi", 3900
+            goa.save()
+        self.assertIsNone(self.summary("Mumbai", "Goa"))
+        self.assertEqual(self.summary("Mumbai", "Delhi")['min_price'], 3900)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Flight.objects.filter(origin="Mumbai", destination="Delhi").delete()
+        self.assertFalse(RouteFareSummary.objects.exists())
+
+    def test_endpoint_lists_cheapest_destinations_first(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/fares/summary', {'origin': 'Mumbai'})
+        self.assertEqual([(row['destination'], row['min_price']) for row in response.json()],
+                         [("Goa", "2100.00"), ("Delhi", "4200.00")])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/fares/summary', {'origin': 'Mumbai'})['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Flight.objects.create(airline="Akasa Air", origin="Mumbai", destination="Delhi", price=1999)
+        response = self.client.get('/api/fares/summary', {'origin': 'Mumbai', 'max_price': 3000})
+        self.assertEqual([(row['destination'], row['min_price']) for row in response.json()],
+                         [("Delhi", "1999.00"), ("Goa", "2100.00")])
+
+
+class FlightDisruptionTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.departure = timezone.now() + datetime.timedelta(days=3)
+        self.client.force_authenticate(User.objects.create_user('ops', is_staff=True))
+
+    def test_cancel_updates_all_bookings_and_queues_emails(self):
+        recent = self.make_booking(seat_number="1A", flight_departure_datetime=self.departure)
+        old = self.make_booking(seat_number="1B", flight_departure_datetime=self.departure)
+        Booking.objects.filter(pk=old.pk).update(created_at=timezone.now() - datetime.timedelta(days=2))
+        self.make_booking(seat_number="1C", status='CANCELLED', flight_departure_datetime=self.departure)
+        next_day = self.make_booking(seat_number="1A", flight_departure_datetime=self.departure + datetime.timedelta(days=1))
+
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(5):
+            response = self.client.post(f'/api/flights/{self.flight.id}/disrupt/', {
+                'action': 'cancel', 'departure': self.departure.isoformat(),
+            }, format='json')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json(), {'action': 'cancel', 'bookings': 2, 'notifications': 2, 'full_refunds': 1})
+        self.assertEqual(Booking.objects.filter(status='CANCELLED').count(), 3)
+        self.assertEqual(Booking.objects.get(pk=next_day.pk).status, 'BOOKED')  # other departures are untouched
+        refunds = {row.context['seat_number']: row.context['refund_status'] for row in EmailOutbox.objects.all()}
+        self.assertEqual(refunds, {recent.seat_number: "100% Full Refund", old.seat_number: "70% Partial Refund"})
+
+    def test_reschedule_moves_bookings(self):
+        booking = self.make_booking(flight_departure_datetime=self.departure)
+        new_departure = self.departure + datetime.timedelta(hours=6)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/flights/{self.flight.id}/disrupt/', {
+                'action': 'reschedule', 'departure': self.departure.isoformat(), 'new_departure': new_departure.isoformat(),
+            }, format='json')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        booking.refresh_from_db()
+        self.assertEqual(booking.flight_departure_datetime, new_departure)
+        self.assertEqual(EmailOutbox.objects.get().template, 'emails/booking_confirmation.html')
+
+    def test_reschedule_onto_taken_seat_is_rejected(self):
+        new_departure = self.departure + datetime.timedelta(hours=6)
+        self.make_booking(flight_departure_datetime=self.departure)
+        self.make_booking(flight_departure_datetime=new_departure)
+        response = self.client.post(f'/api/flights/{self.flight.id}/disrupt/', {
+            'action': 'reschedule', 'departure': self.departure.isoformat(), 'new_departure': new_departure.isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Booking.objects.filter(flight_departure_datetime=self.departure).count(), 1)
+
+    def test_cancel_needs_the_departure(self):
+        booking = self.make_booking(flight_departure_datetime=self.departure)
+        response = self.client.post(f'/api/flights/{self.flight.id}/disrupt/', {'action': 'cancel'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('departure', response.json())
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, 'BOOKED')
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(None)
+        response = self.client.post(f'/api/flights/{self.flight.id}/disrupt/', {'action': 'cancel'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_management_command(self):
+        self.make_booking(flight_departure_datetime=self.departure)
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('disrupt_flight', self.flight.id, '--cancel', '--departure', self.departure.isoformat(), stdout=out)
+        self.assertIn("1 bookings", out.getvalue())
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+
+class FinanceExportTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(User.objects.create_user('finance', is_staff=True))
+        self.january = self.make_booking(seat_number="1A", razorpay_order_id="order_1", razorpay_payment_id="pay_1")
+        self.february = self.make_booking(seat_number="1B", razorpay_order_id="order_2", razorpay_payment_id="pay_2")
+        for booking, day in ((self.january, datetime.datetime(2026, 1, 15, tzinfo=datetime.timezone.utc)),
+                             (self.february, datetime.datetime(2026, 2, 15, tzinfo=datetime.timezone.utc))):
+            Booking.objects.filter(pk=booking.pk).update(created_at=day)
+        FoodOrder.objects.create(booking=self.january, passenger_name="Asha Rao", flight_number="6E-1",
+                                 seat_number="1A", food_type="VEG", price=350)
+
+    def download(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_csv_is_filtered_by_date_range(self):
+        body = self.download('/api/exports/bookings.csv', **{'from': '2026-02-01', 'to': '2026-03-01'})
+        rows = list(csv.DictReader(StringIO(body.decode())))
+        self.assertEqual([(row['id'], row['razorpay_order_id'], row['razorpay_payment_id']) for row in rows],
+                         [(str(self.february.pk), "order_2", "pay_2")])
+        self.assertEqual(rows[0]['created_at'], "2026-02-15T00:00:00+00:00")
+
+    def test_gzipped_jsonl_food_orders_carry_booking_payment_ids(self):
+        body = gzip.decompress(self.download('/api/exports/food-orders.jsonl.gz'))
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0]['booking__razorpay_order_id'], rows[0]['booking__razorpay_payment_id'], rows[0]['price']),
+                         ("order_1", "pay_1", "350.00"))
+
+    def test_requires_staff_and_valid_dates(self):
+        self.assertEqual(self.client.get('/api/exports/bookings.csv', {'from': 'last week'}).status_code, 400)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/exports/bookings.csv').status_code, 403)
+
+    def test_management_command(self):
+        out = StringIO()
+        call_command('export_finance', 'bookings', '--format', 'jsonl', '--to', '2026-02-01', stdout=out)
+        self.assertEqual([json.loads(line)['razorpay_payment_id'] for line in out.getvalue().splitlines()], ["pay_1"])
+
+        with self.assertRaisesMessage(CommandError, "--gzip needs --output or a binary stdout"):
+            call_command('export_finance', 'bookings', '--gzip', stdout=StringIO())
+        binary = TextIOWrapper(BytesIO())
+        call_command('export_finance', 'bookings', '--gzip', stdout=binary)
+        self.assertEqual(len(list(csv.DictReader(StringIO(gzip.decompress(binary.buffer.getvalue()).decode())))), 2)
+
+        path = os.path.join(tempfile.mkdtemp(), 'bookings.csv.gz')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        call_command('export_finance', 'bookings', '--gzip', '--output', path, stderr=StringIO())
+        with gzip.open(path, 'rt') as f:
+            self.assertEqual(len(list(csv.DictReader(f))), 2)
+
+
+class GroupBookingTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.departure = timezone.now() + datetime.timedelta(days=5)
+
+    def group_payload(self, *seats, **overrides):
+        payload = {
+            "flight": self.flight.id,
+            "flight_departure_datetime": self.departure.isoformat(),
+            "passengers": [{
+                "passenger_name": f"Traveller {i}",
+                "passenger_email": f"traveller{i}@example.com",
+                "passenger_phone": "9876543210",
+                **({"seat_number": seat} if seat else {}),
+            } for i, seat in enumerate(seats)],
+        }
+        payload.update(overrides)
+        return payload
+
+    def test_books_group_in_one_insert_with_one_email(self):
+        self.make_booking(seat_number="1B", flight_departure_datetime=self.departure)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/bookings/group/', self.group_payload("10C", None, None, None), format='json')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        body = response.json()
+        # The requested seat is kept, the others are seated side by side around the taken 1B
+        self.assertEqual([booking['seat_number'] for booking in body['bookings']], ["10C", "1C", "1D", "1E"])
+        self.assertEqual(body['amount'], 4 * 4200)
+        self.assertEqual(Booking.objects.filter(razorpay_order_id=body['mock_order_id']).count(), 4)
+        email = EmailOutbox.objects.get()
+        self.assertEqual((email.recipient, len(email.context['passengers'])), ("traveller0@example.com", 4))
+        self.assertIn("Traveller 3", build_professional_email(
+            email.subject, email.context, email.template, email.recipient).body)
+
+    def test_taken_seat_rejects_the_whole_group(self):
+        self.make_booking(seat_number="2A", flight_departure_datetime=self.departure)
+        response = self.client.post('/api/bookings/group/', self.group_payload("2B", "2A"), format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertIn("2A", response.json()['error'])
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_validates_passengers_together(self):
+        response = self.client.post('/api/bookings/group/', self.group_payload("3A", "3A"), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("requested twice", str(response.json()))
+
+        payload = self.group_payload(None, None)
+        payload['passengers'][1]['passenger_email'] = "not-an-email"
+        response = self.client.post('/api/bookings/group/', payload, format='json')
+        self.assertEqual(response.json(), {"message": "Middleware Error: Passenger 2: Invalid email format."})
+
+        response = self.client.post('/api/bookings/group/', self.group_payload(), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_no_room_for_the_group(self):
+        flight = Flight.objects.create(airline="Akasa Air", origin="Pune", destination="Goa", price=2500,
+                                       seat_rows=1, seat_letters="AB")
+        response = self.client.post('/api/bookings/group/',
+                                    self.group_payload(None, None, None, flight=flight.id), format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['error'], "Only 2 seats left on this departure, 3 needed.")
+
+
+class FoodManifestTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(User.objects.create_user('catering', is_staff=True))
+        self.departure = timezone.now() + datetime.timedelta(days=3)
+        self.other = Flight.objects.create(airline="SpiceJet", origin="Mumbai", destination="Goa", price=2100)
+        for seat, meal in (("12A", "VEG"), ("2B", "VEG"), ("3C", "NON-VEG")):
+            booking = self.make_booking(seat_number=seat, flight_departure_datetime=self.departure)
+            self.order(booking, meal)
+        FoodOrder.objects.create(flight=self.other, passenger_name="Ravi", flight_number="SG-1", seat_number="1A",
+                                 food_type="VEG", price=350)
+
+    def order(self, booking, meal):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/food-orders/', {
+                'booking': booking.id, 'passenger_name': booking.passenger_name, 'flight_number': 'TG-1',
+                'seat_number': booking.seat_number, 'food_type': meal, 'price': '350',
+            }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response
+
+    def test_orders_are_linked_to_the_booking_flight(self):
+        self.assertEqual(FoodOrder.objects.filter(flight=self.flight).count(), 3)
+
+    def test_manifest_groups_in_sql_and_is_cached_until_an_order(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/food-orders/manifest/', {'flight': self.flight.id})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['total_orders'], 3)
+        self.assertEqual(response.json()['meals'], [
+            {'food_type': "NON-VEG", 'count': 1, 'revenue': "350.00", 'seats': ["3C"]},
+            {'food_type': "VEG", 'count': 2, 'revenue': "700.00", 'seats': ["2B", "12A"]},
+        ])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/food-orders/manifest/', {'flight': self.flight.id})['X-Cache'], 'HIT')
+
+        self.order(self.make_booking(seat_number="4D", flight_departure_datetime=self.departure), "JAIN")
+        response = self.client.get('/api/food-orders/manifest/', {'flight': self.flight.id})
+        self.assertEqual((response['X-Cache'], response.json()['total_orders']), ('MISS', 4))
+        # Other flights keep their cached manifest
+        self.client.get('/api/food-orders/manifest/', {'flight': self.other.id})
+        self.order(self.make_booking(seat_number="5E", flight_departure_datetime=self.departure), "VEG")
+        self.assertEqual(self.client.get('/api/food-orders/manifest/', {'flight': self.other.id})['X-Cache'], 'HIT')
+
+    def manifest_orders(self, **params):
+        return self.client.get('/api/food-orders/manifest/', {'flight': self.flight.id, **params}).json()['total_orders']
+
+    def test_cancelled_and_expired_bookings_leave_the_manifest(self):
+        self.assertEqual(self.manifest_orders(), 3)
+        booking = Booking.objects.get(flight=self.flight, seat_number="12A")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/bookings/{booking.id}/cancel_ticket/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.manifest_orders(), 2)
+
+        Booking.objects.filter(seat_number="2B").update(status='PENDING', created_at=timezone.now() - datetime.timedelta(hours=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(sum(expire_in_batches()), 1)
+        self.assertEqual(self.manifest_orders(), 1)
+
+    def test_disruptions_refresh_cached_manifests(self):
+        self.assertEqual(self.manifest_orders(departure=self.departure.isoformat()), 3)
+        later = self.departure + datetime.timedelta(hours=6)
+        with self.captureOnCommitCallbacks(execute=True):
+            disrupt_flight(self.flight, RESCHEDULE, departure=self.departure, new_departure=later)
+        self.assertEqual(self.manifest_orders(departure=self.departure.isoformat()), 0)
+        self.assertEqual(self.manifest_orders(departure=later.isoformat()), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            disrupt_flight(self.flight, CANCEL, departure=later)
+        self.assertEqual(self.manifest_orders(), 0)
+
+    def test_departure_filter_and_errors(self):
+        later = self.departure + datetime.timedelta(days=1)
+        self.order(self.make_booking(seat_number="1A", flight_departure_datetime=later), "VEG")
+        response = self.client.get('/api/food-orders/manifest/', {'flight': self.flight.id, 'departure': later.isoformat()})
+        self.assertEqual(response.json()['meals'], [{'food_type': "VEG", 'count': 1, 'revenue': "350.00", 'seats': ["1A"]}])
+
+        self.assertEqual(self.client.get('/api/food-orders/manifest/').status_code, 400)
+        self.assertEqual(self.client.get('/api/food-orders/manifest/', {'flight': 999999}).status_code, 404)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/food-orders/manifest/', {'flight': self.flight.id}).status_code, 403)
+
+
+class TravelPackageTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.staff = User.objects.create_user('catalogue', is_staff=True)
+        self.goa = self.package("Goa Getaway", "HONEYMOON", 30000)
+        self.manali = self.package("Manali Snow", "HONEYMOON", 25000)
+        self.lonavala = self.package("Lonavala Weekend", "WEEKEND", 8000)
+
+    def package(self, title, category, price):
+        return TravelPackage.objects.create(
+            title=title, category=category, price_per_person=price, description="Day 1: " + "x" * 500,
+            image_url="https://example.com/p.jpg", flight_inclusion="IndiGo Return", hotel_inclusion="3 Nights")
+
+    def test_category_listing_skips_the_description(self):
+        with self.assertNumQueries(1) as queries:
+            response = self.client.get('/api/packages/', {'category': 'HONEYMOON'})
+        self.assertNotIn('description', queries.captured_queries[0]['sql'])
+        self.assertEqual([p['title'] for p in response.json()], ["Manali Snow", "Goa Getaway"])
+        self.assertNotIn('description', response.json()[0])
+
+        page = self.client.get('/api/packages/', {'page_size': 2}).json()
+        self.assertEqual([p['title'] for p in page['results']], ["Lonavala Weekend", "Manali Snow"])
+        self.assertIn('description', self.client.get(f'/api/packages/{self.goa.id}/').json())
+        self.assertEqual(self.client.get('/api/packages/', {'category': 'CRUISE'}).status_code, 400)
+
+    def test_pages_are_cached_per_category_until_a_write(self):
+        self.client.force_authenticate(self.staff)
+        self.client.get('/api/packages/', {'category': 'HONEYMOON'})
+        self.client.get('/api/packages/', {'category': 'WEEKEND'})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/packages/', {'category': 'HONEYMOON'})['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/packages/{self.lonavala.id}/', {'price_per_person': '7500'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/packages/', {'category': 'HONEYMOON'})['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get('/api/packages/', {'category': 'WEEKEND'})['X-Cache'], 'MISS')
+
+        # Moving a package to another category refreshes both listings
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/packages/{self.goa.id}/', {'category': 'WEEKEND'}, format='json')
+        response = self.client.get('/api/packages/', {'category': 'HONEYMOON'})
+        self.assertEqual((response['X-Cache'], len(response.json())), ('MISS', 1))
+        self.assertEqual(len(self.client.get('/api/packages/', {'category': 'WEEKEND'}).json()), 2)
+
+    def test_only_staff_edit_the_catalogue(self):
+        response = self.client.patch(f'/api/packages/{self.goa.id}/', {'price_per_person': '1'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_package_booking(self):
+        response = self.client.post('/api/package-bookings/', {
+            'package': self.goa.id, 'passenger_name': "Asha Rao", 'passenger_email': "asha@example.com",
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual((response.json()['status'], response.json()['package_title']), ('BOOKED', "Goa Getaway"))
+        self.assertTrue(response.json()['local_transaction_id'].startswith('PKG_LOC_'))
+        self.assertEqual(len(self.client.get('/api/package-bookings/', {'email': "asha@example.com"}).json()), 1)
+        self.assertEqual(self.client.get('/api/package-bookings/', {'email': "ravi@example.com"}).json(), [])
+        self.assertEqual(self.client.get('/api/package-bookings/').status_code, 400)
+
+        response = self.client.post('/api/package-bookings/', {'package': self.goa.id, 'passenger_email': "asha"},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(PackageBooking.objects.count(), 1)
+
+
+class ThrottleTests(TravelGoTestCase):
+
+    def test_token_bucket_bursts_then_refills(self):
+        bucket = TokenBuckets()
+        capacity, rate = parse_rate('10/min')
+        self.assertEqual([bucket.take('ip', capacity, rate, now=0.0) for _ in range(10)], [0.0] * 10)
+        self.assertAlmostEqual(bucket.take('ip', capacity, rate, now=0.0), 6.0)
+        self.assertAlmostEqual(bucket.take('ip', capacity, rate, now=3.0), 3.0)  # rejections are free
+        self.assertEqual(bucket.take('ip', capacity, rate, now=6.0), 0.0)
+        self.assertEqual(bucket.take('other', capacity, rate, now=6.0), 0.0)
+        with self.assertRaises(ValueError):
+            parse_rate('10 per minute')
+
+    def test_bucket_count_is_bounded(self):
+        bucket = TokenBuckets(max_keys=100)
+        for i in range(1000):
+            bucket.take(f"10.0.{i // 256}.{i % 256}", 5, 1.0)
+        self.assertEqual(len(bucket), 100)
+
+    @override_settings(THROTTLES={'/api/flights/': {'ip': '20/min'}})
+    def test_burst_from_one_address_gets_429_with_retry_after(self):
+        scraper = APIClient(REMOTE_ADDR='203.0.113.9')
+        codes = [scraper.get('/api/flights/').status_code for _ in range(25)]
+        self.assertEqual(codes, [200] * 20 + [429] * 5)
+        response = scraper.get('/api/flights/')
+        self.assertEqual(response['Retry-After'], '3')
+        self.assertIn('message', response.json())
+        # Other clients and other paths are unaffected
+        self.assertEqual(APIClient(REMOTE_ADDR='198.51.100.7').get('/api/flights/').status_code, 200)
+        self.assertEqual(scraper.get('/api/fares/summary').status_code, 200)
+
+    @override_settings(THROTTLES={'/api/bookings/': {'methods': ['POST'], 'ip': '100/min', 'device': '3/min'}})
+    def test_booking_spam_is_limited_per_device(self):
+        def book(seat, device, client=None):
+            return (client or self.client).post('/api/bookings/', self.booking_payload(seat_number=seat, device_id=device),
+                                                format='json').status_code
+
+        self.assertEqual([book(f"{i}A", "bot-1") for i in range(1, 6)], [201, 201, 201, 429, 429])
+        self.assertEqual(book("9A", "phone-2"), 201)
+        self.assertEqual(APIClient(HTTP_X_DEVICE_ID="bot-1").get('/api/bookings/').status_code, 200)  # POSTs only
+        header_client = APIClient(HTTP_X_DEVICE_ID="bot-1")
+        self.assertEqual(book("10A", "", client=header_client), 429)
+
+    @override_settings(THROTTLES={'/api/flights/': {'ip': '5/min'}})
+    def test_spoofed_forwarded_for_does_not_get_a_fresh_bucket(self):
+        scraper = APIClient(REMOTE_ADDR='203.0.113.9')
+        codes = [scraper.get('/api/flights/', HTTP_X_FORWARDED_FOR=f"10.0.0.{i}").status_code for i in range(8)]
+        self.assertEqual(codes, [200] * 5 + [429] * 3)
+
+    @override_settings(THROTTLES={'/api/flights/': {'ip': '5/min'}})
+    def test_trusted_proxy_hop_identifies_the_client(self):
+        for num_proxies in (1, None):
+            with self.subTest(num_proxies=num_proxies), \
+                    override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': num_proxies}):
+                buckets.clear()
+                proxy = APIClient(REMOTE_ADDR='10.1.1.1')
+                codes = [proxy.get('/api/flights/', HTTP_X_FORWARDED_FOR=f"spoofed, 198.51.100.{i}").status_code
+                         for i in range(8)]
+                # Behind one proxy the last hop is the client; without a proxy count only REMOTE_ADDR counts
+                self.assertEqual(codes, [200] * 8 if num_proxies else [200] * 5 + [429] * 3)
+
+    @override_settings(THROTTLES={'/api/': {'ip': '1000000/s'}, '/api/bookings/': {'methods': ['POST'], 'ip': '10/min'}})
+    def test_allowed_request_passes_through(self):
+        # An allowed request: one matching rule, one bucket
+        request = APIClient().get('/api/flights/').wsgi_request
+        middleware = ThrottleMiddleware(lambda request: None)
+        self.assertIsNone(middleware.reject(request))
+
+
+class BookingExpiryTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.departure = timezone.now() + datetime.timedelta(days=3)
+        hour_ago = timezone.now() - datetime.timedelta(hours=1)
+        self.stale = [self.make_booking(seat_number=f"{i}A", status='PENDING', flight_departure_datetime=self.departure)
+                      for i in range(1, 6)]
+        self.failed = self.make_booking(seat_number="9F", status='FAILED')
+        self.paid = self.make_booking(seat_number="7A", status='BOOKED')
+        Booking.objects.filter(pk__in=[b.pk for b in (*self.stale, self.failed, self.paid)]).update(created_at=hour_ago)
+        self.fresh = self.make_booking(seat_number="8A", status='PENDING')
+
+    def test_sweep_expires_in_batches_and_frees_the_seats(self):
+        self.assertEqual(list(expire_in_batches(batch_size=2)), [2, 2, 1])
+        self.assertEqual(Booking.objects.filter(status='EXPIRED').count(), 5)
+        self.assertEqual(Booking.objects.get(pk=self.fresh.pk).status, 'PENDING')
+        self.assertEqual(Booking.objects.get(pk=self.paid.pk).status, 'BOOKED')
+        self.assertEqual(Booking.objects.get(pk=self.failed.pk).status, 'FAILED')
+
+        response = self.client.post('/api/bookings/', self.booking_payload(
+            seat_number="1A", flight_departure_datetime=self.departure.isoformat()), format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_command_dry_run_and_failed_bookings(self):
+        out = StringIO()
+        call_command('expire_bookings', '--dry-run', '--include-failed', stdout=out)
+        self.assertIn("5 PENDING bookings would expire", out.getvalue())
+        self.assertEqual(Booking.objects.filter(status='EXPIRED').count(), 0)
+
+        call_command('expire_bookings', '--include-failed', '--batch-size', '3', stdout=StringIO())
+        self.assertEqual(Booking.objects.filter(status='EXPIRED').count(), 6)
+
+    def test_sweep_reads_the_status_index(self):
+        self.assertIn('booking_status_created_idx', stale_bookings('PENDING').order_by('created_at').explain())
+
+
+class BookingArchiveTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        long_ago = timezone.now() - datetime.timedelta(days=200)
+        self.old = [self.make_booking(seat_number=f"{i}A", flight_departure_datetime=long_ago + datetime.timedelta(hours=i),
+                                      razorpay_payment_id=f"pay_{i}") for i in range(1, 4)]
+        FoodOrder.objects.create(booking=self.old[0], flight=self.flight, passenger_name="Asha Rao",
+                                 flight_number="6E-1", seat_number="1A", food_type="VEG", price=350)
+        self.upcoming = self.make_booking(seat_number="9C")
+
+    def test_departed_bookings_move_with_their_food_orders(self):
+        self.assertEqual(list(archive_in_batches(batch_size=2)), [2, 1])
+        self.assertEqual(list(Booking.objects.values_list('id', flat=True)), [self.upcoming.pk])
+        archived = ArchivedBooking.objects.get(pk=self.old[0].pk)
+        self.assertEqual((archived.razorpay_payment_id, archived.created_at), ("pay_1", self.old[0].created_at))
+        self.assertFalse(FoodOrder.objects.exists())
+        self.assertEqual(ArchivedFoodOrder.objects.get().booking_id, self.old[0].pk)
+        self.assertEqual(list(archive_in_batches()), [])
+
+    def test_my_bookings_include_archived_only_when_asked(self):
+        call_command('archive_bookings', '--days', '90', stdout=StringIO())
+
+        hot = self.client.get('/api/bookings/', {'email': 'asha@example.com'}).json()
+        self.assertEqual([b['id'] for b in hot], [self.upcoming.pk])
+
+        expected = [self.upcoming.pk] + [b.pk for b in reversed(self.old)]
+        for params in ({}, {'flat': '1'}, {'page_size': 2}):
+            response = self.client.get('/api/bookings/', {'email': 'asha@example.com', 'include_archived': '1', **params})
+            data = response.json()
+            rows = data['results'] if 'results' in data else data
+            self.assertEqual([b['id'] for b in rows], expected[:len(rows)], params)
+        self.assertFalse(rows[-1]['can_cancel'])
+
+        history = self.client.get(f'/api/bookings/{self.old[0].pk}/', {'include_archived': '1'})
+        self.assertEqual(history.json()['razorpay_payment_id'], "pay_1")
+        self.assertEqual(self.client.get(f'/api/bookings/{self.old[0].pk}/').status_code, 404)
+        self.assertEqual(self.client.delete(f'/api/bookings/{self.old[0].pk}/?include_archived=1').status_code, 400)
+
+    def test_finance_export_can_append_archived_rows(self):
+        call_command('archive_bookings', stdout=StringIO())
+        out = StringIO()
+        call_command('export_finance', 'bookings', '--format', 'jsonl', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
+
+        out = StringIO()
+        call_command('export_finance', 'food-orders', '--format', 'jsonl', '--include-archived', stdout=out)
+        self.assertEqual([json.loads(line)['booking__razorpay_payment_id'] for line in out.getvalue().splitlines()], ["pay_1"])
+
+    def test_dry_run_counts_without_moving(self):
+        out = StringIO()
+        call_command('archive_bookings', '--dry-run', stdout=out)
+        self.assertIn("3 bookings would be archived", out.getvalue())
+        self.assertFalse(ArchivedBooking.objects.exists())
+
+
+class SeatInventoryTests(TravelGoTestCase):
+
+    def test_second_booking_for_same_seat_conflicts(self):
+        payload = self.booking_payload()
+        first = self.client.post('/api/bookings/', payload, format='json')
+        second = self.client.post('/api/bookings/', {**payload, 'passenger_email': 'other@example.com'}, format='json')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 409)
+
+    def test_bookings_without_a_departure_still_hold_the_seat(self):
+        payload = self.booking_payload()
+        del payload['flight_departure_datetime']
+        first = self.client.post('/api/bookings/', payload, format='json')
+        second = self.client.post('/api/bookings/', {**payload, 'passenger_email': 'other@example.com'}, format='json')
+
+        self.assertEqual(first.status_code, 201, first.content)
+        self.assertEqual(second.status_code, 409)
+
+    def test_cancelled_seat_can_be_rebooked(self):
+        booking = self.make_booking()
+        booking.status = 'CANCELLED'
+        booking.save()
+        response = self.client.post('/api/bookings/', self.booking_payload(
+            flight_departure_datetime=booking.flight_departure_datetime.isoformat()), format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_seat_outside_the_map_is_rejected(self):
+        response = self.client.post('/api/bookings/', self.booking_payload(seat_number="31A"), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('seat_number', response.json())
+
+    def test_availability_bitmap(self):
+        booking = self.make_booking(seat_number="1B")
+        self.make_booking(seat_number="2A", flight_departure_datetime=booking.flight_departure_datetime)
+        self.make_booking(seat_number="3A", status='CANCELLED', flight_departure_datetime=booking.flight_departure_datetime)
+
+        response = self.client.get(f'/api/flights/{self.flight.id}/seats/',
+                                   {'departure': booking.flight_departure_datetime.isoformat()})
+        data = response.json()
+        bitmap = base64.b64decode(data['bitmap'])
+
+        self.assertEqual((data['taken'], data['available']), (2, 178))
+        self.assertEqual(len(bitmap), 23)
+        self.assertEqual(bitmap[0], 0b01000010)  # 1B is bit 1, 2A is bit 6
+
+    def test_availability_requires_departure(self):
+        self.assertEqual(self.client.get(f'/api/flights/{self.flight.id}/seats/').status_code, 400)
+
+
+class SeatReservationStressTests(TransactionTestCase):
+    """Many threads race for the same few seats; the database must hand each seat out once."""
+
+    THREADS = 16
+    ATTEMPTS_PER_THREAD = 40
+    SEATS = ["1A", "1B", "1C", "2A", "2B", "2C"]
+
+    def test_no_double_booked_seats_under_concurrency(self):
+        flight = Flight.objects.create(airline="IndiGo", origin="Mumbai", destination="Delhi", price=4200)
+        departure = timezone.now() + datetime.timedelta(days=2)
+        results = {'booked': 0, 'conflicts': 0}
+        lock = threading.Lock()
+        start = threading.Barrier(self.THREADS)
+
+        def worker(n):
+            start.wait()
+            try:
+                for i in range(self.ATTEMPTS_PER_THREAD):
+                    seat = self.SEATS[(n + i) % len(self.SEATS)]
+                    try:
+                        reserve_seat(flight, seat, passenger_name=f"P{n}-{i}", passenger_email="p@example.com",
+                                     passenger_phone="9876543210", total_price=4200, status='BOOKED',
+                                     flight_departure_datetime=departure)
+                        outcome = 'booked'
+                    except SeatUnavailable:
+                        outcome = 'conflicts'
+                    with lock:
+                        results[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        attempts = self.THREADS * self.ATTEMPTS_PER_THREAD
+        self.assertEqual(results['booked'] + results['conflicts'], attempts)
+        self.assertEqual(results['booked'], len(self.SEATS))
+        self.assertEqual(Booking.objects.filter(flight=flight, status='BOOKED').count(), len(self.SEATS))
+
+
+class IdempotencyKeyTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        front_cache.clear()
+
+    def post(self, key, payload):
+        return self.client.post('/api/bookings/', payload, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_stored_response(self):
+        payload = self.booking_payload()
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.post("retry-1", payload)
+        self.assertEqual(first.status_code, 201)
+
+        with self.assertNumQueries(0):  # answered by the LRU
+            second = self.post("retry-1", payload)
+        front_cache.clear()
+        with self.assertNumQueries(1):  # answered by the table
+            third = self.post("retry-1", payload)
+
+        for response in (second, third):
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json(), first.json())
+            self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_key_reused_with_different_body(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post("retry-2", self.booking_payload())
+        response = self.post("retry-2", self.booking_payload(seat_number="14C"))
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_failed_request_does_not_store_the_key(self):
+        payload = self.booking_payload()
+        self.make_booking(flight_departure_datetime=payload['flight_departure_datetime'])  # seat 12A is taken
+        for _ in range(2):
+            self.assertEqual(self.post("retry-3", payload).status_code, 409)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_expired_keys_are_pruned(self):
+        for key in ("old-1", "old-2", "fresh"):
+            IdempotencyKey.objects.create(scope="booking", key=key, fingerprint="f", status_code=201, response={})
+        IdempotencyKey.objects.exclude(key="fresh").update(created_at=timezone.now() - datetime.timedelta(days=2))
+
+        out = StringIO()
+        call_command('prune_idempotency_keys', batch_size=1, stdout=out)
+
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ["fresh"])
+        self.assertIn("Deleted 2 expired idempotency keys", out.getvalue())
+
+
+@override_settings(THROTTLE_ENABLED=False)  # 50 POSTs from one address on purpose
+class IdempotencyRaceTests(TransactionTestCase):
+    """50 copies of one request (same key) race; exactly one booking and one email come out."""
+
+    CLIENTS = 50
+
+    def test_identical_requests_create_one_booking(self):
+        front_cache.clear()
+        flight = Flight.objects.create(airline="IndiGo", origin="Mumbai", destination="Delhi", price=4200)
+        body = json.dumps({
+            "flight": flight.id, "passenger_name": "Asha Rao", "passenger_email": "asha@example.com",
+            "passenger_phone": "9876543210", "seat_number": "12A", "total_price": "4200.00",
+            "flight_departure_datetime": (timezone.now() + datetime.timedelta(days=3)).isoformat(),
+        })
+        responses = []
+        lock = threading.Lock()
+        start = threading.Barrier(self.CLIENTS)
+
+        def worker():
+            start.wait()
+            try:
+                response = APIClient().post('/api/bookings/', body, content_type='application/json',
+                                            HTTP_IDEMPOTENCY_KEY="race-key")
+                with lock:
+                    responses.append((response.status_code, response.json()))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.CLIENTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(responses), self.CLIENTS)
+        self.assertEqual({code for code, _ in responses}, {201})
+        self.assertEqual(len({data['booking_id'] for _, data in responses}), 1)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+
+class SQLiteTuningTests(TestCase):
+
+    def test_connection_hook_applies_pragmas(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("SQLite only")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+            cursor.execute("PRAGMA busy_timeout")
+            busy_timeout = cursor.fetchone()[0]
+        self.assertEqual(journal_mode, 'wal')
+        self.assertEqual(busy_timeout, settings.DATABASES['default']['OPTIONS']['timeout'] * 1000)
+
+
+class SeatConstraintMigrationTests(TransactionTestCase):
+    """The seat constraints go onto databases that already hold double bookings."""
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([('flights', target)])
+        return executor.loader.project_state([('flights', target)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes('flights'))
+
+    def double_book(self, apps, departure):
+        Flight, Booking = apps.get_model('flights', 'Flight'), apps.get_model('flights', 'Booking')
+        flight = Flight.objects.create(airline="IndiGo", origin="Mumbai", destination="Delhi", price=4200)
+        seat = {'flight': flight, 'seat_number': "12A", 'flight_departure_datetime': departure,
+                'passenger_email': "asha@example.com", 'total_price': 4200}
+        pending = Booking.objects.create(passenger_name="First", status='PENDING', **seat)
+        booked = Booking.objects.create(passenger_name="Paid", status='BOOKED', **seat)
+        later = Booking.objects.create(passenger_name="Later", status='BOOKED', **seat)
+        return pending, booked, later
+
+    def assert_resolved(self, apps, pending, booked, later):
+        Booking = apps.get_model('flights', 'Booking')
+        statuses = dict(Booking.objects.filter(pk__in=[pending.pk, booked.pk, later.pk]).values_list('pk', 'status'))
+        self.assertEqual(statuses, {pending.pk: 'CANCELLED', booked.pk: 'BOOKED', later.pk: 'CANCELLED'})
+
+    def test_dated_duplicates_are_cancelled_before_the_constraint(self):
+        apps = self.migrate('0010_booking_email_created_idx')
+        bookings = self.double_book(apps, timezone.now() + datetime.timedelta(days=3))
+        with self.assertLogs('flights.migrations', 'WARNING') as logs:
+            apps = self.migrate('0011_seat_inventory')
+        self.assert_resolved(apps, *bookings)
+        self.assertIn(f"kept booking {bookings[1].pk}", logs.output[0])
+
+    def test_undated_duplicates_are_cancelled_before_the_constraint(self):
+        apps = self.migrate('0018_booking_archive')
+        bookings = self.double_book(apps, None)
+        with self.assertLogs('flights.migrations', 'WARNING'):
+            apps = self.migrate('0019_booking_undated_seat_constraint')
+        self.assert_resolved(apps, *bookings)
+
+
+class RequestValidationTests(TravelGoTestCase):
+
+    def test_invalid_booking_is_rejected_before_the_view(self):
+        for field, value, message in (
+            ('passenger_name', 'Al', "Name must be at least 3 characters"),
+            ('passenger_email', 'not-an-email', "Invalid email format"),
+            ('passenger_phone', '12345', "Phone must be at least 10 digits"),
+            ('seat_number', 'A12', "Seat must be format"),
+        ):
+            with self.subTest(field=field), self.assertNumQueries(0):
+                response = self.client.post('/api/bookings/', self.booking_payload(**{field: value}), format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(message, response.json()['message'])
+
+    def test_malformed_json(self):
+        response = self.client.post('/api/bookings/', '{"passenger_name": ', content_type='application/json')
+        self.assertEqual(response.json()['message'], "Middleware Error: Malformed JSON data.")
+
+    def test_form_posts_are_left_to_drf(self):
+        response = self.client.post('/api/bookings/', self.booking_payload(), format='multipart')
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_food_orders_are_validated(self):
+        response = self.client.post('/api/food-orders/', {
+            'passenger_name': 'Asha Rao', 'flight_number': '6E-201', 'seat_number': '12A', 'food_type': '', 'price': '350',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Food type is required", response.json()['message'])
+
+    def test_body_is_parsed_once(self):
+        with mock.patch('rest_framework.parsers.JSONParser.parse') as drf_parse, \
+                self.captureOnCommitCallbacks(execute=False):
+            response = self.client.post('/api/bookings/', self.booking_payload(), format='json')
+        self.assertEqual(response.status_code, 201)
+        drf_parse.assert_not_called()
+
+
+class AsyncReadPathTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        Flight.objects.create(airline="Air India", origin="Mumbai", destination="Delhi", price=3900)
+        Flight.objects.create(airline="SpiceJet", origin="Mumbai", destination="Goa", price=2100)
+        self.make_booking(seat_number="1A")
+        self.make_booking(seat_number="1B", flight_departure_datetime=timezone.now() + datetime.timedelta(hours=2))
+        self.make_booking(seat_number="1C", passenger_email="someone@example.com")
+        self.async_client = AsyncClient()
+
+    async def test_flight_search_matches_sync_endpoint(self):
+        params = {'origin': 'Mumbai', 'destination': 'Delhi', 'ordering': 'price'}
+        response = await self.async_client.get('/api/async/flights/', params)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([flight['price'] for flight in response.json()], ["3900.00", "4200.00"])
+        self.assertEqual(response.json(), (await self.async_client.get('/api/flights/', params)).json())
+
+        cached = await self.async_client.get('/api/async/flights/', params, headers={'If-None-Match': response['ETag']})
+        self.assertEqual((cached.status_code, cached['X-Cache']), (304, 'HIT'))
+        self.assertEqual((await self.async_client.get('/api/async/flights/', {'limit': 0})).status_code, 400)
+
+    async def test_flight_detail(self):
+        response = await self.async_client.get(f'/api/async/flights/{self.flight.id}/')
+        self.assertEqual(response.json()['airline'], "IndiGo")
+        self.assertEqual((await self.async_client.get('/api/async/flights/999999/')).status_code, 404)
+
+    async def test_my_bookings_match_flat_listing(self):
+        params = {'email': 'asha@example.com'}
+        response = await self.async_client.get('/api/async/bookings/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([booking['seat_number'] for booking in response.json()], ["1B", "1A"])
+        self.assertEqual(response.json(), (await self.async_client.get('/api/bookings/', {**params, 'flat': 1})).json())
+
+        response = await self.async_client.get('/api/async/bookings/', {**params, 'cancellable': 1, 'limit': 5})
+        self.assertEqual([booking['seat_number'] for booking in response.json()], ["1A"])
+
+    async def test_async_requests_are_measured(self):
+        registry.reset()
+        with self.assertLogs('flights.metrics', level='INFO') as logs:
+            await self.async_client.get('/api/async/bookings/', {'email': 'asha@example.com'})
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['endpoint'], record['status'], record['db_queries']), ('async-booking-list', 200, 1))
+
+
+class RequestMetricsTests(TravelGoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        registry.reset()
+
+    def test_structured_log_line_per_request(self):
+        with self.assertLogs('flights.metrics', level='INFO') as logs:
+            self.client.get('/api/flights/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['endpoint'], 'flight-list')
+        self.assertEqual(record['status'], 200)
+        self.assertGreaterEqual(record['db_queries'], 1)
+        self.assertGreater(record['serializer_ms'], 0)
+
+    def test_template_time_is_measured(self):
+        with self.assertLogs('flights.metrics', level='INFO') as logs:
+            self.client.get('/api/flights/')
+            self.client.get('/api/flights/', {'format': 'api'})  # browsable API: a template render
+        json_line, html_line = (json.loads(record.getMessage()) for record in logs.records)
+        self.assertEqual(json_line['template_ms'], 0)
+        self.assertGreater(html_line['template_ms'], 0)
+
+    def test_prometheus_endpoint(self):
+        self.client.get('/api/flights/')
+        self.client.get('/api/flights/')
+        self.make_booking()
+        self.client.get('/api/bookings/')
+
+        self.assertEqual(self.client.get('/api/metrics').status_code, 403)
+        self.client.force_login(User.objects.create_user('ops', is_staff=True))
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('travelgo_http_requests_total{endpoint="flight-list",method="GET",status="200"} 2', body)
+        self.assertIn('travelgo_http_request_duration_seconds_count{endpoint="flight-list"} 2', body)
+        self.assertIn('travelgo_db_queries_per_request_bucket{endpoint="booking-list",le="+Inf"} 1', body)
+        self.assertIn('travelgo_cache_requests_total{cache="flights",result="hit"}', body)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_scraper_token(self):
+        self.assertEqual(self.client.get('/api/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get('/api/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+    def test_sampling_still_counts_requests(self):
+        with override_settings(METRICS_SAMPLE_RATE=0.0):
+            self.client.get('/api/flights/')
+        self.assertEqual(registry.requests, {('flight-list', 'GET', '200'): 1})
+        self.assertEqual(registry.histograms, {})
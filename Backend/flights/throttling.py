@@ -0,0 +1,64 @@
+# flights/throttling.py
+"""
+Token buckets for per-client rate limiting (flights.middleware.ThrottleMiddleware).
+
+A rate like '30/min' is a bucket of 30 tokens refilled at 30 per minute: a
+client may burst up to 30 requests, then gets one more every 2 seconds.
+Buckets live in process memory (one dict lookup and a lock per check), so
+each gunicorn worker enforces its limits on its own.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'30/min' -> (capacity 30, refill 0.5 tokens per second)."""
+    try:
+        count, period = rate.split('/')
+        capacity, seconds = int(count), PERIODS[period.strip()[0]]
+    except (ValueError, KeyError, IndexError):
+        raise ValueError(f"{rate!r} is not a rate like '30/min' (per s, min, hour or day).")
+    if capacity < 1:
+        raise ValueError(f"{rate!r} must allow at least one request.")
+    return capacity, capacity / seconds
+
+
+class TokenBuckets:
+    """Buckets by key, least recently used dropped past `max_keys` (rotating IPs can't grow it forever)."""
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, last refill)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now=None):
+        """Takes a token from `key`'s bucket: 0.0 if one was there, else seconds until there is."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(key)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            # Rejected requests don't cost a token
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+buckets = TokenBuckets()
@@ -1,12 +1,23 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
-from .views import FlightViewSet, BookingViewSet,FoodOrderViewSet # Add BookingViewSet here
+from . import async_views
+from .views import FlightViewSet, BookingViewSet,FoodOrderViewSet, FareSummaryView, FinanceExportView, TravelPackageViewSet, PackageBookingViewSet, metrics # Add BookingViewSet here
 
 router = DefaultRouter()
 router.register(r'flights', FlightViewSet)
 router.register(r'bookings', BookingViewSet)
 router.register(r'food-orders', FoodOrderViewSet) # This creates /api/bookings/
+router.register(r'packages', TravelPackageViewSet)
+router.register(r'package-bookings', PackageBookingViewSet)
 
 urlpatterns = [
+    path('metrics', metrics, name='metrics'),
+    path('fares/summary', FareSummaryView.as_view(), name='fare-summary'),
+    re_path(r'^exports/(?P<kind>bookings|food-orders)\.(?P<ext>csv|jsonl)(?P<compressed>\.gz)?$',
+            FinanceExportView.as_view(), name='finance-export'),
+    # Coroutine views for ASGI deployments (see flights/async_views.py)
+    path('async/flights/', async_views.flight_search, name='async-flight-list'),
+    path('async/flights/<int:pk>/', async_views.flight_detail, name='async-flight-detail'),
+    path('async/bookings/', async_views.booking_list, name='async-booking-list'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -0,0 +1,81 @@
+# flights/validation.py
+"""
+Request payload validators used by RequestValidationMiddleware.
+
+Each validator takes the parsed JSON body and returns an error message, or None
+when the payload is acceptable. Which endpoints use which validator is
+configured in settings.REQUEST_VALIDATION.
+"""
+import re
+
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
+SEAT_RE = re.compile(r'^\d+[A-F]$')
+
+
+def check_name(body):
+    name = body.get('passenger_name', '')
+    if not isinstance(name, str) or len(name) < 3:
+        return "Middleware Error: Name must be at least 3 characters."
+
+
+def check_email(body):
+    email = body.get('passenger_email', '')
+    if not isinstance(email, str) or not EMAIL_RE.match(email):
+        return "Middleware Error: Invalid email format."
+
+
+def check_phone(body):
+    phone = str(body.get('passenger_phone', ''))
+    if not phone.isdigit() or len(phone) < 10:
+        return "Middleware Error: Phone must be at least 10 digits."
+
+
+def check_seat(body):
+    seat = body.get('seat_number', '')
+    if not isinstance(seat, str) or not SEAT_RE.match(seat):
+        return "Middleware Error: Seat must be format like '5A' or '10C'."
+
+
+def check_food_type(body):
+    if not str(body.get('food_type') or '').strip():
+        return "Middleware Error: Food type is required."
+
+
+def run_checks(body, checks):
+    for check in checks:
+        error = check(body)
+        if error:
+            return error
+
+
+def validate_booking(body):
+    return run_checks(body, (check_name, check_email, check_phone, check_seat))
+
+
+def validate_group_booking(body):
+    passengers = body.get('passengers')
+    if not isinstance(passengers, list) or not passengers:
+        return "Middleware Error: A group booking needs a list of passengers."
+    for number, passenger in enumerate(passengers, 1):
+        if not isinstance(passenger, dict):
+            return f"Middleware Error: Passenger {number} must be an object."
+        checks = (check_name, check_email, check_phone) + ((check_seat,) if passenger.get('seat_number') else ())
+        error = run_checks(passenger, checks)
+        if error:
+            return error.replace("Middleware Error:", f"Middleware Error: Passenger {number}:", 1)
+
+
+def validate_food_order(body):
+    return run_checks(body, (check_name, check_seat, check_food_type))
+
+
+def validate_package_booking(body):
+    return run_checks(body, (check_name, check_email))
+
+
+VALIDATORS = {
+    'booking': validate_booking,
+    'group_booking': validate_group_booking,
+    'food_order': validate_food_order,
+    'package_booking': validate_package_booking,
+}
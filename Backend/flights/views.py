@@ -1,40 +1,242 @@
-import os
+import hmac
 import uuid 
+from decimal import Decimal, InvalidOperation
 from django.conf import settings
 from django.db import transaction
-from email.mime.image import MIMEImage
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
-from rest_framework import viewsets, status
+from rest_framework import generics, mixins, viewsets, status, views
 from rest_framework.response import Response
 from rest_framework.decorators import action 
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser
 
-from .models import Flight, Booking, FoodOrder
-from .serializers import FlightSerializer, BookingSerializer, FoodOrderSerializer
+from .models import Flight, Booking, FoodOrder, RouteFareSummary, TravelPackage, PackageBooking
+from .serializers import FlightSerializer, BookingSerializer, BookingFlatSerializer, FoodOrderSerializer, RouteFareSummarySerializer, GroupBookingSerializer
+from .serializers import TravelPackageSerializer, TravelPackageListSerializer, PackageBookingSerializer
+from .outbox import queue_email
+from .filters import SparseFieldsFilter, StableOrderingFilter
+from .pagination import FlightCursorPagination, BookingCursorPagination, FareSummaryCursorPagination, PackageCursorPagination
+from .cache import CachedResponseMixin, flight_cache, package_cache, package_cache_stats
+from .seats import SeatUnavailable, reserve_group, reserve_seat, seat_availability
+from .metrics import registry
+from .disruptions import CANCEL, RESCHEDULE, disrupt_flight
+from . import idempotency
+from .routes import MAX_LEGS, route_graph
+from . import exports
+from .manifests import manifest_cache
+from .archive import booking_source, include_archived
 
-class FlightViewSet(viewsets.ModelViewSet):
+def search_flights(params):
+    """
+    Server-side flight search. Exact matches on origin/destination/airline plus
+    a price range, so the (origin, destination, price) index can serve the query.
+    e.g. /api/flights/?origin=Mumbai&destination=Delhi&max_price=5000&ordering=price&page_size=20
+    Shared by FlightViewSet and the async read path (flights.async_views).
+    """
+    queryset = Flight.objects.all()
+
+    for field in ('origin', 'destination', 'airline'):
+        value = params.get(field)
+        if value:
+            queryset = queryset.filter(**{field: value})
+
+    for param, lookup in (('min_price', 'price__gte'), ('max_price', 'price__lte')):
+        value = params.get(param)
+        if value:
+            queryset = queryset.filter(**{lookup: parse_price(param, value)})
+    return queryset
+
+def parse_price(param, value):
+    """A price query parameter as a Decimal; NaN and Infinity are rejected like any non-number."""
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        price = None
+    if price is None or not price.is_finite():
+        raise ValidationError({param: "Must be a number."})
+    return price
+
+def my_bookings(params, now=None):
+    """
+    Used by the MyBookings section to filter flights by the logged-in email.
+    Served by the (passenger_email, -created_at) index; add ?page_size= to page with cursors.
+    can_cancel / refund_eligibility are computed by the database; ?cancellable=1
+    lists only the bookings that can still be cancelled. ?include_archived=1 reads
+    through the BookingHistory view, adding bookings moved by `archive_bookings`.
+    """
+    now = now or timezone.now()
+    queryset = booking_source(params).select_related('flight').with_cancellation_flags(now).order_by('-created_at')
+    email = params.get('email', None)
+    if email is not None:
+        queryset = queryset.filter(passenger_email=email)
+    if params.get('cancellable') in ('1', 'true'):
+        queryset = queryset.cancellable(now)
+    return queryset
+
+class FlightViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Flight.objects.all()
     serializer_class = FlightSerializer
+    response_cache = flight_cache
+    filter_backends = [StableOrderingFilter, SparseFieldsFilter]
+    ordering_fields = ['price', 'airline', 'origin', 'destination', 'id']
+    ordering = ['id']
+    pagination_class = FlightCursorPagination
+
+    def get_queryset(self):
+        return search_flights(self.request.query_params)
+
+    @action(detail=True, methods=['get'])
+    def seats(self, request, pk=None):
+        """Seat availability bitmap for one departure: /api/flights/<id>/seats/?departure=<ISO datetime>"""
+        departure = parse_datetime(request.query_params.get('departure', ''))
+        if departure is None:
+            raise ValidationError({"departure": "An ISO 8601 departure datetime is required."})
+        return Response(seat_availability(self.get_object(), departure))
+
+    @action(detail=False, methods=['get'])
+    def connections(self, request):
+        """
+        Direct and connecting itineraries from the in-process route graph:
+        /api/flights/connections/?origin=Mumbai&destination=Leh&max_legs=3&limit=5
+        Returns the cheapest itineraries and the ones with the fewest flights.
+        """
+        params = request.query_params
+        origin, destination = params.get('origin'), params.get('destination')
+        if not origin or not destination:
+            raise ValidationError({"origin": "origin and destination are required."})
+        max_legs = self.bounded_int(params, 'max_legs', default=2, maximum=MAX_LEGS)
+        limit = self.bounded_int(params, 'limit', default=5, maximum=20)
+
+        graph = route_graph()
+        found = {
+            'cheapest': graph.search(origin, destination, max_legs, limit, by='price'),
+            'fewest_hops': graph.search(origin, destination, max_legs, limit, by='legs'),
+        }
+        flights = Flight.objects.in_bulk({flight_id for itineraries in found.values()
+                                          for _, path in itineraries for flight_id in path})
+        data = {'origin': origin, 'destination': destination, 'max_legs': max_legs}
+        for name, itineraries in found.items():
+            data[name] = []
+            for _, path in itineraries:
+                legs = [flights.get(flight_id) for flight_id in path]
+                if None in legs:
+                    continue  # deleted since the graph was built
+                data[name].append({
+                    'legs': len(legs),
+                    'total_price': str(sum(flight.price for flight in legs)),
+                    'flights': FlightSerializer(legs, many=True).data,
+                })
+        return Response(data)
+
+    @staticmethod
+    def bounded_int(params, name, default, maximum):
+        try:
+            value = int(params.get(name, default))
+        except ValueError:
+            raise ValidationError({name: "Must be a whole number."})
+        if not 1 <= value <= maximum:
+            raise ValidationError({name: f"Must be between 1 and {maximum}."})
+        return value
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
+    def disrupt(self, request, pk=None):
+        """
+        Operations only. Cancels or reschedules every active booking on the flight:
+        {"action": "cancel", "departure": <ISO>}
+        {"action": "reschedule", "departure": <ISO>, "new_departure": <ISO>}
+        """
+        disruption = request.data.get('action')
+        if disruption not in (CANCEL, RESCHEDULE):
+            raise ValidationError({"action": "Must be 'cancel' or 'reschedule'."})
+
+        times = {}
+        for field in ('departure', 'new_departure'):
+            value = request.data.get(field)
+            if value:
+                times[field] = parse_datetime(str(value))
+                if times[field] is None:
+                    raise ValidationError({field: "Must be an ISO 8601 datetime."})
+        if 'departure' not in times:
+            raise ValidationError({"departure": "The affected departure is required."})
+        if disruption == RESCHEDULE and 'new_departure' not in times:
+            raise ValidationError({"new_departure": "A reschedule needs departure and new_departure."})
+
+        try:
+            result = disrupt_flight(self.get_object(), disruption, **times)
+        except SeatUnavailable as err:
+            return Response({"message": str(err)}, status=status.HTTP_409_CONFLICT)
+        return Response(result, status=status.HTTP_200_OK)
+
+class FareSummaryView(CachedResponseMixin, generics.ListAPIView):
+    """
+    Cheapest / average / highest fare and airline count per route, read from the
+    RouteFareSummary table (one row per route, however many flights it has).
+    e.g. /api/fares/summary?origin=Mumbai  (cheapest destinations first)
+    """
+    serializer_class = RouteFareSummarySerializer
+    # Refreshed together with the flights, so it shares their cache generation
+    response_cache = flight_cache
+    filter_backends = [StableOrderingFilter]
+    ordering_fields = ['min_price', 'avg_price', 'max_price', 'airline_count', 'flight_count', 'origin', 'destination', 'id']
+    ordering = ['min_price']
+    pagination_class = FareSummaryCursorPagination
+
+    def get_queryset(self):
+        queryset = RouteFareSummary.objects.all()
+        params = self.request.query_params
+        for field in ('origin', 'destination'):
+            value = params.get(field)
+            if value:
+                queryset = queryset.filter(**{field: value})
+        value = params.get('max_price')
+        if value:
+            queryset = queryset.filter(min_price__lte=parse_price('max_price', value))
+        return queryset
 
 class BookingViewSet(viewsets.ModelViewSet):
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
+    pagination_class = BookingCursorPagination
+    filter_backends = [SparseFieldsFilter]
 
     def get_queryset(self):
-        """Used by the MyBookings section to filter flights by the logged-in email."""
-        queryset = Booking.objects.all().order_by('-created_at')
-        email = self.request.query_params.get('email', None)
-        if email is not None:
-            queryset = queryset.filter(passenger_email=email)
-        return queryset
+        params = self.request.query_params
+        if include_archived(params) and self.request.method not in SAFE_METHODS:
+            raise ValidationError({'include_archived': "Archived bookings are read-only."})
+        return my_bookings(params)
+
+    def list(self, request, *args, **kwargs):
+        """`?flat=1` skips model instances entirely and serializes values() rows (honours ?fields= too)."""
+        if request.query_params.get('flat') not in ('1', 'true'):
+            return super().list(request, *args, **kwargs)
+
+        rows = BookingFlatSerializer.rows(self.filter_queryset(self.get_queryset()), request.query_params,
+                                          self.paginator.ordering)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(BookingFlatSerializer(page, request.query_params).data)
+        return Response(BookingFlatSerializer(rows, request.query_params).data)
 
     def create(self, request, *args, **kwargs):
         """
         Instant Storage Logic:
         Creates a 'BOOKED' record directly in the DB so it shows in 'My Bookings'.
+
+        With an `Idempotency-Key` header, retries of the same request get the
+        stored response back instead of a second booking.
         """
+        key = request.headers.get('Idempotency-Key')
+        if key:
+            if len(key) > idempotency.MAX_KEY_LENGTH:
+                raise ValidationError({"Idempotency-Key": f"At most {idempotency.MAX_KEY_LENGTH} characters."})
+            request_fingerprint = idempotency.fingerprint(request.body)
+            replay = self.replay(key, request_fingerprint)
+            if replay is not None:
+                return replay
+
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
@@ -45,34 +247,123 @@ class BookingViewSet(viewsets.ModelViewSet):
         try:
             # 2. Database transaction (Squares the record in the SQLite/Disk vault)
             with transaction.atomic():
-                booking = serializer.save(
-                    status='BOOKED', # Sets it confirmed immediately
-                    razorpay_order_id=local_order_id,
-                    razorpay_payment_id=local_payment_id,
-                    razorpay_signature="SQUARED_ON_CLOUD"
-                )
+                # Claim the key first: a racing duplicate waits here, not on the seat
+                record = idempotency.claim('bookings', key, request_fingerprint) if key else None
+
+                # reserve_seat claims the seat atomically (unique index on active seats)
+                booking = reserve_seat(**{
+                    **serializer.validated_data,
+                    'status': 'BOOKED', # Sets it confirmed immediately
+                    'razorpay_order_id': local_order_id,
+                    'razorpay_payment_id': local_payment_id,
+                    'razorpay_signature': "SQUARED_ON_CLOUD",
+                })
 
-                # 3. Attempt to send confirmation email
+                # 3. Queue the confirmation email (written to the outbox on commit,
+                #    delivered by the send_outbox_emails worker)
                 try:
                     self.send_booking_confirmation(booking)
                 except Exception as email_err:
                     # Log email error to Render console, but allow database save to continue
                     print(f"📧 EMAIL LOG ERROR (Non-fatal): {email_err}")
 
-            # 4. Response for the React Loading Card
-            return Response({
-                "message": "Booking Stored and Squared!",
-                "booking_id": booking.id,
-                "mock_order_id": local_order_id,
-                "transaction_id": local_payment_id,
-                "amount": booking.total_price,
-                "passenger_name": booking.passenger_name,
-                "status": "BOOKED"
-            }, status=status.HTTP_201_CREATED)
+                # 4. Response for the React Loading Card
+                data = {
+                    "message": "Booking Stored and Squared!",
+                    "booking_id": booking.id,
+                    "mock_order_id": local_order_id,
+                    "transaction_id": local_payment_id,
+                    "amount": booking.total_price,
+                    "passenger_name": booking.passenger_name,
+                    "status": "BOOKED"
+                }
+                if record is not None:
+                    idempotency.complete(record, status.HTTP_201_CREATED, data)
+            return Response(data, status=status.HTTP_201_CREATED)
 
+        except idempotency.DuplicateRequest:
+            return self.replay(key, request_fingerprint) or Response(
+                {"error": "A request with this Idempotency-Key is still being processed."},
+                status=status.HTTP_409_CONFLICT)
+        except SeatUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
         except Exception as e:
             return Response({"error": f"Database storage failed: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
 
+    def replay(self, key, request_fingerprint, scope='bookings'):
+        """The stored response for a repeated Idempotency-Key, or None for a new key."""
+        try:
+            stored = idempotency.lookup(scope, key, request_fingerprint)
+        except idempotency.KeyReused as err:
+            return Response({"error": str(err)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        if stored is None:
+            return None
+        status_code, data = stored
+        return Response(data, status=status_code, headers={'Idempotent-Replayed': 'true'})
+
+    @action(detail=False, methods=['post'])
+    def group(self, request):
+        """
+        Group / family reservation: one flight and departure, N passengers, one
+        payment reference, one INSERT and one consolidated confirmation email to
+        the first passenger. All seats are booked or none. Passengers without a
+        seat_number are seated together. Honours Idempotency-Key like create().
+        """
+        key = request.headers.get('Idempotency-Key')
+        if key:
+            if len(key) > idempotency.MAX_KEY_LENGTH:
+                raise ValidationError({"Idempotency-Key": f"At most {idempotency.MAX_KEY_LENGTH} characters."})
+            request_fingerprint = idempotency.fingerprint(request.body)
+            replay = self.replay(key, request_fingerprint, scope='group-bookings')
+            if replay is not None:
+                return replay
+
+        serializer = GroupBookingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        flight, departure = data['flight'], data['flight_departure_datetime']
+        passengers = [{'total_price': flight.price, **passenger} for passenger in data['passengers']]
+        local_order_id = f"ORD_LOC_{uuid.uuid4().hex[:10].upper()}"
+        local_payment_id = f"PAY_LOC_{uuid.uuid4().hex[:12].upper()}"
+
+        try:
+            with transaction.atomic():
+                record = idempotency.claim('group-bookings', key, request_fingerprint) if key else None
+                bookings = reserve_group(
+                    flight, departure, passengers,
+                    booking_location=data.get('booking_location', ''),
+                    device_id=data.get('device_id', ''),
+                    status='BOOKED',
+                    razorpay_order_id=local_order_id,
+                    razorpay_payment_id=local_payment_id,
+                    razorpay_signature="SQUARED_ON_CLOUD",
+                )
+                self.send_group_confirmation(flight, bookings)
+
+                response = {
+                    "message": f"{len(bookings)} Bookings Stored and Squared!",
+                    "mock_order_id": local_order_id,
+                    "transaction_id": local_payment_id,
+                    "amount": sum(booking.total_price for booking in bookings),
+                    "status": "BOOKED",
+                    "bookings": [{
+                        "booking_id": booking.id,
+                        "passenger_name": booking.passenger_name,
+                        "seat_number": booking.seat_number,
+                        "amount": booking.total_price,
+                    } for booking in bookings],
+                }
+                if record is not None:
+                    idempotency.complete(record, status.HTTP_201_CREATED, response)
+            return Response(response, status=status.HTTP_201_CREATED)
+
+        except idempotency.DuplicateRequest:
+            return self.replay(key, request_fingerprint, scope='group-bookings') or Response(
+                {"error": "A request with this Idempotency-Key is still being processed."},
+                status=status.HTTP_409_CONFLICT)
+        except SeatUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+
     @action(detail=True, methods=['post'])
     def verify_payment(self, request, pk=None):
         """Dummy endpoint to prevent 404s if older React code calls it."""
@@ -82,7 +373,7 @@ class BookingViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def cancel_ticket(self, request, pk=None):
         booking = self.get_object()
-        if not booking.can_cancel:
+        if not booking.cancellable:
             return Response({"message": "Cancellation window closed."}, status=status.HTTP_400_BAD_REQUEST)
 
         booking.status = 'CANCELLED'
@@ -91,15 +382,12 @@ class BookingViewSet(viewsets.ModelViewSet):
         context = {
             'passenger_name': booking.passenger_name,
             'airline': booking.flight.airline,
-            'refund_status': booking.refund_eligibility,
+            'refund_status': booking.refund_status,
             'origin': booking.flight.origin,
             'destination': booking.flight.destination,
             'seat_number': booking.seat_number
         }
-        try:
-            self.send_professional_email('Ticket Cancelled', context, 'emails/cancellation_email.html', booking.passenger_email)
-        except:
-            pass
+        queue_email('Ticket Cancelled', 'emails/cancellation_email.html', context, booking.passenger_email)
         return Response({"message": "Successfully Cancelled."}, status=status.HTTP_200_OK)
 
     def send_booking_confirmation(self, booking):
@@ -115,39 +403,164 @@ class BookingViewSet(viewsets.ModelViewSet):
             'device_id': booking.device_id,
             'transaction_id': booking.razorpay_payment_id 
         }
-        self.send_professional_email(f'Official Ticket: {booking.flight.airline}', context, 'emails/booking_confirmation.html', booking.passenger_email)
+        queue_email(f'Official Ticket: {booking.flight.airline}', 'emails/booking_confirmation.html', context, booking.passenger_email)
 
-    def send_professional_email(self, subject, context, template, recipient_email):
-        """Logic to send branded HTML emails with attachments safely"""
-        try:
-            html_content = render_to_string(template, context)
-            text_content = strip_tags(html_content)
-            email = EmailMultiAlternatives(
-                subject=subject,
-                body=text_content,
-                from_email='lalit.lakshmipathi@gmail.com',
-                to=[recipient_email],
-            )
-            email.attach_alternative(html_content, "text/html")
-
-            # Check and attach logo file path (Safe for Render's Linux paths)
-            logo_path = os.path.join(settings.BASE_DIR, 'flights', 'TravelGo_logo.png')
-            if os.path.exists(logo_path):
-                try:
-                    with open(logo_path, 'rb') as f:
-                        logo = MIMEImage(f.read())
-                        logo.add_header('Content-ID', '<logo_image>')
-                        logo.add_header('Content-Disposition', 'inline', filename='TravelGo_logo.png')
-                        email.attach(logo)
-                except:
-                    print("⚠️ Attachment failed - continuing without image.")
+    def send_group_confirmation(self, flight, bookings):
+        """One email to the first passenger listing every seat in the group."""
+        lead = bookings[0]
+        context = {
+            'passenger_name': lead.passenger_name,
+            'airline': flight.airline,
+            'origin': flight.origin,
+            'destination': flight.destination,
+            'departure_time': lead.flight_departure_datetime.strftime('%d %b %Y, %H:%M'),
+            'passengers': [{'name': booking.passenger_name, 'seat_number': booking.seat_number} for booking in bookings],
+            'total_price': str(sum(booking.total_price for booking in bookings)),
+            'location': lead.booking_location,
+            'device_id': lead.device_id,
+            'transaction_id': lead.razorpay_payment_id,
+        }
+        queue_email(f'Group Ticket ({len(bookings)} passengers): {flight.airline}',
+                    'emails/group_booking_confirmation.html', context, lead.passenger_email)
+
+class FinanceExportView(views.APIView):
+    """
+    Finance reconciliation download, streamed straight from the database:
+    /api/exports/bookings.csv?from=2026-01-01&to=2026-02-01
+    /api/exports/food-orders.jsonl.gz
+    `from` is inclusive, `to` exclusive (dates or datetimes, on created_at / ordered_at).
+    ?include_archived=1 appends the archived rows (see flights.archive).
+    """
+    permission_classes = [IsAdminUser]
 
-            email.send(fail_silently=False)
-            print(f"✅ Success! Ticket sent to {recipient_email}")
+    def get(self, request, kind, ext, compressed=None):
+        bounds = {}
+        for param, name in (('from', 'start'), ('to', 'end')):
+            try:
+                bounds[name] = exports.parse_bound(request.query_params.get(param))
+            except ValueError as err:
+                raise ValidationError({param: str(err)})
 
-        except Exception as fatal_e:
-            print(f"❌ SMTP Fatal Error (Internal Only): {fatal_e}")
+        stream = exports.export_stream(kind, ext, compress=bool(compressed),
+                                       include_archived=include_archived(request.query_params), **bounds)
+        filename = f"{kind}.{ext}{compressed or ''}"
+        response = StreamingHttpResponse(
+            stream, content_type='application/gzip' if compressed else f'{exports.FORMATS[ext]}; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
 class FoodOrderViewSet(viewsets.ModelViewSet):
     queryset = FoodOrder.objects.all()
-    serializer_class = FoodOrderSerializer
\ No newline at end of file
+    serializer_class = FoodOrderSerializer
+    filter_backends = [SparseFieldsFilter]
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def manifest(self, request):
+        """
+        Catering manifest, meals per food_type with their seats:
+        /api/food-orders/manifest/?flight=<id>[&departure=<ISO datetime>]
+        Cached per flight until one of its orders changes.
+        """
+        flight_id = request.query_params.get('flight', '')
+        if not flight_id.isdigit():
+            raise ValidationError({"flight": "A flight id is required."})
+        departure = request.query_params.get('departure')
+        if departure:
+            departure = parse_datetime(departure)
+            if departure is None:
+                raise ValidationError({"departure": "Must be an ISO 8601 datetime."})
+
+        try:
+            manifest, cache_status = manifest_cache.get_or_build(int(flight_id), departure or None)
+        except Flight.DoesNotExist:
+            raise NotFound("No Flight matches the given query.")
+        return Response(manifest, headers={'X-Cache': cache_status})
+
+class TravelPackageViewSet(CachedResponseMixin, viewsets.ModelViewSet):
+    """
+    Holiday packages: /api/packages/?category=HONEYMOON[&page_size=20]
+    Listings never load the description (only the detail view shows it) and are
+    cached per category until a package in that category is written.
+    """
+    queryset = TravelPackage.objects.all()
+    serializer_class = TravelPackageSerializer
+    pagination_class = PackageCursorPagination
+
+    def get_permissions(self):
+        # Anyone can browse; the catalogue itself is maintained by staff
+        if self.request.method in SAFE_METHODS:
+            return super().get_permissions()
+        return [IsAdminUser()]
+
+    @property
+    def response_cache(self):
+        return package_cache(self.category() if self.action == 'list' else None)
+
+    def category(self):
+        category = self.request.query_params.get('category')
+        if category and category not in dict(TravelPackage.CATEGORY_CHOICES):
+            raise ValidationError({"category": f"Must be one of {', '.join(dict(TravelPackage.CATEGORY_CHOICES))}."})
+        return category or None
+
+    def get_queryset(self):
+        queryset = TravelPackage.objects.order_by('price_per_person', 'id')
+        if self.action != 'list':
+            return queryset
+        category = self.category()
+        if category:
+            queryset = queryset.filter(category=category)
+        return queryset.only(*TravelPackage.LIST_FIELDS)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return TravelPackageListSerializer
+        return TravelPackageSerializer
+
+class PackageBookingViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                            viewsets.GenericViewSet):
+    """Package bookings: create, and /api/package-bookings/?email= for the customer's own list."""
+    queryset = PackageBooking.objects.all()
+    serializer_class = PackageBookingSerializer
+
+    def get_queryset(self):
+        queryset = PackageBooking.objects.select_related('package').defer('package__description').order_by('-booked_at', '-id')
+        email = self.request.query_params.get('email')
+        if email:
+            queryset = queryset.filter(passenger_email=email)
+        elif self.action == 'list':
+            # Without an email the list would be every customer's bookings
+            raise ValidationError({'email': "This query parameter is required."})
+        return queryset
+
+    def perform_create(self, serializer):
+        # Confirmed on the spot with a local transaction id, like flight bookings
+        # (BookingViewSet.create): there is no payment step to wait for yet.
+        # Validation (and the package lookup) happen before this; the transaction
+        # only covers the INSERT, so the write lock is held as briefly as possible
+        with transaction.atomic():
+            serializer.save(status='BOOKED', local_transaction_id=f"PKG_LOC_{uuid.uuid4().hex[:12].upper()}")
+
+
+def metrics_allowed(request):
+    """Staff sessions, or a scraper with the METRICS_TOKEN bearer token."""
+    if request.user.is_staff:
+        return True
+    token = settings.METRICS_TOKEN
+    return bool(token) and hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}")
+
+
+def metrics(request):
+    """Prometheus scrape endpoint (per worker process)."""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    stats, packages = flight_cache.stats(), package_cache_stats()
+    cache_counters = [
+        ('travelgo_cache_requests_total', "Catalogue response cache lookups", [
+            ({'cache': 'flights', 'result': 'hit'}, stats['hits']),
+            ({'cache': 'flights', 'result': 'miss'}, stats['misses']),
+            ({'cache': 'packages', 'result': 'hit'}, packages['hits']),
+            ({'cache': 'packages', 'result': 'miss'}, packages['misses']),
+        ]),
+    ]
+    return HttpResponse(registry.render_prometheus(cache_counters),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
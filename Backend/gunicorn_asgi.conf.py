@@ -0,0 +1,33 @@
+"""
+gunicorn settings for serving the ASGI app (async views under /api/async/):
+
+    gunicorn travelgo_django.asgi:application -c gunicorn_asgi.conf.py
+
+Each worker is one event loop, so a handful of processes hold thousands of
+open connections; slow clients and keep-alive idlers no longer pin a whole
+worker the way they do with the default sync workers.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = 'travelgo_django.workers.UvicornWorker'
+
+# Concurrency comes from the event loop, not from process count: one worker per core
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+# Open connections per worker before uvicorn starts answering 503
+worker_connections = int(os.environ.get('ASGI_WORKER_CONNECTIONS', 1000))
+backlog = int(os.environ.get('ASGI_BACKLOG', 2048))
+
+# Idle keep-alive sockets are cheap on an event loop; reuse them for the next request
+keepalive = int(os.environ.get('ASGI_KEEPALIVE', 5))
+timeout = 30
+graceful_timeout = 30
+# Recycle workers now and then so a slow leak can't grow forever
+max_requests = 5000
+max_requests_jitter = 500
+
+# Async views run their ORM calls in short-lived per-request threads, where
+# persistent connections would pile up: connect per request unless a pool is used
+if os.environ.get('DB_POOL') != 'True':
+    os.environ.setdefault('DB_CONN_MAX_AGE', '0')
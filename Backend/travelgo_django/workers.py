@@ -0,0 +1,15 @@
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """
+    gunicorn worker running the ASGI app on a uvicorn event loop (uvloop/httptools
+    when installed). Django has no lifespan support, so that protocol is off, and
+    gunicorn's `worker_connections` becomes uvicorn's concurrency limit: past it,
+    new connections get a 503 instead of queueing without bound.
+    """
+    CONFIG_KWARGS = {'loop': 'auto', 'http': 'auto', 'lifespan': 'off'}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.limit_concurrency = self.cfg.worker_connections